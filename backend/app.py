@@ -3,22 +3,39 @@ from __future__ import annotations
 
 import os
 import time
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Any, Dict
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 # Routers
 from routers import poe, event, export, ai, llm
+from services import warmup
+from services.power import PowerUnavailable, upstream_status
+from services.power_hourly import hourly_upstream_status
+from utils.resilience import time_budget
 
-app = FastAPI(title="Will it Rain on My Parade?", version="0.9.0")
 logger = logging.getLogger("uvicorn")
 
+# lifespan: warm model + hot-location caches, keep them refreshed
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    task = asyncio.create_task(warmup.refresh_loop())
+    try:
+        yield
+    finally:
+        task.cancel()
+
+app = FastAPI(title="Will it Rain on My Parade?", version="0.9.0", lifespan=lifespan)
+
 # -------------------------------
 # CORS (single, consolidated block)
 # -------------------------------
@@ -39,12 +56,46 @@ app.add_middleware(
     allow_headers=["*"],               # lets the preflight announce Content-Type, etc.
 )
 
+# -------------------------------
+# Response compression (large corridor/PoE bodies)
+# -------------------------------
+# Brotli when brotli-asgi is installed (falls back to gzip for clients that
+# don't send "br"); plain gzip otherwise. Small bodies are sent as-is, and
+# streamed routes bypass compression (the compressor would buffer their frames).
+_COMPRESS_MIN = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+_UNCOMPRESSED_PATHS = {"/api/event/stream"}
+
+class _Compress:
+    """`middleware` for every path except _UNCOMPRESSED_PATHS, which go straight to the app."""
+
+    def __init__(self, app, middleware, **options):
+        self.app = app
+        self.compressed = middleware(app, **options)
+
+    async def __call__(self, scope, receive, send):
+        skip = scope["type"] == "http" and scope["path"] in _UNCOMPRESSED_PATHS
+        await (self.app if skip else self.compressed)(scope, receive, send)
+
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(_Compress, middleware=BrotliMiddleware, minimum_size=_COMPRESS_MIN, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(_Compress, middleware=GZipMiddleware, minimum_size=_COMPRESS_MIN)
+
 # request logging
 @app.middleware("http")
 async def _log_paths(request: Request, call_next):
     logger.info("%s %s", request.method, request.url.path)
     return await call_next(request)
 
+# upstream time budget: all POWER calls made for one request share it
+_UPSTREAM_BUDGET = float(os.getenv("POWER_REQUEST_BUDGET_SEC", "30"))
+
+@app.middleware("http")
+async def upstream_budget(request: Request, call_next):
+    with time_budget(_UPSTREAM_BUDGET):
+        return await call_next(request)
+
 # rpm rate limit
 _BUCKET: Dict[str, tuple[int, int]] = {}  # ip -> (count, reset_epoch)
 _LIMIT = int(os.getenv("RATE_LIMIT_RPM", "60"))
@@ -90,6 +141,14 @@ async def http_handler(request: Request, exc: StarletteHTTPException):
         return err("NOT_FOUND", "Route not found.", status=404)
     return err("HTTP_ERROR", str(exc.detail), status=exc.status_code)
 
+@app.exception_handler(PowerUnavailable)
+async def upstream_handler(request: Request, exc: PowerUnavailable):
+    return err(
+        "UPSTREAM_UNAVAILABLE", "NASA POWER is unavailable and no cached data covers this request.",
+        status=503, details={"reason": str(exc), "power": upstream_status(), "power_hourly": hourly_upstream_status()},
+        hint="Try again shortly.",
+    )
+
 # meta/health
 @app.get("/")
 def root():
@@ -97,7 +156,17 @@ def root():
 
 @app.get("/api/health")
 def health():
-    return {"status": "healthy", "time_utc": datetime.now(timezone.utc).isoformat()}
+    # 503 until the model is loaded and hot locations are warm, so load
+    # balancers only route traffic to warm workers
+    ready = warmup.is_ready()
+    body = {
+        "status": "healthy" if ready else "warming",
+        "ready": ready,
+        "time_utc": datetime.now(timezone.utc).isoformat(),
+        "caches": warmup.warmth(),
+        "upstream": {"power": upstream_status(), "power_hourly": hourly_upstream_status()},
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
 
 # routers
 # If you have a meta router, include it (optional)
@@ -1,21 +1,22 @@
 from __future__ import annotations
-from fastapi import APIRouter, HTTPException
+from datetime import date, timedelta
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
-from typing import Dict
-from datetime import datetime
-from pathlib import Path
+from typing import Dict, Optional
 
-from services.models.evs_model import EVSModel
-from services.features import build_features
-from services.power import fetch_power_point
+import numpy as np
+import pandas as pd
+
+from services.features import build_feature_frame
+from services.models.evs_model import default_model
+from services.power import PowerUnavailable, fetch_power_history, history_version
+from utils.http_cache import canonical_key, cached_json
+from services.realtime import realtime_snapshot, NoRecentData
+from services.llm import llm_brief
 
 router = APIRouter(prefix="/api/ai", tags=["AI"])
 
-ROOT = Path(__file__).resolve().parents[1]
-MODEL = EVSModel(
-    model_path=str(ROOT / "models" / "evs_clf.joblib"),
-    meta_path=str(ROOT / "models" / "evs_meta.joblib"),
-)
+MODEL = default_model()
 
 class ScoreReq(BaseModel):
     feats: Dict[str, float] = Field(..., description="flat features dict")
@@ -28,34 +29,82 @@ def ai_score(req: ScoreReq):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-from datetime import datetime, timedelta
-
 @router.get("/realtime")
-def ai_realtime(lat: float, lon: float):
+def ai_realtime(lat: float, lon: float, include: str = ""):
+    """
+    Realtime EVS score for the last 7 POWER days.
+    include=brief also returns the ops brief (same payload as GET /api/llm/brief),
+    so the insight card needs one round-trip instead of two.
+    """
+    extras = {x.strip() for x in include.split(",") if x.strip()}
+    if extras - {"brief"}:
+        raise HTTPException(status_code=400, detail="include must be empty or 'brief'")
     try:
-        end_dt = datetime.utcnow() - timedelta(hours=18)
-        start_dt = end_dt - timedelta(days=6)   # 7 day window total
-        start = start_dt.strftime("%Y%m%d")
-        end = end_dt.strftime("%Y%m%d")
-
-        df = fetch_power_point(lat, lon, start=start, end=end)
-
-        # POWER uses -999 for missing stuff (so itll be inacc if missing bruh))
-        import numpy as np
-        df = df.replace(-999, np.nan).dropna(how="any")
-        if df.empty:
-            raise HTTPException(status_code=404, detail="No valid POWER rows in the last 7 days.")
-
-        row = df.sort_index().iloc[-1].to_dict()
-        feats = build_features(row, end_dt)
-        out = MODEL.predict(feats)
-        return {
+        # last 7 complete POWER days for this cell (shared cache with /api/llm/brief)
+        snap = realtime_snapshot(lat, lon)
+        conf = [snap.out.p_low, snap.out.p_high]
+        out = {
             "location": [lat, lon],
-            "features_used": feats,
-            "p_ge_70": out.p,
-            "conf": [out.p_low, out.p_high],
+            "features_used": snap.feats,
+            "p_ge_70": snap.out.p,
+            "conf": conf,
         }
-    except HTTPException:
-        raise
+        if "brief" in extras:
+            out["brief"] = llm_brief(snap.feats, snap.out.p, conf, [lat, lon])
+        return out
+    except NoRecentData as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PowerUnavailable:
+        raise  # 503 UPSTREAM_UNAVAILABLE (app.py)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/backtest")
+def ai_backtest(request: Request, lat: float, lon: float,
+                start: Optional[date] = None, end: Optional[date] = None):
+    """
+    Model p_ge_70 for every day in [start, end] at (lat, lon) — default the last
+    365 days of POWER history — from one history fetch, one vectorized feature
+    pass and one batched predict. Days with a missing POWER input get null.
+    """
+    try:
+        series = fetch_power_history(lat, lon)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if series.empty:
+        raise HTTPException(status_code=502, detail="POWER returned no data for this point")
+    end = min(end or series.end, series.end)
+    start = max(start or end - timedelta(days=364), series.start)
+    if start > end:
+        raise HTTPException(status_code=400, detail=f"no POWER history in range; available {series.start}..{series.end}")
+
+    key = canonical_key("backtest", {
+        "data": history_version(lat, lon), "lat": lat, "lon": lon,
+        "start": start.isoformat(), "end": end.isoformat(), "model": MODEL.backend,
+    })
+    return cached_json(request, key, lambda: _backtest_body(series, lat, lon, start, end))
+
+def _backtest_body(series, lat: float, lon: float, start: date, end: date) -> dict:
+    i0, i1 = (start - series.start).days, (end - series.start).days + 1
+    days = pd.date_range(start, end, freq="D")
+    raw = pd.DataFrame({c: series.values(c)[i0:i1] for c in series.columns}, index=days)
+    feats = build_feature_frame(raw)
+    X = feats[MODEL.feat_names].to_numpy(dtype=float)
+    ok = ~np.isnan(X).any(axis=1)
+    p = np.full(len(X), np.nan)
+    p[ok] = MODEL.predict_batch(X[ok])
+    valid = p[ok]
+    return {
+        "location": [lat, lon],
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "dates": [d.isoformat() for d in days.date],
+        "p_ge_70": [None if np.isnan(v) else float(v) for v in p],
+        "summary": {
+            "days": int(len(p)),
+            "missing_days": int((~ok).sum()),
+            "mean": float(valid.mean()) if valid.size else None,
+            "share_ge_0_5": float((valid >= 0.5).mean()) if valid.size else None,
+        },
+        "meta": {"model": MODEL.backend, "band": MODEL.band, "sources": ["NASA POWER daily (1981–present)"]},
+    }
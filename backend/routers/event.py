@@ -2,30 +2,295 @@
 from __future__ import annotations
 
 import os
-from typing import Dict, List
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from uuid import uuid4
 from datetime import datetime, timedelta, timezone, date as Date
 
 import numpy as np
 import pandas as pd
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
-from schemas.event import EventRequest, EventResponse, CellOut, EVSComponent, Aggregate
+from schemas.event import (
+    EventRequest, EventResponse, Aggregate,
+    BestDatesRequest, BestDatesResponse, BestDate,
+)
 from schemas.common import UnitsMeta
 from utils.timebins import enumerate_bins
 from services.sampling import sample_points
-from services.poe_expect import expected_evs_for_day
+from services.power import (
+    fetch_power_history, history_version, history_stale, power_cell, prefetch_region_history,
+    PowerError, PowerUnavailable, HISTORY_CACHE,
+)
+from services.poe_expect import (
+    ExpectedEVS, DEFAULT_THRESHOLDS, NEUTRAL_SUBS, SUBSCORES, EXCEEDANCE_CACHE, cell_exceedance_table,
+    expected_evs_from_table, expected_evs_all_days, evs_from_count_arrays, observed_daily_counts,
+)
+from services.poe_hourly import (
+    HOURLY_THRESHOLDS, cached_hourly_table, cell_hourly_table, hourly_bin_evs, observed_years,
+)
+from services.power_hourly import cached_chunk, climo_years, hourly_chunks, hourly_stale, hourly_version
+from services.event_store import get_event_store
+from utils.http_cache import canonical_key, cached_json
+from utils.jsonfast import dumps
+from utils.resilience import remaining_budget, time_budget
+
+logger = logging.getLogger("uvicorn")
 
 router = APIRouter(tags=["event"])
-EVENT_CACHE: Dict[str, dict] = {}
+# server-side latency budget for /api/event (ms, 0 = none); requests may set deadline_ms
+EVENT_DEADLINE_MS = int(os.getenv("EVENT_DEADLINE_MS", "8000"))
+# most sub-daily bins one hourly request may score (2000 = ~41 days at 30 min)
+EVENT_MAX_HOURLY_BINS = int(os.getenv("EVENT_MAX_HOURLY_BINS", "2000"))
+# cold cells load here in parallel; a load cut off by a request deadline keeps
+# going and fills the caches, so a cell slower than the deadline still warms up
+EVENT_WARM_WORKERS = int(os.getenv("EVENT_WARM_WORKERS", "4"))
+_WARM_POOL = ThreadPoolExecutor(max_workers=EVENT_WARM_WORKERS, thread_name_prefix="event-warm")
 
 def _unique_dates(times: List[datetime]) -> List[Date]:
     # Sort and dedupe to one entry per calendar day (UTC)
     dates = sorted({t.astimezone(timezone.utc).date() for t in times})
     return list(dates)
 
-@router.post("/event", response_model=EventResponse)
-def event(req: EventRequest):
+# score axis of the cells × times × scores matrix
+SCORE_KEYS = ("total",) + SUBSCORES
+
+@dataclass
+class _Axis:
+    """The event's time axis and where its scores come from."""
+    times_iso: List[str]
+    step_min: int
+    # "climo": climatology; "reanalysis": POWER's observed values where it has them
+    source: str
+    # False: one time per UTC date (dates); True: one per sub-daily bin (starts)
+    hourly: bool = False
+    dates: List[Date] = field(default_factory=list)
+    starts: List[datetime] = field(default_factory=list)
+    # complete years pooled for hourly climatology; years observed bins fall in
+    climo_years: List[int] = field(default_factory=list)
+    observed_years: List[int] = field(default_factory=list)
+
+def _evs_matrix(grid: List[Any]) -> np.ndarray:
+    """
+    cells × times × SCORE_KEYS float64 matrix from rows of ExpectedEVS or
+    times × SCORE_KEYS arrays; rows shared by cells of one POWER cell convert once.
+    """
+    rows: Dict[int, np.ndarray] = {}
+    out = []
+    for row in grid:
+        m = rows.get(id(row))
+        if m is None and isinstance(row, np.ndarray):
+            m = rows[id(row)] = row
+        elif m is None:
+            m = rows[id(row)] = np.array(
+                [[r.total, *(r.subs[k] for k in SUBSCORES)] for r in row], dtype=np.float64,
+            ).reshape(len(row), len(SCORE_KEYS))
+        out.append(m)
+    return np.stack(out) if out else np.empty((0, 0, len(SCORE_KEYS)))
+
+def _nested_cells(pts, evs: np.ndarray, approx: List[Optional[str]],
+                  first_id: int = 0) -> List[Dict[str, Any]]:
+    """Plain-dict equivalent of List[CellOut] (what /export reads back)."""
+    return [
+        {
+            "cell_id": first_id + cid, "lon": lon, "lat": lat,
+            "evs": [{"t": ti, **dict(zip(SCORE_KEYS, r))} for ti, r in enumerate(rows)],
+            "approx": approx[cid],
+        }
+        for cid, ((lon, lat), rows) in enumerate(zip(pts, evs.tolist()))
+    ]
+
+def _columnar_payload(event_id: str, times_iso, pts, evs: np.ndarray, approx,
+                      aggregates: Dict[str, np.ndarray], meta: UnitsMeta) -> Dict[str, Any]:
+    """
+    Compact layout: cell ids/coords as parallel arrays and one cells × times
+    matrix per score, so lon/lat and key names are not repeated per cell.
+    """
+    return {
+        "event_id": event_id,
+        "layout": "columnar",
+        "times": times_iso,
+        "cells": {
+            "cell_id": list(range(len(pts))),
+            "lon": [p[0] for p in pts],
+            "lat": [p[1] for p in pts],
+            "approx": approx,
+        },
+        "evs": {k: evs[:, :, j].tolist() for j, k in enumerate(SCORE_KEYS)},
+        "aggregates": {"t": list(range(len(times_iso))), **{k: v.tolist() for k, v in aggregates.items()}},
+        "meta": meta.model_dump(),
+    }
+
+def _fetched(fetch, cached, cell: Tuple[int, int], lat: float, lon: float):
+    """Cached value, else fetch it now."""
+    hit = cached(cell)
+    return hit if hit is not None else fetch(lat, lon)
+
+def _cached(fetch, cached, cell: Tuple[int, int], lat: float, lon: float):
+    """Cached value or None; never calls POWER."""
+    return cached(cell)
+
+def _observe_daily(row, series, axis: _Axis, thresholds: Dict[str, float]) -> Tuple[np.ndarray, int]:
+    """
+    Reanalysis over a climatology row: dates POWER has observations for are
+    scored from them; the rest keep climatology. Returns (row, fallback dates).
+    """
+    m = _evs_matrix([row])[0].copy()
+    ex, va = observed_daily_counts(series, axis.dates, thresholds)
+    seen = va.max(axis=0) > 0
+    m[seen] = evs_from_count_arrays(ex[:, seen], va[:, seen])
+    return m, int(len(axis.dates) - seen.sum())
+
+def _cached_chunks(cell: Tuple[int, int], years: List[int]):
+    chunks = {y: cached_chunk(cell, y) for y in years}
+    return None if any(c is None for c in chunks.values()) else chunks
+
+def _cell_row(axis: _Axis, cell: Tuple[int, int], lat: float, lon: float, window_days: int,
+              load=_fetched) -> Optional[Tuple[Any, int]]:
+    """
+    One POWER cell's scores over the event's times, and how many times fell
+    back to climatology in reanalysis mode. With load=_cached only cached
+    data is used and None means some of it is missing.
+    """
+    if axis.hourly:
+        thr = HOURLY_THRESHOLDS
+        years = axis.climo_years
+        table = load(lambda la, lo: cell_hourly_table(la, lo, thr, years),
+                     lambda c: cached_hourly_table(c, thr, years), cell, lat, lon)
+        if table is None:
+            return None
+        observed = None
+        if axis.source == "reanalysis":
+            observed = load(lambda la, lo: hourly_chunks(cell, axis.observed_years),
+                            lambda c: _cached_chunks(c, axis.observed_years), cell, lat, lon)
+            if observed is None:
+                return None
+        return hourly_bin_evs(table, axis.starts, axis.step_min, window_days, observed=observed, thresholds=thr)
+
+    table = load(cell_exceedance_table, EXCEEDANCE_CACHE.get, cell, lat, lon)
+    if table is None:
+        return None
+    row = [expected_evs_from_table(table, d, window_days) for d in axis.dates]
+    if axis.source != "reanalysis":
+        return row, 0
+    series = load(fetch_power_history, _cached_series, cell, lat, lon)
+    return None if series is None else _observe_daily(row, series, axis, DEFAULT_THRESHOLDS)
+
+def _wait_left(deadline: float) -> Optional[float]:
+    """Seconds cell loads may still be waited for (None = no limit): to the deadline, within the request's budget."""
+    left = None if deadline == float("inf") else deadline - time.time()
+    budget = remaining_budget()
+    if budget is not None:
+        left = budget if left is None else min(left, budget)
+    return left
+
+def _computed_cells(axis: _Axis, cells: Dict[Tuple[int, int], Tuple[float, float]], window_days: int,
+                    deadline: float) -> Iterator[Tuple[Tuple[int, int], Tuple[Any, int]]]:
+    """
+    Yield (cell, (row, fallback count)) for every cell computed by `deadline`:
+    cells with cached data first, then cold ones in completion order. Cold
+    cells all start loading at once in the warm pool (EVENT_WARM_WORKERS at a
+    time), outside the request's time budget; a load still running at the
+    deadline is not cancelled and fills the caches for later requests.
+    """
+    ready = []
+    pending = {}
+    for cell, (lat, lon) in cells.items():
+        got = _cell_row(axis, cell, lat, lon, window_days, load=_cached)
+        if got is not None:
+            ready.append((cell, got))
+        else:
+            pending[_WARM_POOL.submit(_cell_row, axis, cell, lat, lon, window_days)] = cell
+    yield from ready
+    while pending:
+        left = _wait_left(deadline)
+        if left is not None and left <= 0:
+            return
+        done, _ = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+        for fut in done:
+            cell = pending.pop(fut)
+            try:
+                got = fut.result()
+            except PowerUnavailable:
+                if time.time() < deadline:
+                    raise
+                continue
+            if got is not None:
+                yield cell, got
+
+def _iter_cells(pts, axis: _Axis, window_days: int, deadline: float,
+                fallbacks: Dict[Tuple[int, int], int]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Yield (cell index, EVS per time, approximation marker) as each sample point's
+    POWER cell is computed (see _computed_cells); points sharing a cell reuse
+    its row. Points whose cell was not computed by the deadline come last,
+    filled from the nearest computed point ("nearest") or neutral scores if
+    none ("neutral"). Each computed cell's climatology fallback count lands
+    in `fallbacks`.
+    """
+    cells: Dict[Tuple[int, int], Tuple[float, float]] = {}
+    members: Dict[Tuple[int, int], List[int]] = {}
+    for i, (lon, lat) in enumerate(pts):
+        cell = power_cell(lat, lon)
+        cells.setdefault(cell, (lat, lon))
+        members.setdefault(cell, []).append(i)
+    by_cell: Dict[Tuple[int, int], Any] = {}
+    done: List[int] = []
+    for cell, (row, fallback) in _computed_cells(axis, cells, window_days, deadline):
+        by_cell[cell], fallbacks[cell] = row, fallback
+        for i in members[cell]:
+            done.append(i)
+            yield i, row, None
+    for i, (lon, lat) in enumerate(pts):
+        if power_cell(lat, lon) not in by_cell:
+            yield (i, *_approximate(pts, i, done, by_cell, len(axis.times_iso)))
+
+def _approximate(pts, i: int, done: List[int], by_cell, n_times: int) -> Tuple[Any, str]:
+    if not done:
+        return [ExpectedEVS(total=50.0, subs=dict(NEUTRAL_SUBS)) for _ in range(n_times)], "neutral"
+    lon, lat = pts[i]
+    j = min(done, key=lambda k: (pts[k][0] - lon) ** 2 + (pts[k][1] - lat) ** 2)
+    return by_cell[power_cell(pts[j][1], pts[j][0])], "nearest"
+
+def _grid_by_deadline(pts, axis: _Axis, window_days: int, deadline: float) -> Tuple[np.ndarray, List[Optional[str]], int]:
+    """
+    cells × times × SCORE_KEYS EVS matrix from POWER (same engine as PoE), each
+    cell's approximation marker (None = computed), and the most times any
+    computed cell scored from climatology because reanalysis had no data.
+
+    Daily: O(1) lookups in each cell's precomputed exceedance table. Hourly:
+    lookups in each cell's hour-of-day exceedance table (poe_hourly).
+
+    Cells are computed as in _iter_cells, which this collects: once per POWER
+    cell, cold ones loaded in parallel until `deadline` (epoch seconds), the
+    rest approximated once it has passed.
+    """
+    grid: List[Any] = [None] * len(pts)
+    approx: List[Optional[str]] = [None] * len(pts)
+    fallbacks: Dict[Tuple[int, int], int] = {}
+    for i, row, marker in _iter_cells(pts, axis, window_days, deadline, fallbacks):
+        grid[i], approx[i] = row, marker
+    return _evs_matrix(grid), approx, max(fallbacks.values(), default=0)
+
+def _cached_series(cell: Tuple[int, int]):
+    hit = HISTORY_CACHE.get(cell)
+    return hit[0] if hit is not None else None
+
+def _deadline(req: EventRequest) -> float:
+    deadline_ms = req.deadline_ms or EVENT_DEADLINE_MS
+    return time.time() + deadline_ms / 1000.0 if deadline_ms else float("inf")
+
+def _prepare(req: EventRequest):
+    """
+    Validate the request; returns (pts, axis, window_days, coerced).
+    Sub-daily steps are scored per bin from hourly POWER data when req.hourly,
+    else coerced to daily. mode="reanalysis" scores observed values;
+    "climo" and "forecast" (no forecast source here) score climatology.
+    """
     if req.geometry_type not in {"area", "route"}:
         raise HTTPException(status_code=400, detail="geometry_type must be 'area' or 'route'")
 
@@ -37,10 +302,29 @@ def event(req: EventRequest):
     if not times_dt:
         raise HTTPException(status_code=400, detail="No time bins. Check duration_min/step_min.")
 
-    # POWER is daily; coerce to daily unique dates
-    dates = _unique_dates(times_dt)
-    times_iso = [datetime(d.year, d.month, d.day, tzinfo=timezone.utc).isoformat() for d in dates]
-    coerced = any(req.step_min < 1440 for _ in [0])  # True if user asked for sub-daily
+    source = "reanalysis" if req.mode == "reanalysis" else "climo"
+    if req.hourly and req.step_min < 1440:
+        if len(times_dt) > EVENT_MAX_HOURLY_BINS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many time bins ({len(times_dt)}); hourly requests allow {EVENT_MAX_HOURLY_BINS}. "
+                       "Increase step_min or shorten duration_min.",
+            )
+        starts = [t.astimezone(timezone.utc) for t in times_dt]
+        axis = _Axis(
+            times_iso=[t.isoformat() for t in starts], step_min=req.step_min, source=source, hourly=True,
+            starts=starts, climo_years=climo_years(),
+            observed_years=observed_years(starts, req.step_min) if source == "reanalysis" else [],
+        )
+        coerced = False
+    else:
+        # daily POWER: coerce to daily unique dates
+        dates = _unique_dates(times_dt)
+        axis = _Axis(
+            times_iso=[datetime(d.year, d.month, d.day, tzinfo=timezone.utc).isoformat() for d in dates],
+            step_min=1440, source=source, dates=dates,
+        )
+        coerced = req.step_min < 1440  # True if user asked for sub-daily
     window_days = int(os.getenv("CLIMO_WINDOW_DAYS", "14"))
 
     # Sample points along route or within area
@@ -50,81 +334,350 @@ def event(req: EventRequest):
         raise HTTPException(status_code=400, detail=f"Invalid geometry: {e}")
     if not pts:
         raise HTTPException(status_code=400, detail="No sample points found for geometry.")
+    return pts, axis, window_days, coerced
+
+def _prefetch_area(req: EventRequest, axis: _Axis, pts, deadline: float) -> None:
+    # Areas: pull all cold cells' history with regional (bounding-box) calls
+    # instead of one point fetch per cell; any failure falls back to the latter.
+    if req.geometry_type != "area" or axis.hourly:
+        return
+    try:
+        with time_budget(deadline - time.time() if deadline != float("inf") else None):
+            prefetch_region_history(pts)
+    except PowerError as e:
+        logger.warning("regional POWER prefetch failed, using point fetches: %s", e)
+
+@router.post("/event", response_model=EventResponse)
+def event(req: EventRequest, request: Request, layout: str = "nested"):
+    """
+    layout=nested (default): EventResponse with one CellOut per cell.
+    layout=columnar: parallel arrays + cells × times matrices (see _columnar_payload),
+    encoded without pydantic validation.
+    Responses carry an ETag and Cache-Control; repeats are served from the response cache.
+    Being POST, they are not cached by browsers/CDNs: a 304 needs a client
+    that sends If-None-Match itself.
+    Cells not computed by deadline_ms (default EVENT_DEADLINE_MS) are approximated
+    and flagged; such responses are not cached.
+    """
+    deadline = _deadline(req)
+    if layout not in {"nested", "columnar"}:
+        raise HTTPException(status_code=400, detail="layout must be 'nested' or 'columnar'")
+    pts, axis, window_days, coerced = _prepare(req)
+    _prefetch_area(req, axis, pts, deadline)
+
+    # Same corridor + window + POWER data → same answer: serve it from the
+    # response cache (and 304 on a matching If-None-Match) instead of recomputing.
+    build = lambda: _event_payload(req, layout, pts, axis, window_days, coerced, deadline)
+    versions = _data_versions(axis, pts)
+    if any(v.endswith("cold") for v in versions):
+        # what a cold cell's data will be is only known once it loads: compute
+        # first, then key (and ETag) the answer by the data it was built from
+        payload = build()
+        build = lambda: payload
+        versions = _data_versions(axis, pts)
+    key = canonical_key("event", {
+        "req": req.model_dump(exclude={"deadline_ms"}),
+        "layout": layout,
+        "window_days": window_days,
+        "data": versions,
+    })
+    return cached_json(
+        request, key, build,
+        cacheable=lambda payload: not payload["meta"]["extra"]["approximated_cells"],
+    )
+
+def _data_versions(axis: _Axis, pts) -> List[str]:
+    """
+    The POWER data behind the answer (see history_version / hourly_version),
+    without fetching; a cell not loaded yet has a version ending in "cold".
+    """
+    if not axis.hourly:
+        return sorted({history_version(lat, lon, fetch=False) for (lon, lat) in pts})
+    cells = {power_cell(lat, lon) for (lon, lat) in pts}
+    out = {hourly_version(c, axis.climo_years) for c in cells}
+    if axis.observed_years:
+        out |= {"obs:" + hourly_version(c, axis.observed_years) for c in cells}
+    return sorted(out)
+
+def _remember(event_id: str, payload: Dict[str, Any]) -> None:
+    """Keep the nested result for /api/event/{id}/export (any worker can serve it)."""
+    try:
+        get_event_store().put(event_id, payload)
+    except Exception as e:
+        logger.warning("event store: could not save %s: %s", event_id, e)
 
-    # Compute EVS list per cell and date using POWER climatology (same engine as PoE)
-    cells: List[CellOut] = []
-    for cid, (lon, lat) in enumerate(pts):
-        evs_list: List[EVSComponent] = []
-        for ti, d in enumerate(dates):
-            res = expected_evs_for_day(lat, lon, d, window_days=window_days)
-            evs_list.append(EVSComponent(
-                t=ti,
-                total=res.total,
-                rain=res.subs["rain"],
-                wind=res.subs["wind"],
-                heat=res.subs["heat"],
-                humidity=res.subs["humidity"],
-            ))
-        cells.append(CellOut(cell_id=cid, lon=lon, lat=lat, evs=evs_list))
-
-    # Aggregates per daily bin
+def _aggregate(evs: np.ndarray, evs_min: float) -> Dict[str, np.ndarray]:
+    """Per-date corridor aggregates, reduced over the cells axis of the EVS matrix."""
+    total = evs[:, :, 0]
+    q = np.quantile(total, [0.1, 0.5, 0.9], axis=0)
+    sub_mean = evs[:, :, 1:].mean(axis=0)  # dates × SUBSCORES
+    worst = sub_mean.argmin(axis=1)
+    return {
+        "coverage_ge_70": (total >= evs_min).mean(axis=0),
+        "mean": total.mean(axis=0),
+        "min": total.min(axis=0),
+        "p10": q[0],
+        "p50": q[1],
+        "p90": q[2],
+        # subscore with the lowest corridor mean: what drags the date down
+        "worst_driver": np.asarray(SUBSCORES)[worst],
+        "worst_driver_mean": sub_mean[np.arange(len(worst)), worst],
+    }
+
+def _aggregate_rows(agg: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Aggregate arrays → List[Aggregate] dicts (the nested response shape)."""
+    cols = {k: v.tolist() for k, v in agg.items()}
+    n = len(cols["mean"])
+    return [Aggregate(t=ti, **{k: v[ti] for k, v in cols.items()}).model_dump() for ti in range(n)]
+
+def _stale(axis: _Axis, lat: float, lon: float) -> bool:
+    if axis.hourly:
+        # climatology chunks are complete years; only observed current-year data ages
+        return hourly_stale(power_cell(lat, lon), axis.observed_years)
+    return history_stale(lat, lon)
+
+def _summarize(req: EventRequest, pts, evs: np.ndarray, approx: List[Optional[str]], axis: _Axis,
+               window_days: int, coerced: bool, fallback: int) -> Tuple[Dict[str, np.ndarray], UnitsMeta]:
+    """Per-time aggregates over all cells, plus units/provenance meta."""
+    times_iso = axis.times_iso
     evs_min = (req.thresholds or {}).get("evs_min", 70)
-    aggregates: List[Aggregate] = []
-    means_for_best = []
-    for ti in range(len(dates)):
-        vals = [c.evs[ti].total for c in cells if ti < len(c.evs)]
-        if not vals:
-            aggregates.append(Aggregate(t=ti, coverage_ge_70=0.0, mean=0.0, min=0.0))
-            means_for_best.append(0.0)
-            continue
-        n = len(vals)
-        coverage = sum(1 for v in vals if v >= evs_min) / n
-        mean = sum(vals) / n
-        minv = min(vals)
-        aggregates.append(Aggregate(t=ti, coverage_ge_70=coverage, mean=mean, min=minv))
-        means_for_best.append(mean)
-    best_idx = int(np.argmax(means_for_best)) if means_for_best else 0
+    aggregates = _aggregate(evs, evs_min)
+    best_idx = int(np.argmax(aggregates["mean"])) if len(times_iso) else 0
 
     # Provenance / notes
     units_map = {
         "evs": "0–100",
-        "rain_mm_day": "mm/day",
+        **({"rain_mm_hr": "mm/hr"} if axis.hourly else {"rain_mm_day": "mm/day"}),
         "wind_mph": "mph",
         "heatindex_F": "°F",
         "rh_pct": "%"
     }
-    sources = ["NASA POWER daily point climatology (1981–present)"]
-    notes = (
-        "Event Corridor computed from climatological probabilities around the same day-of-year. "
+    if axis.hourly:
+        span = f"{axis.climo_years[0]}–{axis.climo_years[-1]}" if axis.climo_years else "none"
+        sources = [f"NASA POWER hourly point climatology ({span}, UTC)"]
+        if axis.source == "reanalysis":
+            sources.append("NASA POWER hourly point observations (reanalysis)")
+        notes = (
+            "Event Corridor computed per time bin from hourly climatology: the same UTC hours "
+            "around the same day-of-year. "
+        )
+    else:
+        sources = ["NASA POWER daily point climatology (1981–present)"]
+        if axis.source == "reanalysis":
+            sources.append("NASA POWER daily point observations (reanalysis)")
+        notes = "Event Corridor computed from climatological probabilities around the same day-of-year. "
+    notes += (
         "We convert the probability of 'bad' conditions into expected subscores, then combine to EVS. "
         f"Window ±{window_days} days. "
+        + ("Observed values are scored where POWER has them (reanalysis); other times use climatology. "
+           if axis.source == "reanalysis" else "")
+        + ("No forecast source; forecast mode is served from climatology. " if req.mode == "forecast" else "")
         + ("Step coerced to daily for POWER-based corridor. " if coerced else "")
-        + f"Best date: index {best_idx} at {times_iso[best_idx]}."
+        + f"Best {'time' if axis.hourly else 'date'}: index {best_idx} at {times_iso[best_idx]}."
     )
 
-    event_id = uuid4().hex[:8]
-    resp = EventResponse(
-        event_id=event_id,
-        times=times_iso,
-        cells=cells,
-        aggregates=aggregates,
+    meta = UnitsMeta(
+        units=units_map,
+        sources=sources,
+        notes=notes,
+        extra={
+            "mode": "event_corridor",  # label for UI
+            "best_time_idx": best_idx,
+            "best_time_iso": times_iso[best_idx],
+            "climo_window_days": window_days,
+            "coerced_to_daily": coerced,
+            # mode asked for vs. what scored it ("climo" | "reanalysis"), and the time axis
+            "requested_mode": req.mode,
+            "source_mode": axis.source,
+            "hourly": axis.hourly,
+            "step_min": axis.step_min,
+            "hourly_years": [axis.climo_years[0], axis.climo_years[-1]] if axis.hourly and axis.climo_years else None,
+            # reanalysis: most times a computed cell scored from climatology (no observations yet)
+            "climo_fallback_bins": fallback,
+            # POWER cells whose history (hourly: current-year chunk) is past its refresh TTL
+            "stale_cells": len({
+                power_cell(lat, lon) for (lon, lat), a in zip(pts, approx) if not a and _stale(axis, lat, lon)
+            }),
+            # cells filled from a neighbour / neutral scores after the deadline (see CellOut.approx)
+            "approximated_cells": sum(1 for a in approx if a),
+        },
+    )
+    return aggregates, meta
+
+def _event_payload(req: EventRequest, layout: str, pts, axis: _Axis,
+                   window_days: int, coerced: bool, deadline: float) -> Dict[str, Any]:
+    evs, approx, fallback = _grid_by_deadline(pts, axis, window_days, deadline)
+    aggregates, meta = _summarize(req, pts, evs, approx, axis, window_days, coerced, fallback)
+    times_iso = axis.times_iso
+    event_id = uuid4().hex
+
+    # nested EventResponse shape, built from the matrix without per-cell models
+    payload = {
+        "event_id": event_id,
+        "times": times_iso,
+        "cells": _nested_cells(pts, evs, approx),
+        "aggregates": _aggregate_rows(aggregates),
+        "meta": meta.model_dump(),
+    }
+    _remember(event_id, payload)
+    if layout == "columnar":
+        return _columnar_payload(event_id, times_iso, pts, evs, approx, aggregates, meta)
+    return payload
+
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def _frame(fmt: str, kind: str, data: Dict[str, Any]) -> bytes:
+    if fmt == "sse":
+        return b"event: " + kind.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+    return dumps({"type": kind, **data}) + b"\n"
+
+@router.post("/event/stream")
+def event_stream(req: EventRequest, format: str = "ndjson"):
+    """
+    Streaming /api/event: same corridor, sent as it is computed.
+    format=ndjson: one JSON object per line, {"type": ...} first.
+    format=sse: server-sent events, the type as the event name.
+
+    Messages, in order:
+      start    {event_id, times, cells: n}
+      cell     {cell: CellOut} — one per sample point, as soon as its POWER cell
+               is done; approximated cells (deadline passed) come last
+      summary  {event_id, aggregates, meta} — meta.extra adds
+               time_to_first_cell_ms and total_ms
+      error    {error: {code, message, details, hint}} if computing fails mid-stream
+    The complete result lands in the export cache under event_id, as with /api/event.
+    """
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    deadline = _deadline(req)
+    pts, axis, window_days, coerced = _prepare(req)
+    times_iso = axis.times_iso
+    event_id = uuid4().hex
+
+    def frames():
+        t0 = time.perf_counter()
+        yield _frame(format, "start", {"event_id": event_id, "times": times_iso, "cells": len(pts)})
+        evs = np.zeros((len(pts), len(times_iso), len(SCORE_KEYS)))
+        approx: List[Optional[str]] = [None] * len(pts)
+        fallbacks: Dict[Tuple[int, int], int] = {}
+        first_ms: Optional[float] = None
+        try:
+            _prefetch_area(req, axis, pts, deadline)
+            for i, row, marker in _iter_cells(pts, axis, window_days, deadline, fallbacks):
+                evs[i], approx[i] = _evs_matrix([row])[0], marker
+                if first_ms is None:
+                    first_ms = round((time.perf_counter() - t0) * 1000, 1)
+                yield _frame(format, "cell", {"cell": _nested_cells([pts[i]], evs[i:i + 1], [marker], first_id=i)[0]})
+            aggregates, meta = _summarize(req, pts, evs, approx, axis, window_days, coerced,
+                                          max(fallbacks.values(), default=0))
+        except PowerUnavailable as e:
+            logger.warning("event stream %s: POWER unavailable: %s", event_id, e)
+            yield _frame(format, "error", {"error": {
+                "code": "UPSTREAM_UNAVAILABLE",
+                "message": "NASA POWER is unavailable and no cached data covers this request.",
+                "details": {"reason": str(e)}, "hint": "Try again shortly.",
+            }})
+            return
+        except Exception as e:
+            logger.exception("event stream %s failed", event_id)
+            yield _frame(format, "error", {"error": {
+                "code": "INTERNAL_ERROR", "message": str(e), "details": {}, "hint": None,
+            }})
+            return
+        total_ms = round((time.perf_counter() - t0) * 1000, 1)
+        meta.extra.update(time_to_first_cell_ms=first_ms, total_ms=total_ms)
+        summary = {"event_id": event_id, "aggregates": _aggregate_rows(aggregates), "meta": meta.model_dump()}
+
+        _remember(event_id, {
+            "event_id": event_id,
+            "times": times_iso,
+            "cells": _nested_cells(pts, evs, approx),
+            "aggregates": summary["aggregates"],
+            "meta": summary["meta"],
+        })
+        logger.info("event stream %s: %d cells, first cell %.1f ms, total %.1f ms",
+                    event_id, len(pts), first_ms or 0.0, total_ms)
+        yield _frame(format, "summary", summary)
+
+    # app.py leaves this path uncompressed, so frames are not buffered
+    return StreamingResponse(frames(), media_type=STREAM_FORMATS[format], headers={
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",
+    })
+
+MAX_SEARCH_DAYS = 366
+
+@router.post("/event/best-dates", response_model=BestDatesResponse)
+def best_dates(req: BestDatesRequest):
+    """
+    Season-wide date search: score every day in [start_date, end_date] for the
+    corridor and return the top_k by EVS coverage, then corridor mean.
+    Each POWER cell's 366 DOY scores come from one vectorized sweep over its
+    exceedance table, so the cost barely depends on the range length.
+    """
+    if req.geometry_type not in {"area", "route"}:
+        raise HTTPException(status_code=400, detail="geometry_type must be 'area' or 'route'")
+    try:
+        d0 = Date.fromisoformat(req.start_date[:10])
+        d1 = Date.fromisoformat(req.end_date[:10])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid dates: {e}")
+    n_days = (d1 - d0).days + 1
+    if n_days < 1 or n_days > MAX_SEARCH_DAYS:
+        raise HTTPException(status_code=400, detail=f"end_date must be within {MAX_SEARCH_DAYS} days on/after start_date")
+    window_days = int(os.getenv("CLIMO_WINDOW_DAYS", "14"))
+
+    try:
+        pts = sample_points(req.geometry_type, req.geometry_geojson)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid geometry: {e}")
+    if not pts:
+        raise HTTPException(status_code=400, detail="No sample points found for geometry.")
+
+    # cells × 366 score matrices (one sweep per distinct table)
+    sweeps: Dict[int, tuple] = {}
+    totals, subs = [], []
+    for (lon, lat) in pts:
+        t = cell_exceedance_table(lat, lon)
+        if id(t) not in sweeps:
+            sweeps[id(t)] = expected_evs_all_days(t, window_days)
+        tot, sub = sweeps[id(t)]
+        totals.append(tot)
+        subs.append(sub)
+    totals = np.stack(totals)                 # [cells, 366]
+    subs = np.stack(subs)                     # [cells, 4, 366]
+
+    cand = [d0 + timedelta(days=i) for i in range(n_days)]
+    cols = np.array([d.timetuple().tm_yday % 366 for d in cand])
+    tot_c = totals[:, cols]                   # [cells, days]
+    evs_min = (req.thresholds or {}).get("evs_min", 70)
+    coverage = (tot_c >= evs_min).mean(axis=0)
+    mean = tot_c.mean(axis=0)
+    minv = tot_c.min(axis=0)
+    sub_mean = subs[:, :, cols].mean(axis=0)  # [4, days]
+
+    order = np.lexsort((-mean, -coverage))[: req.top_k]
+    best = [
+        BestDate(
+            date=cand[i].isoformat(),
+            coverage_ge_70=float(coverage[i]),
+            mean=float(mean[i]),
+            min=float(minv[i]),
+            **{k: float(sub_mean[j, i]) for j, k in enumerate(SUBSCORES)},
+        )
+        for i in order
+    ]
+    return BestDatesResponse(
+        best=best,
+        candidates=n_days,
+        cells=len(pts),
         meta=UnitsMeta(
-            units=units_map,
-            sources=sources,
-            notes=notes,
-            extra={
-                "mode": "event_corridor",  # label for UI
-                "best_time_idx": best_idx,
-                "best_time_iso": times_iso[best_idx],
-                "climo_window_days": window_days,
-                "coerced_to_daily": coerced,
-            },
+            units={"evs": "0–100"},
+            sources=["NASA POWER daily point climatology (1981–present)"],
+            notes=(
+                "Days ranked by share of cells with expected EVS ≥ evs_min, then corridor mean. "
+                f"Window ±{window_days} days."
+            ),
+            extra={"mode": "best_dates", "climo_window_days": window_days, "evs_min": evs_min},
         ),
     )
-    # Cache for /export
-    from routers.export import EVENT_CACHE as EXPORT_CACHE  # if you keep /export grabbing this dict
-    try:
-        EXPORT_CACHE[event_id] = resp.model_dump()
-    except Exception:
-        pass
-    return resp
\ No newline at end of file
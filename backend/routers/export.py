@@ -1,14 +1,14 @@
 # backend/routers/export.py
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse, JSONResponse
-from .event import EVENT_CACHE
+from services.event_store import get_event_store
 from utils.export import csv_lines_from_event
 
 router = APIRouter(tags=["export"])
 
 @router.get("/event/{event_id}/export")
 def export_event(event_id: str, format: str = "csv"):
-    result = EVENT_CACHE.get(event_id)
+    result = get_event_store().get(event_id)
     if not result:
         raise HTTPException(status_code=404, detail="event_id not found")
     if format == "json":
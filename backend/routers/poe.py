@@ -1,55 +1,152 @@
 # backend/routers/poe.py
-# Point-based Probability of Exceedance (PoE) for user-selected parameters.
+# Point-based Probability of Exceedance (PoE) for user-selected parameters,
+# plus an area mode over the POWER cells a polygon covers.
 # NetCDF-free: NASA POWER + Data Rods (JSON/CSV).
 
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+import logging
+import os
+import time
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
+from pydantic import ValidationError
 
-from schemas.poe import PoEReq, Metric  
-from services.power import fetch_power_point
-from services.poe_generic import compute_generic_poe
+from schemas.poe import PoEReq, PoEAreaReq, Metric  
+from services.power import (
+    CELL_DLAT, CELL_DLON, HISTORY_CACHE, PowerError, PowerUnavailable, cell_center, prefetch_region_history,
+    fetch_power_history, history_version, history_stale, history_fetched_at,
+)
+from services.poe_generic import compute_generic_poe, compute_generic_poe_sweep
+from services.poe_sketch import BIN_WIDTH, area_poe
+from utils.geo import grid_cells_for_area
+from utils.http_cache import canonical_key, cached_json, CLIMO_CACHE_MAX_AGE
+from utils.resilience import time_budget
+from utils.ttlcache import TTLCache
+
+logger = logging.getLogger("uvicorn")
 
 router = APIRouter(tags=["poe"])
 
+# area mode: ceiling on POWER cells merged per request (larger areas are subsampled)
+POE_AREA_MAX_CELLS = int(os.getenv("POE_AREA_MAX_CELLS", "64"))
+# area mode: server-side latency budget (ms, 0 = none); requests may set deadline_ms
+POE_AREA_DEADLINE_MS = int(os.getenv("POE_AREA_DEADLINE_MS", "8000"))
+
+# (results, samples) keyed by the normalized climatology question
+POE_RESULTS: TTLCache[tuple] = TTLCache(maxsize=1024)
+
 @router.post("/poe")
-def poe(req: PoEReq):
-    if not req.metrics:
-        raise HTTPException(status_code=400, detail="metrics[] cannot be empty")
+def poe(req: PoEReq, request: Request):
+    """
+    Point PoE. Responses carry an ETag/Cache-Control; the computation is cached
+    by (POWER cell + data version, day-of-year, window, metrics).
+    `windows` adds a sweep: `windows: [{window_days, samples, results}]`, one
+    entry per listed size, computed in a single pass.
+    Browsers and CDNs do not cache POST: repeats get a 304 only from clients
+    that send If-None-Match themselves. GET /api/poe is the cacheable form.
+    """
+    center = _center(req)
 
     # 1) Fetch multi-decadal daily series at the point (1981→present)
-    df_met = fetch_power_point(req.lat, req.lon, start="19810101")
-    if df_met.empty:
+    series = fetch_power_history(req.lat, req.lon)
+    if series.empty:
         raise HTTPException(status_code=502, detail="POWER returned no data for this point")
 
-    # 2) Precip from Data Rods (if it fails, we’ll rely on POWER 'pr_mm' if present)
+    metrics = [m.model_dump() for m in req.metrics]
+    data = history_version(req.lat, req.lon)
+
+    def core_key(window_days: int) -> str:
+        return canonical_key("poe", {
+            "data": data,
+            "doy": center.timetuple().tm_yday,
+            "window_days": window_days,
+            "metrics": metrics,
+        })
+
+    # the body also echoes provenance, so the ETag covers it too
+    etag_key = canonical_key("poe-resp", {
+        "core": core_key(req.window_days), "windows": sorted(set(req.windows or [])),
+        "lat": req.lat, "lon": req.lon, "date": req.date,
+    })
+    return cached_json(request, etag_key, lambda: _poe_body(req, series, center, metrics, core_key))
+
+@router.get("/poe")
+def poe_get(
+    request: Request,
+    lat: float,
+    lon: float,
+    metric: List[str] = Query(..., description="var:op:threshold (op ge|le, default ge), repeatable"),
+    date: str = "2025-07-04",
+    window_days: int = 14,
+    windows: Optional[List[int]] = Query(None),
+):
+    """
+    POST /api/poe as a GET, so browsers and CDNs can cache the answer (same
+    body, ETag and Cache-Control), e.g.
+    /api/poe?lat=34.05&lon=-118.25&date=2025-07-04&metric=precip_mm_day:ge:12.7&metric=wind_mph:25
+    """
+    metrics = []
+    for m in metric:
+        parts = m.split(":")
+        if len(parts) not in (2, 3):
+            raise HTTPException(status_code=400, detail=f"metric must be var:op:threshold or var:threshold, got {m!r}")
+        metrics.append({"var": parts[0], "op": parts[1] if len(parts) == 3 else "ge", "threshold": parts[-1]})
     try:
-        df_pr = datarods_precip_series(
-            req.lat, req.lon, start_date="1981-01-01",
-            end_date=datetime.utcnow().strftime("%Y-%m-%d")
-        )
-        df = df_met.join(df_pr, how="left")  # adds/overrides 'pr_mm'
-    except Exception:
-        # Graceful fallback: continue with POWER-only columns
-        df = df_met
+        req = PoEReq(lat=lat, lon=lon, date=date, window_days=window_days, windows=windows, metrics=metrics)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False, include_context=False))
+    return poe(req, request)
+
+def _center(req) -> datetime:
+    if not req.metrics:
+        raise HTTPException(status_code=400, detail="metrics[] cannot be empty")
+    try:
+        return datetime.fromisoformat(req.date.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date must be ISO (YYYY-MM-DD or timestamp)")
+
+def _poe_results(series, center: datetime, metrics: list, windows: List[int], core_key) -> Dict[int, tuple]:
+    """
+    (results, samples) per window size. Cached windows are reused; the rest come
+    from one sweep (pooled and sorted once for the widest of them).
+    """
+    if len(windows) == 1:
+        w = windows[0]
+        return {w: POE_RESULTS.get_or_compute(core_key(w), lambda: (
+            compute_generic_poe(df=series, center=center, window_days=w, metrics=metrics),
+            time.time() + CLIMO_CACHE_MAX_AGE,
+        ))}
+    out = {w: POE_RESULTS.get(core_key(w)) for w in windows}
+    missing = [w for w, hit in out.items() if hit is None]
+    if missing:
+        expires = time.time() + CLIMO_CACHE_MAX_AGE
+        for w, res in compute_generic_poe_sweep(series, center, missing, metrics).items():
+            POE_RESULTS.set(core_key(w), res, expires)
+            out[w] = res
+    return out
+
+def _poe_body(req: PoEReq, series, center: datetime, metrics: list, core_key) -> dict:
+    # 2) Precip: POWER PRECTOTCORR ('pr_mm'). Data Rods is not wired yet
+    #    (services/datarods.py falls back to the same POWER column).
 
     # 3) Compute PoE per metric from same-DOY±window distribution
-    center = datetime.fromisoformat(req.date.replace("Z", "+00:00"))
-    results, samples = compute_generic_poe(
-        df=df,
-        center=center,
-        window_days=req.window_days,
-        metrics=[m.model_dump() for m in req.metrics],
-    )
+    #    (plus the requested sensitivity sweep, if any)
+    windows = sorted({req.window_days, *(req.windows or [])})
+    by_window = _poe_results(series, center, metrics, windows, core_key)
+    results, samples = by_window[req.window_days]
 
-    return {
+    body = {
         "results": results,
         "meta": {
             "mode": "climatology",
             "window_days": req.window_days,
             "samples": samples,
+            # stale: POWER history past its refresh TTL (served while refetching)
+            "stale": history_stale(req.lat, req.lon),
+            "data_fetched_at": history_fetched_at(req.lat, req.lon),
             "sources": [
                 "NASA POWER daily point (T2M_MAX,T2M_MIN,T2M,RH2M,WS10M)",
                 "Data Rods Hydrology (daily precip at point)"
@@ -59,4 +156,93 @@ def poe(req: PoEReq):
                 "date": req.date
             }
         }
-    }
\ No newline at end of file
+    }
+    if req.windows:
+        body["windows"] = [
+            {"window_days": w, "samples": by_window[w][1], "results": by_window[w][0]}
+            for w in sorted(set(req.windows))
+        ]
+    return body
+
+@router.post("/poe/area")
+def poe_area(req: PoEAreaReq, request: Request):
+    """
+    Area PoE: the pooled same-DOY±window distribution over every POWER cell the
+    polygon intersects, merged from per-cell histogram sketches (see
+    services/poe_sketch.py). `results[var].poe` is over all cell-days in the
+    area, `poe_cell_min`/`poe_cell_max` its range across cells, and `cells`
+    lists each cell's PoE. At most max_cells cells are used (capped by
+    POE_AREA_MAX_CELLS); beyond that the grid is evenly subsampled and
+    meta.stride > 1. Cells whose history is not loaded by deadline_ms are left
+    out (meta.cells_missing); such responses are not cached.
+    """
+    center = _center(req)
+    deadline_ms = req.deadline_ms or POE_AREA_DEADLINE_MS
+    deadline = time.time() + deadline_ms / 1000.0 if deadline_ms else float("inf")
+    max_cells = min(req.max_cells or POE_AREA_MAX_CELLS, POE_AREA_MAX_CELLS)
+    try:
+        cells, stride = grid_cells_for_area(req.geometry_geojson, CELL_DLAT, CELL_DLON, max_cells)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid geometry: {e}")
+
+    try:
+        with time_budget(deadline - time.time() if deadline != float("inf") else None):
+            prefetch_region_history([(lon, lat) for lat, lon in map(cell_center, cells)])
+    except PowerError as e:
+        logger.warning("regional POWER prefetch failed, using point fetches: %s", e)
+    loaded = _load_cells(cells, deadline)
+    if not loaded:
+        raise HTTPException(status_code=503, detail="POWER history unavailable for every cell within the deadline")
+
+    metrics = [m.model_dump() for m in req.metrics]
+    key = canonical_key("poe-area", {
+        "cells": [history_version(lat, lon, fetch=False) for lat, lon in map(cell_center, loaded)],
+        "missing": len(cells) - len(loaded), "stride": stride,
+        "doy": center.timetuple().tm_yday, "window_days": req.window_days,
+        "metrics": metrics, "date": req.date,
+    })
+    return cached_json(
+        request, key,
+        lambda: _poe_area_body(req, loaded, len(cells) - len(loaded), stride, center, metrics),
+        cacheable=lambda body: not body["meta"]["cells_missing"],
+    )
+
+def _load_cells(cells, deadline: float) -> list:
+    """Cells whose history is cached or fetched before `deadline` (epoch seconds)."""
+    loaded = []
+    for cell in cells:
+        if HISTORY_CACHE.get(cell) is None:
+            left = deadline - time.time()
+            if left <= 0:
+                continue
+            try:
+                with time_budget(left if left != float("inf") else None):
+                    fetch_power_history(*cell_center(cell))
+            except PowerUnavailable:
+                if time.time() < deadline:
+                    raise
+                continue
+        loaded.append(cell)
+    return loaded
+
+def _poe_area_body(req: PoEAreaReq, cells, missing: int, stride: int, center: datetime, metrics: list) -> dict:
+    results, per_cell, samples = area_poe(cells, center, req.window_days, metrics)
+    return {
+        "results": results,
+        "cells": per_cell,
+        "meta": {
+            "mode": "climatology_area",
+            "window_days": req.window_days,
+            "samples": samples,
+            "cells": len(cells),
+            "cells_missing": missing,
+            "stride": stride,
+            "stale": any(history_stale(lat, lon) for lat, lon in map(cell_center, cells)),
+            # sketch resolution: values are binned to at most this width (variable units)
+            "bin_width": {m["var"]: BIN_WIDTH[m["var"]] for m in metrics},
+            "sources": [
+                "NASA POWER daily (regional + point) (T2M_MAX,T2M_MIN,T2M,RH2M,WS10M,PRECTOTCORR)",
+            ],
+            "provenance": {"date": req.date},
+        },
+    }
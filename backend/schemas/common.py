@@ -15,6 +15,7 @@ class UnitsMeta(BaseModel):
     units: Dict[str, str]
     sources: list[str] = Field(default_factory=list)
     notes: Optional[str] = None
+    extra: Dict[str, Any] = Field(default_factory=dict)
 
 # Minimal GeoJSON geometry with helpful validation + examples for Swagger
 class GeoJSON(BaseModel):
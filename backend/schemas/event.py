@@ -9,6 +9,13 @@ class EventRequest(BaseModel):
     start_ts: ISO UTC time (e.g., 2025-07-15T18:00:00Z).
     duration_min: total minutes; step_min: bin size minutes.
     thresholds.evs_min: coverage threshold (default 70).
+    hourly: score sub-daily bins (step_min < 1440) from hourly POWER data;
+    false (or step_min ≥ 1440) coerces to one score per UTC date.
+    mode: "climo" scores climatology; "reanalysis" POWER's observed values where
+    available (climatology otherwise); "forecast" has no source yet and is
+    served from climatology (meta.extra.source_mode says which was used).
+    deadline_ms: optional latency budget; cells not computed in time are
+    approximated (server default EVENT_DEADLINE_MS).
     """
     geometry_type: str = Field(examples=["area", "route"])
     geometry_geojson: GeoJSON = Field(
@@ -25,6 +32,7 @@ class EventRequest(BaseModel):
     duration_min: int = Field(120, ge=1)
     step_min: int = Field(30, ge=1)
     thresholds: Dict[str, float] = Field(default_factory=lambda: {"evs_min": 70.0})
+    deadline_ms: Optional[int] = Field(None, ge=1, examples=[3000])
 
     mode: Optional[Literal["forecast","reanalysis","climo"]] = "forecast"
     hourly: Optional[bool] = True
@@ -42,12 +50,21 @@ class CellOut(BaseModel):
     lon: float
     lat: float
     evs: List[EVSComponent]
+    # None = computed; "nearest" / "neutral" = filled after the request deadline
+    approx: Optional[str] = None
 
 class Aggregate(BaseModel):
     t: int
     coverage_ge_70: float
     mean: float
     min: float
+    # EVS total quantiles across cells
+    p10: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    # subscore with the lowest corridor mean, and that mean
+    worst_driver: Optional[str] = None
+    worst_driver_mean: Optional[float] = None
 
 class EventResponse(BaseModel):
     event_id: str
@@ -55,3 +72,31 @@ class EventResponse(BaseModel):
     cells: List[CellOut]
     aggregates: List[Aggregate]
     meta: UnitsMeta
+
+class BestDatesRequest(BaseModel):
+    """
+    Rank every day in [start_date, end_date] (≤ 366 days) for an area/route by
+    the corridor's expected EVS. thresholds.evs_min: coverage threshold (default 70).
+    """
+    geometry_type: str = Field(examples=["area", "route"])
+    geometry_geojson: GeoJSON
+    start_date: str = Field(..., examples=["2025-06-01"])
+    end_date: str = Field(..., examples=["2025-08-31"])
+    top_k: int = Field(5, ge=1, le=50)
+    thresholds: Dict[str, float] = Field(default_factory=lambda: {"evs_min": 70.0})
+
+class BestDate(BaseModel):
+    date: str
+    coverage_ge_70: float
+    mean: float
+    min: float
+    rain: float
+    wind: float
+    heat: float
+    humidity: float
+
+class BestDatesResponse(BaseModel):
+    best: List[BestDate]
+    candidates: int
+    cells: int
+    meta: UnitsMeta
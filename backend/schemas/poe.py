@@ -1,9 +1,11 @@
 # backend/schemas/poe.py
 from __future__ import annotations
 
-from typing import List, Literal
+from typing import Annotated, List, Literal, Optional
 from pydantic import BaseModel, Field
 
+from schemas.common import GeoJSON
+
 # Supported variables for the generic PoE endpoint.
 VarName = Literal[
     "precip_mm_day",   # daily precip (mm/day)
@@ -29,12 +31,17 @@ class PoEReq(BaseModel):
     Probability-of-Exceedance request (point-based, climatology).
     - `date`: ISO timestamp or 'YYYY-MM-DD' (used for same DOY ± window pooling)
     - `window_days`: total window length in days (e.g., 14 => ±7)
+    - `windows`: optional extra window lengths for a sensitivity sweep; each
+      gets its own results/samples in the response's `windows` list
     - `metrics`: list of per-parameter exceedance tests
     """
     lat: float = Field(examples=[34.05])
     lon: float = Field(examples=[-118.25])
     date: str = Field("2025-07-04", examples=["2025-07-04", "2025-07-04T12:00:00Z"])
     window_days: int = Field(14, ge=1, le=60)
+    windows: Optional[List[Annotated[int, Field(ge=1, le=60)]]] = Field(
+        None, max_length=12, examples=[[7, 14, 30, 60]],
+    )
     metrics: List[Metric] = Field(
         default_factory=list,
         examples=[[
@@ -44,3 +51,23 @@ class PoEReq(BaseModel):
             {"var": "heatindex_F", "threshold": 95, "op": "ge"}
         ]]
     )
+
+class PoEAreaReq(BaseModel):
+    """
+    Area PoE request: the same question as PoEReq over every POWER cell a
+    polygon intersects, answered from merged per-cell histogram sketches.
+    - `max_cells`: cap on cells used; larger areas are evenly subsampled
+    - `deadline_ms`: latency budget; cells not loaded in time are left out
+      (server default POE_AREA_DEADLINE_MS)
+    """
+    geometry_geojson: GeoJSON = Field(
+        examples=[{"type": "Polygon", "coordinates": [[[-84.6, 33.6], [-84.1, 33.6], [-84.1, 34.0], [-84.6, 34.0], [-84.6, 33.6]]]}],
+    )
+    date: str = Field("2025-07-04", examples=["2025-07-04"])
+    window_days: int = Field(14, ge=1, le=60)
+    max_cells: Optional[int] = Field(None, ge=1, description="default/ceiling: POE_AREA_MAX_CELLS")
+    deadline_ms: Optional[int] = Field(None, ge=1, examples=[3000])
+    metrics: List[Metric] = Field(
+        default_factory=list,
+        examples=[[{"var": "precip_mm_day", "threshold": 12.7, "op": "ge"}]],
+    )
@@ -0,0 +1,84 @@
+# backend/scripts/bench_evs_model.py
+# EVS classifier latency and parity: LGBMClassifier.predict_proba (joblib)
+# vs the flat NumPy tree evaluator, single-row and batched. Exits 1 if the
+# two disagree beyond --tol on any benchmarked row.
+#
+#   cd backend && python scripts/export_evs_trees.py   # if models/evs_trees is missing
+#   python scripts/bench_evs_model.py --batch 1 64 1024 16384
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from export_evs_trees import sample_rows  # noqa: E402
+from services.models.evs_model import MODELS_DIR, EVSModel  # noqa: E402
+
+def _time(fn: Callable[[], object], repeat: int) -> List[float]:
+    fn()  # warm
+    out = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t)
+    return out
+
+def _fmt(samples: List[float], rows: int) -> str:
+    med = statistics.median(samples)
+    return f"median {med * 1e3:9.3f} ms  ({med / rows * 1e6:8.2f} µs/row)"
+
+def main(argv: Optional[list] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark EVS model backends.")
+    ap.add_argument("--batch", type=int, nargs="+", default=[1, 64, 1024, 16384])
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--tol", type=float, default=1e-9)
+    args = ap.parse_args(argv)
+
+    model_path, meta_path = str(MODELS_DIR / "evs_clf.joblib"), str(MODELS_DIR / "evs_meta.joblib")
+    t = time.perf_counter()
+    flat = EVSModel(model_path, meta_path, flat_path=str(MODELS_DIR / "evs_trees"))
+    t_flat = time.perf_counter() - t
+    if flat.trees is None:
+        print("models/evs_trees missing or stale; run scripts/export_evs_trees.py", file=sys.stderr)
+        return 1
+    t = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        ref = EVSModel(model_path, meta_path)
+    t_ref = time.perf_counter() - t
+    print(f"load: joblib {t_ref * 1e3:.1f} ms, flat (mmap) {t_flat * 1e3:.1f} ms")
+
+    worst = 0.0
+    for n in args.batch:
+        X = sample_rows(ref.clf, n, seed=n)
+        repeat = max(3, args.repeat if n <= 1024 else args.repeat // 10)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            s_ref = _time(lambda: ref.clf.predict_proba(X), repeat)
+            p_ref = ref.clf.predict_proba(X)[:, 1]
+        s_flat = _time(lambda: flat.trees.predict_proba(X), repeat)
+        worst = max(worst, float(np.max(np.abs(flat.trees.predict_proba(X) - p_ref))))
+        print(f"batch {n:6d}  joblib {_fmt(s_ref, n)}   flat {_fmt(s_flat, n)}   "
+              f"speedup {statistics.median(s_ref) / statistics.median(s_flat):5.1f}x")
+
+    feats = dict(zip(flat.feat_names, sample_rows(ref.clf, 1, seed=7)[0]))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        s_ref = _time(lambda: ref.predict(feats), args.repeat)
+    s_flat = _time(lambda: flat.predict(feats), args.repeat)
+    print(f"EVSModel.predict  joblib {_fmt(s_ref, 1)}   flat {_fmt(s_flat, 1)}")
+
+    print(f"max |Δp| = {worst:.3g} (tolerance {args.tol})")
+    return 0 if worst <= args.tol else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# backend/scripts/bench_power_parse.py
+# Benchmark POWER daily-response parsing on a 45-year single-point payload:
+# the per-day-dict DataFrame build fetch_power_point used to do vs
+# arrays_from_parameters / series_from_parameters, with stdlib json vs orjson
+# decoding, and with parameter projection (one column instead of six).
+#
+#   cd backend && python scripts/bench_power_parse.py --repeat 20
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import power_stub  # noqa: E402
+from services.power import PARAMS, frame_from_parameters, series_from_parameters  # noqa: E402
+from utils import jsonfast  # noqa: E402
+
+def legacy_frame(params: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """The previous fetch_power_point body: one dict per day → DataFrame → to_numeric."""
+    all_dates = set()
+    for p in PARAMS.values():
+        if p in params:
+            all_dates.update(params[p].keys())
+    rows = [
+        {
+            "date": d,
+            "tmaxC": params.get(PARAMS["tmax"], {}).get(d),
+            "tminC": params.get(PARAMS["tmin"], {}).get(d),
+            "tavgC": params.get(PARAMS["tavg"], {}).get(d),
+            "rh": params.get(PARAMS["rh"], {}).get(d),
+            "ws_ms": params.get(PARAMS["ws"], {}).get(d),
+            "pr_mm": params.get(PARAMS["pr"], {}).get(d),
+        }
+        for d in sorted(all_dates)
+    ]
+    df = pd.DataFrame(rows)
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.set_index("date").sort_index()
+    for c in ["tmaxC", "tminC", "tavgC", "rh", "ws_ms", "pr_mm"]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+def _time(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    fn()  # warm-up
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    runs.sort()
+    return {"median_ms": round(runs[len(runs) // 2], 3), "min_ms": round(runs[0], 3)}
+
+def main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="Benchmark POWER response parsing.")
+    ap.add_argument("--start", default="19810101")
+    ap.add_argument("--end", default="20251231")
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    full = power_stub.synthetic_point(33.5, -84.375, args.start, args.end)
+    body = json.dumps({"properties": {"parameter": full}}).encode("utf-8")
+    one = json.dumps({"properties": {"parameter": {"PRECTOTCORR": full["PRECTOTCORR"]}}}).encode("utf-8")
+    param = lambda raw, loads: loads(raw)["properties"]["parameter"]  # noqa: E731
+
+    cases = {
+        "legacy: json + per-day dicts → DataFrame": lambda: legacy_frame(param(body, json.loads)),
+        "json + frame_from_parameters": lambda: frame_from_parameters(param(body, json.loads)),
+        "fast decode + frame_from_parameters": lambda: frame_from_parameters(param(body, jsonfast.loads)),
+        "fast decode + series_from_parameters": lambda: series_from_parameters(param(body, jsonfast.loads)),
+        "fast decode only": lambda: param(body, jsonfast.loads),
+        "projection: pr_mm only, fast decode + series": lambda: series_from_parameters(param(one, jsonfast.loads), ["pr_mm"]),
+    }
+    report = {
+        "days": len(full["T2M"]),
+        "payload_bytes": {"all_parameters": len(body), "pr_mm_only": len(one)},
+        "fast_decoder": "orjson" if jsonfast.orjson is not None else "json (orjson not installed)",
+        "cases": {name: _time(fn, args.repeat) for name, fn in cases.items()},
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
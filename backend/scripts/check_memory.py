@@ -0,0 +1,254 @@
+# backend/scripts/check_memory.py
+# Memory-budget checks for the data pipeline: peak Python allocation
+# (tracemalloc) and peak RSS growth of one operation, each in a fresh process
+# with the POWER upstream served by scripts/power_stub.py. Exits 1 when any
+# check exceeds its budget, so it can gate CI / container sizing:
+#
+#   cd backend && python scripts/check_memory.py
+#   python scripts/check_memory.py --only event_hourly --budget event_hourly.rss=700
+#
+# Budgets are MB; "<check>.py" bounds the tracemalloc peak, "<check>.rss" the
+# peak RSS above the process's RSS just before the operation. RSS peaks are
+# exact on Linux (VmHWM, reset via /proc/self/clear_refs); elsewhere the
+# process-lifetime ru_maxrss is used, which can only over-report.
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import power_stub  # noqa: E402
+
+LAT, LON = 33.78, -84.39
+ROUTE = {
+    "geometry_type": "route",
+    "geometry_geojson": {"type": "LineString", "coordinates": [[-84.39, 33.75], [-80.84, 35.23]]},
+    "start_ts": "2025-07-15T00:00:00Z",
+    "duration_min": 3 * 1440,
+    "step_min": 1440,
+}
+POE_METRICS = [
+    {"var": "precip_mm_day", "threshold": 10, "op": "ge"},
+    {"var": "tmaxF", "threshold": 90, "op": "ge"},
+    {"var": "wind_mph", "threshold": 20, "op": "ge"},
+    {"var": "rh_pct", "threshold": 80, "op": "ge"},
+    {"var": "heatindex_F", "threshold": 95, "op": "ge"},
+]
+
+# default budgets (MB): ~2x what these measured on a 45-year history
+BUDGETS: Dict[str, float] = {
+    "power_parse.py": 26, "power_parse.rss": 80,
+    "generic_poe.py": 4, "generic_poe.rss": 16,
+    "expected_evs_for_day.py": 26, "expected_evs_for_day.rss": 80,
+    "expected_evs_custom.py": 4, "expected_evs_custom.rss": 16,
+    # event checks load their cold cells EVENT_WARM_WORKERS (4) at a time
+    "event.py": 85, "event.rss": 320,
+    "poe_area.py": 170, "poe_area.rss": 480,
+    "event_hourly.py": 145, "event_hourly.rss": 580,
+}
+
+# -------------------------------
+# Checks: setup() → state (not measured), run(state) (measured)
+# -------------------------------
+def _history():
+    from services.power import fetch_power_history
+    return fetch_power_history(LAT, LON)
+
+def _setup_none():
+    return None
+
+def _run_power_parse(_):
+    from services.power import fetch_power_point
+    return fetch_power_point(LAT, LON)
+
+def _run_generic_poe(series):
+    from services.poe_generic import compute_generic_poe
+    return compute_generic_poe(series, datetime(2025, 7, 15), 14, POE_METRICS)
+
+def _run_expected_evs(_):
+    from services.poe_expect import expected_evs_for_day
+    return expected_evs_for_day(LAT, LON, date(2025, 7, 15))  # cold: fetch + exceedance table
+
+def _run_expected_evs_custom(_):
+    from services.poe_expect import DEFAULT_THRESHOLDS, expected_evs_for_day
+    return expected_evs_for_day(LAT, LON, date(2025, 7, 15), thresholds={**DEFAULT_THRESHOLDS, "rain_mm_day": 5.0})
+
+def _setup_client():
+    from fastapi.testclient import TestClient
+    import app as appmod
+    return TestClient(appmod.app)
+
+def _event(client, body):
+    r = client.post("/api/event", json={**body, "deadline_ms": 600_000})
+    if r.status_code != 200:
+        raise RuntimeError(f"/api/event → {r.status_code}: {r.text[:200]}")
+    if r.json()["meta"]["extra"]["approximated_cells"]:
+        raise RuntimeError("/api/event approximated cells; the run did not compute every cell")
+    return len(r.content)
+
+def _poe_area(client):
+    area = {"type": "Polygon", "coordinates": [[[-85.0, 33.0], [-82.0, 33.0], [-82.0, 35.0], [-85.0, 35.0], [-85.0, 33.0]]]}
+    r = client.post("/api/poe/area", json={"geometry_geojson": area, "date": "2025-07-15",
+                                           "metrics": POE_METRICS, "deadline_ms": 600_000})
+    if r.status_code != 200:
+        raise RuntimeError(f"/api/poe/area → {r.status_code}: {r.text[:200]}")
+    return len(r.content)
+
+CHECKS: Dict[str, Tuple[Callable[[], Any], Callable[[Any], Any], str]] = {
+    "power_parse": (_setup_none, _run_power_parse, "fetch_power_point, 45-year point (HTTP + parse)"),
+    "generic_poe": (_history, _run_generic_poe, "compute_generic_poe, 5 metrics on cached history"),
+    "expected_evs_for_day": (_setup_none, _run_expected_evs, "expected_evs_for_day, cold cell (fetch + table)"),
+    "expected_evs_custom": (_history, _run_expected_evs_custom, "expected_evs_for_day, custom thresholds"),
+    "event": (_setup_client, lambda c: _event(c, ROUTE), "/api/event, 3-day route, cold caches"),
+    "event_hourly": (_setup_client, lambda c: _event(c, {**ROUTE, "step_min": 30, "duration_min": 1440, "hourly": True}),
+                     "/api/event, 30-min bins over a day from hourly chunks, cold caches"),
+    "poe_area": (_setup_client, _poe_area, "/api/poe/area, 30-cell polygon (merged sketches), cold caches"),
+}
+
+# -------------------------------
+# Measurement (child process)
+# -------------------------------
+def _proc_status(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def _reset_rss_peak() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+def _rss_now() -> int:
+    rss = _proc_status("VmRSS")
+    if rss is not None:
+        return rss
+    return _rss_peak()  # no cheap current-RSS probe; peak is the safe stand-in
+
+def _rss_peak() -> int:
+    hwm = _proc_status("VmHWM")
+    if hwm is not None:
+        return hwm
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def measure(name: str) -> Dict[str, Any]:
+    setup, run, _ = CHECKS[name]
+    # module imports are not part of any operation's footprint
+    import services.poe_expect, services.poe_generic, services.power  # noqa: F401
+    state = setup()
+    exact = _reset_rss_peak()
+    base = _rss_now()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    run(state)
+    elapsed = time.perf_counter() - t0
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "py_peak_mb": round(py_peak / 2**20, 2),
+        "rss_peak_mb": round(max(0, _rss_peak() - base) / 2**20, 2),
+        "rss_exact": exact,
+        "seconds": round(elapsed, 3),
+    }
+
+# -------------------------------
+# Driver
+# -------------------------------
+def _child(name: str, env: Dict[str, str]) -> Dict[str, Any]:
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", name],
+        cwd=str(BACKEND), env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"error": (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["failed"]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def _parse_budgets(items: List[str]) -> Dict[str, float]:
+    budgets = dict(BUDGETS)
+    for item in items:
+        key, _, mb = item.partition("=")
+        if key not in budgets:
+            raise SystemExit(f"unknown budget {key!r}; known: {', '.join(sorted(budgets))}")
+        budgets[key] = float(mb)
+    return budgets
+
+def main(argv: Optional[list] = None) -> int:
+    ap = argparse.ArgumentParser(description="Check peak memory of pipeline operations against budgets.")
+    ap.add_argument("--only", nargs="+", choices=sorted(CHECKS), help="run these checks only")
+    ap.add_argument("--budget", action="append", default=[], metavar="CHECK.py|rss=MB",
+                    help="override a budget, e.g. event.rss=200 (repeatable)")
+    ap.add_argument("--out", help="also write the JSON report here")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        return 0
+
+    budgets = _parse_budgets(args.budget)
+    httpd, _ = power_stub.serve()
+    stub = power_stub.base_url(httpd)
+    work = tempfile.mkdtemp(prefix="atmoroute-memcheck-")
+    report: Dict[str, Any] = {}
+    failed: List[str] = []
+    try:
+        for name in args.only or CHECKS:
+            env = {
+                **os.environ,
+                "POWER_URL": stub + power_stub.POINT_PATH,
+                "POWER_REGIONAL_URL": stub + power_stub.REGIONAL_PATH,
+                "POWER_HOURLY_URL": stub + power_stub.HOURLY_PATH,
+                # fresh store per check: every check starts cold
+                "POWER_STORE_DIR": os.path.join(work, name),
+                "EVENT_STORE_PATH": os.path.join(work, name, "events.sqlite3"),
+                "CLIMO_WORKERS": "0",  # keep pooled work in the measured process
+                "RATE_LIMIT_RPM": "100000000",
+                "OPENAI_API_KEY": "",
+            }
+            res = _child(name, env)
+            res["what"] = CHECKS[name][2]
+            res["budget_mb"] = {"py": budgets[f"{name}.py"], "rss": budgets[f"{name}.rss"]}
+            over = [] if "error" in res else [
+                k for k, got in (("py", res["py_peak_mb"]), ("rss", res["rss_peak_mb"]))
+                if got > res["budget_mb"][k]
+            ]
+            res["ok"] = "error" not in res and not over
+            if not res["ok"]:
+                failed.append(name)
+            report[name] = res
+            status = "ok" if res["ok"] else ("ERROR " + " ".join(res["error"]) if "error" in res else "OVER " + "/".join(over))
+            print(f"{name:22s} py {res.get('py_peak_mb', '-'):>8} MB (≤{budgets[f'{name}.py']:g})  "
+                  f"rss {res.get('rss_peak_mb', '-'):>8} MB (≤{budgets[f'{name}.rss']:g})  {status}",
+                  file=sys.stderr)
+    finally:
+        httpd.shutdown()
+    text = json.dumps({"checks": report, "failed": failed}, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+    print(text)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
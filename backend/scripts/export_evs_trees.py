@@ -0,0 +1,77 @@
+# backend/scripts/export_evs_trees.py
+# Export models/evs_clf.joblib (LightGBM) to the flat-array form EVSModel
+# evaluates with NumPy alone (services/models/flat_trees.py).
+#
+#   cd backend && python scripts/export_evs_trees.py
+#
+# Re-run after retraining: EVSModel ignores an export whose source_sha256 no
+# longer matches the joblib file. The export is checked against predict_proba
+# on sample rows first and not written if they disagree (exit 1).
+
+from __future__ import annotations
+
+import argparse
+import sys
+import warnings
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.models.evs_model import MODELS_DIR, file_sha256  # noqa: E402
+from services.models.flat_trees import FlatTrees, to_flat  # noqa: E402
+
+def sample_rows(model, n: int, seed: int = 0) -> np.ndarray:
+    """Rows spanning each feature's training range (LightGBM feature_infos), plus a few with NaNs."""
+    rng = np.random.default_rng(seed)
+    infos = model.booster_.dump_model()["feature_infos"]
+    cols: List[np.ndarray] = []
+    for info in infos.values():
+        lo, hi = (info.get("min_value", 0.0), info.get("max_value", 1.0))
+        pad = 0.1 * (hi - lo) + 1e-6
+        cols.append(rng.uniform(lo - pad, hi + pad, n))
+    X = np.column_stack(cols)
+    X[rng.random(X.shape) < 0.01] = np.nan
+    return X
+
+def check(model, trees: FlatTrees, X: np.ndarray) -> float:
+    """Max |flat − predict_proba| over the rows."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # "X does not have valid feature names"
+        ref = model.predict_proba(X)[:, 1]
+    return float(np.max(np.abs(trees.predict_proba(X) - ref)))
+
+def main(argv: Optional[list] = None) -> int:
+    ap = argparse.ArgumentParser(description="Export the EVS classifier to flat NumPy arrays.")
+    ap.add_argument("--model", default=str(MODELS_DIR / "evs_clf.joblib"))
+    ap.add_argument("--meta", default=str(MODELS_DIR / "evs_meta.joblib"))
+    ap.add_argument("--out", default=str(MODELS_DIR / "evs_trees"))
+    ap.add_argument("--rows", type=int, default=20000, help="sample rows for the parity check")
+    ap.add_argument("--tol", type=float, default=1e-9, help="max allowed probability difference")
+    args = ap.parse_args(argv)
+
+    import joblib
+    model = joblib.load(args.model)
+    feat_names = joblib.load(args.meta)["feat_names"]
+    trees = to_flat(model, feat_names)
+    trees.meta["source"] = Path(args.model).name
+    trees.meta["source_sha256"] = file_sha256(args.model)
+
+    err = check(model, trees, sample_rows(model, args.rows))
+    print(f"{trees.meta['n_trees']} trees, {trees.meta['n_nodes']} nodes, depth {trees.meta['max_depth']}; "
+          f"max |Δp| over {args.rows} rows = {err:.3g}")
+    if not err <= args.tol:
+        print(f"parity check failed (tolerance {args.tol}); nothing written", file=sys.stderr)
+        return 1
+    trees.save(args.out)
+    reloaded = FlatTrees.load(args.out)
+    X = sample_rows(model, 1000, seed=1)
+    if not np.array_equal(reloaded.predict_proba(X), trees.predict_proba(X)):
+        print("reloaded export differs from the in-memory one", file=sys.stderr)
+        return 1
+    print(f"wrote {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
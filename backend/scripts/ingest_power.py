@@ -0,0 +1,234 @@
+# backend/scripts/ingest_power.py
+# Offline ingestion of NASA POWER daily history into the host series store.
+#
+# Loads files downloaded ahead of time (POWER API JSON point responses,
+# regional/bulk JSON FeatureCollections, or POWER CSV exports — point or
+# regional with LAT/LON columns), groups them by POWER grid cell, merges
+# overlapping/partial files, and publishes each cell as the history
+# fetch_power_history() serves (store key hist_<i>_<j>). Files are parsed in
+# parallel; a per-cell coverage report (missing days, gap runs, per-column
+# missing counts; POWER's -999 fills count as missing) is printed as JSON.
+#
+#   cd backend
+#   POWER_STORE_DIR=/var/lib/atmoroute python scripts/ingest_power.py \
+#       --jobs 8 --min-coverage 0.98 data/power/*.json data/power/*.csv
+#
+# Ingested cells are fresh for POWER_HISTORY_TTL_SEC and then served stale for
+# POWER_HISTORY_STALE_SEC while refreshes are attempted (see services/power.py);
+# on hosts without egress, size those for the re-ingest cadence.
+
+from __future__ import annotations
+
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.power import (  # noqa: E402
+    PARAMS, HISTORY_START, frame_from_parameters, history_key, power_cell, cell_center,
+)
+from services.series import PowerSeries, COLUMNS  # noqa: E402
+from services.series_store import SeriesStore, STORE_DIR, STORE_MAX_BYTES  # noqa: E402
+
+Located = Tuple[float, float, pd.DataFrame]  # (lat, lon, daily frame)
+
+_MAX_GAPS_LISTED = 20
+
+# -------------------------------
+# Parsers (run in worker processes)
+# -------------------------------
+def _from_feature(feat: Dict[str, Any]) -> Optional[Located]:
+    coords = (feat.get("geometry") or {}).get("coordinates") or []
+    params = (feat.get("properties") or {}).get("parameter")
+    if len(coords) < 2 or not params:
+        return None
+    lon, lat = float(coords[0]), float(coords[1])
+    return lat, lon, frame_from_parameters(params)
+
+def parse_json(path: str) -> List[Located]:
+    with open(path) as fh:
+        js = json.load(fh)
+    feats = js.get("features") if js.get("type") == "FeatureCollection" else [js]
+    return [x for x in (_from_feature(f) for f in feats or []) if x is not None]
+
+def _csv_header(lines: List[str]) -> Tuple[Dict[str, float], int]:
+    """Location from POWER's -BEGIN HEADER- block; returns ({lat, lon}, first data line)."""
+    loc: Dict[str, float] = {}
+    if not lines or not lines[0].startswith("-BEGIN HEADER-"):
+        return loc, 0
+    for i, line in enumerate(lines):
+        if line.startswith("-END HEADER-"):
+            return loc, i + 1
+        low = line.lower()
+        if "latitude" in low and "longitude" in low:
+            toks = low.replace(",", " ").split()
+            try:
+                loc["lat"] = float(toks[toks.index("latitude") + 1])
+                loc["lon"] = float(toks[toks.index("longitude") + 1])
+            except (ValueError, IndexError):
+                pass
+    raise ValueError("unterminated POWER CSV header")
+
+def parse_csv(path: str) -> List[Located]:
+    with open(path, newline="") as fh:
+        lines = fh.read().splitlines()
+    loc, start = _csv_header(lines)
+    df = pd.read_csv(io.StringIO("\n".join(lines[start:])))
+    df.columns = [c.strip().upper() for c in df.columns]
+    if {"MO", "DY"} <= set(df.columns):
+        dates = pd.to_datetime(dict(year=df["YEAR"], month=df["MO"], day=df["DY"]))
+    elif "DOY" in df.columns:
+        dates = pd.to_datetime(df["YEAR"].astype(str), format="%Y") + pd.to_timedelta(df["DOY"] - 1, unit="D")
+    else:
+        raise ValueError("CSV needs YEAR,MO,DY or YEAR,DOY columns")
+    df["_key"] = dates.dt.strftime("%Y%m%d")
+    if {"LAT", "LON"} <= set(df.columns):
+        groups = df.groupby(["LAT", "LON"])
+    elif loc:
+        groups = [((loc["lat"], loc["lon"]), df)]
+    else:
+        raise ValueError("CSV has neither LAT/LON columns nor a location header")
+    out: List[Located] = []
+    for (lat, lon), g in groups:
+        params = {p: dict(zip(g["_key"], g[p])) for p in PARAMS.values() if p in g.columns}
+        out.append((float(lat), float(lon), frame_from_parameters(params)))
+    return out
+
+def parse_file(path: str) -> Tuple[str, List[Located], Optional[str]]:
+    """(path, locations, error) — never raises, so one bad file doesn't stop a batch."""
+    try:
+        if path.lower().endswith(".json"):
+            return path, parse_json(path), None
+        if path.lower().endswith(".csv"):
+            return path, parse_csv(path), None
+        return path, [], "unsupported extension (expected .json or .csv)"
+    except Exception as e:
+        return path, [], f"{type(e).__name__}: {e}"
+
+# -------------------------------
+# Merge / coverage
+# -------------------------------
+def merge_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Union of daily frames; where files overlap, the last real (non-NaN) value wins."""
+    if not frames:
+        return pd.DataFrame(columns=list(COLUMNS))
+    return pd.concat(frames).groupby(level=0).last()
+
+def coverage(series: PowerSeries, start: date, end: date) -> Dict[str, Any]:
+    """Coverage of [start, end]: missing days (absent, or NaN / -999 fill in any column) and their runs."""
+    n = (end - start).days + 1
+    ok = np.zeros(n, dtype=bool)
+    nan_days = {c: 0 for c in series.columns}
+    if len(series):
+        off = (series.start - start).days
+        mat = np.stack([series.columns[c] for c in series.columns])
+        good = np.all(np.isfinite(mat), axis=0)
+        for i, c in enumerate(series.columns):
+            nan_days[c] = int(np.isnan(mat[i]).sum())
+        lo, hi = max(0, off), min(n, off + len(series))
+        if lo < hi:
+            ok[lo:hi] = good[lo - off:hi - off]
+    missing = np.flatnonzero(~ok)
+    gaps: List[List[str]] = []
+    if missing.size:
+        breaks = np.flatnonzero(np.diff(missing) > 1)
+        for a, b in zip(np.r_[0, breaks + 1], np.r_[breaks, missing.size - 1]):
+            gaps.append([(start + timedelta(days=int(missing[a]))).isoformat(),
+                         (start + timedelta(days=int(missing[b]))).isoformat()])
+    return {
+        "expected_days": n,
+        "missing_days": int(missing.size),
+        "coverage": round(1 - missing.size / n, 5) if n else 1.0,
+        "nan_days_by_column": {c: v for c, v in nan_days.items() if v},
+        "gap_runs": len(gaps),
+        "gaps": gaps[:_MAX_GAPS_LISTED],
+    }
+
+def _expand(patterns: List[str]) -> List[str]:
+    files: List[str] = []
+    for p in patterns:
+        if os.path.isdir(p):
+            files += sorted(glob.glob(os.path.join(p, "**", "*.json"), recursive=True))
+            files += sorted(glob.glob(os.path.join(p, "**", "*.csv"), recursive=True))
+        else:
+            files += sorted(glob.glob(p)) or [p]
+    return list(dict.fromkeys(files))
+
+def main(argv: Optional[list] = None) -> int:
+    ap = argparse.ArgumentParser(description="Load POWER daily files into the series store.")
+    ap.add_argument("inputs", nargs="+", help="files, globs or directories (.json / .csv)")
+    ap.add_argument("--store-dir", default=STORE_DIR, help=f"series store directory (default {STORE_DIR})")
+    ap.add_argument("--max-mb", type=float, default=STORE_MAX_BYTES / 1024 / 1024, help="store size cap")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="parallel parser processes")
+    ap.add_argument("--start", default=HISTORY_START, help="expected first day YYYYMMDD")
+    ap.add_argument("--end", help="expected last day YYYYMMDD (default: yesterday UTC)")
+    ap.add_argument("--min-coverage", type=float, default=0.0,
+                    help="exit 1 if any cell's coverage is below this fraction")
+    ap.add_argument("--dry-run", action="store_true", help="parse and report without writing")
+    ap.add_argument("--out", help="write the JSON report here (default: stdout)")
+    args = ap.parse_args(argv)
+
+    start = datetime.strptime(args.start, "%Y%m%d").date()
+    end = (datetime.strptime(args.end, "%Y%m%d").date() if args.end
+           else datetime.utcnow().date() - timedelta(days=1))
+    files = _expand(args.inputs)
+    t0 = time.time()
+
+    by_cell: Dict[Tuple[int, int], List[pd.DataFrame]] = {}
+    sources: Dict[Tuple[int, int], List[str]] = {}
+    errors: Dict[str, str] = {}
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for path, located, err in pool.map(parse_file, files):
+            if err:
+                errors[path] = err
+            for lat, lon, df in located:
+                cell = power_cell(lat, lon)
+                by_cell.setdefault(cell, []).append(df)
+                sources.setdefault(cell, []).append(path)
+
+    store = None if args.dry_run else SeriesStore(args.store_dir, int(args.max_mb * 1024 * 1024))
+    cells: Dict[str, Any] = {}
+    for cell in sorted(by_cell):
+        series = PowerSeries.from_frame(merge_frames(by_cell[cell]))
+        if store is not None and len(series):
+            series, _ = store.put_series(history_key(cell), series)
+        cells[history_key(cell)] = {
+            "center": list(cell_center(cell)),
+            "files": len(sources[cell]),
+            "first_day": series.start.isoformat() if len(series) else None,
+            "last_day": series.end.isoformat() if len(series) else None,
+            **coverage(series, start, end),
+        }
+
+    low = sorted(k for k, v in cells.items() if v["coverage"] < args.min_coverage)
+    report = {
+        "files": len(files),
+        "file_errors": errors,
+        "cells": len(cells),
+        "written": 0 if store is None else sum(1 for v in cells.values() if v["first_day"]),
+        "store": store.stats() if store is not None else None,
+        "expected_range": [start.isoformat(), end.isoformat()],
+        "below_min_coverage": low,
+        "elapsed_s": round(time.time() - t0, 3),
+        "per_cell": cells,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+    print(text)
+    return 1 if (low or errors) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
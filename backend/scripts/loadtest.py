@@ -0,0 +1,352 @@
+# backend/scripts/loadtest.py
+# Replay a weighted mix of realistic API traffic and report per-endpoint
+# throughput, latency percentiles and error rates as JSON.
+#
+# Request bodies are seeded from AtmoRoute_Postman_Collection.json and the
+# sample payloads (poe_test.json, event_test.json), translated to the current
+# schemas and jittered around their locations. By default the script starts
+# scripts/power_stub.py and a local uvicorn instance pointed at it, so no
+# request leaves the machine:
+#
+#   cd backend
+#   python scripts/loadtest.py --duration 60 --concurrency 16 \
+#       --mix poe=4,event=2,realtime=2,brief=1,export=1 --out loadtest.json
+#
+# --base-url targets an already-running instance instead (its POWER_URL and
+# RATE_LIMIT_RPM are then up to you).
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import power_stub  # noqa: E402
+
+DEFAULT_MIX = "poe=4,event=2,realtime=2,brief=1,export=1"
+
+# Postman's legacy /api/poe body (variables + thresholds) → PoEReq metric names
+_LEGACY_VARS = {
+    "precip_mmhr": "precip_mm_hr",
+    "precip_mm_day": "precip_mm_day",
+    "temp_F": "tmaxF",
+    "wind_mph": "wind_mph",
+    "rh_pct": "rh_pct",
+    "heatindex_F": "heatindex_F",
+}
+
+# -------------------------------
+# Seeds
+# -------------------------------
+def _postman_requests(path: Path) -> List[Dict[str, Any]]:
+    out = []
+
+    def walk(items):
+        for it in items:
+            if "item" in it:
+                walk(it["item"])
+            elif "request" in it:
+                out.append(it["request"])
+    with open(path) as fh:
+        walk(json.load(fh).get("item", []))
+    return out
+
+def _poe_from_legacy(body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    try:
+        lon, lat = body["geometry_geojson"]["coordinates"][:2]
+    except (KeyError, TypeError, ValueError):
+        return None
+    thresholds = body.get("thresholds") or {}
+    metrics = [
+        {"var": _LEGACY_VARS[k], "threshold": float(v), "op": "ge"}
+        for k, v in thresholds.items() if k in _LEGACY_VARS
+    ] or [{"var": "precip_mm_day", "threshold": 12.7, "op": "ge"}]
+    return {
+        "lat": float(lat), "lon": float(lon),
+        "date": str(body.get("date", "2025-07-15"))[:10],
+        "window_days": int(body.get("window_days", 14)),
+        "metrics": metrics,
+    }
+
+def load_seeds(root: Path = BACKEND) -> Dict[str, List[Dict[str, Any]]]:
+    """{"poe": [PoEReq bodies], "event": [EventRequest bodies], "points": [(lat, lon)]}."""
+    poe, events = [], []
+    postman = root / "AtmoRoute_Postman_Collection.json"
+    if postman.exists():
+        for req in _postman_requests(postman):
+            raw = (req.get("body") or {}).get("raw")
+            url = req.get("url")
+            url = url if isinstance(url, str) else (url or {}).get("raw", "")
+            if not raw:
+                continue
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                continue
+            if url.endswith("/api/poe"):
+                if "lat" in body and "metrics" in body:
+                    poe.append(body)
+                elif (b := _poe_from_legacy(body)) is not None:
+                    poe.append(b)
+            elif url.endswith("/api/event"):
+                events.append(body)
+    for name, bucket in (("poe_test.json", poe), ("event_test.json", events)):
+        p = root / name
+        if not p.exists():
+            continue
+        with open(p) as fh:
+            body = json.load(fh)
+        if name == "poe_test.json" and "metrics" not in body:
+            body = _poe_from_legacy(body)
+        if body:
+            bucket.append(body)
+    points = [(b["lat"], b["lon"]) for b in poe]
+    for ev in events:
+        coords = ev["geometry_geojson"]["coordinates"]
+        ring = coords[0] if ev["geometry_geojson"]["type"] == "Polygon" else coords
+        points.append((ring[0][1], ring[0][0]))
+    if not (poe and events):
+        raise SystemExit("no seed payloads found (Postman collection / sample payloads)")
+    return {"poe": poe, "event": events, "points": points}
+
+def _shift_geojson(geo: Dict[str, Any], dlat: float, dlon: float) -> Dict[str, Any]:
+    def shift(c):
+        if c and isinstance(c[0], (int, float)):
+            return [c[0] + dlon, c[1] + dlat, *c[2:]]
+        return [shift(x) for x in c]
+    return {**geo, "coordinates": shift(geo["coordinates"])}
+
+# -------------------------------
+# Traffic
+# -------------------------------
+class Traffic:
+    """Builds one request per call for each endpoint in the mix, jittered around the seeds."""
+
+    def __init__(self, seeds: Dict[str, List[Any]], jitter_deg: float, rng: random.Random):
+        self.seeds = seeds
+        self.jitter = jitter_deg
+        self.rng = rng
+        self.event_ids: List[str] = []
+        self._lock = threading.Lock()
+
+    def _d(self) -> float:
+        return self.rng.uniform(-self.jitter, self.jitter)
+
+    def poe(self) -> Tuple[str, str, Dict[str, Any]]:
+        b = dict(self.rng.choice(self.seeds["poe"]))
+        b["lat"] = round(b["lat"] + self._d(), 3)
+        b["lon"] = round(b["lon"] + self._d(), 3)
+        return "POST", "/api/poe", {"json": b}
+
+    def event(self) -> Tuple[str, str, Dict[str, Any]]:
+        b = dict(self.rng.choice(self.seeds["event"]))
+        b["geometry_geojson"] = _shift_geojson(b["geometry_geojson"], self._d(), self._d())
+        layout = self.rng.choice(["nested", "columnar"])
+        return "POST", f"/api/event?layout={layout}", {"json": b}
+
+    def _point(self) -> Dict[str, float]:
+        lat, lon = self.rng.choice(self.seeds["points"])
+        return {"lat": round(lat + self._d(), 3), "lon": round(lon + self._d(), 3)}
+
+    def realtime(self):
+        return "GET", "/api/ai/realtime", {"params": self._point()}
+
+    def brief(self):
+        return "GET", "/api/llm/brief", {"params": self._point()}
+
+    def export(self):
+        with self._lock:
+            eid = self.rng.choice(self.event_ids) if self.event_ids else None
+        if eid is None:
+            return self.event()
+        fmt = self.rng.choice(["csv", "json"])
+        return "GET", f"/api/event/{eid}/export", {"params": {"format": fmt}}
+
+    def remember(self, endpoint: str, resp: requests.Response) -> None:
+        if endpoint == "event" and resp.status_code == 200:
+            try:
+                eid = resp.json().get("event_id")
+            except ValueError:
+                return
+            with self._lock:
+                self.event_ids.append(eid)
+                del self.event_ids[:-200]
+
+def parse_mix(raw: str) -> Dict[str, float]:
+    mix = {}
+    for part in raw.split(","):
+        name, _, w = part.partition("=")
+        name = name.strip()
+        if name not in {"poe", "event", "realtime", "brief", "export"}:
+            raise SystemExit(f"unknown endpoint in --mix: {name!r}")
+        mix[name] = float(w or 1)
+    return mix
+
+def run(base_url: str, mix: Dict[str, float], duration: float, concurrency: int,
+        seeds: Dict[str, List[Any]], jitter_deg: float, seed: int, timeout: float) -> Dict[str, Any]:
+    traffic = Traffic(seeds, jitter_deg, random.Random(seed))
+    names, weights = list(mix), list(mix.values())
+    samples: Dict[str, List[Tuple[float, Optional[int]]]] = defaultdict(list)
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker(i: int) -> None:
+        rng = random.Random(seed * 1000 + i)
+        s = requests.Session()
+        while time.perf_counter() < stop_at:
+            endpoint = rng.choices(names, weights)[0]
+            with lock:
+                method, path, kw = getattr(traffic, endpoint)()
+            if endpoint == "export" and not path.endswith("/export"):
+                endpoint = "event"  # no event id yet: an event call stands in
+            t0 = time.perf_counter()
+            try:
+                r = s.request(method, base_url + path, timeout=timeout, **kw)
+                status: Optional[int] = r.status_code
+                traffic.remember(endpoint, r)
+            except requests.RequestException:
+                status = None
+            dt = time.perf_counter() - t0
+            with lock:
+                samples[endpoint].append((dt, status))
+
+    t_start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t_start
+    return report(samples, elapsed, {
+        "base_url": base_url, "duration_s": duration, "concurrency": concurrency,
+        "mix": mix, "jitter_deg": jitter_deg, "seed": seed,
+    })
+
+def _stats(rows: List[Tuple[float, Optional[int]]], elapsed: float) -> Dict[str, Any]:
+    lat_ms = np.array([dt * 1000 for dt, _ in rows]) if rows else np.zeros(0)
+    errors = sum(1 for _, st in rows if st is None or st >= 400)
+    by_status: Dict[str, int] = defaultdict(int)
+    for _, st in rows:
+        by_status[str(st) if st is not None else "transport_error"] += 1
+    pct = (lambda q: round(float(np.percentile(lat_ms, q)), 2)) if len(lat_ms) else (lambda q: None)
+    return {
+        "requests": len(rows),
+        "throughput_rps": round(len(rows) / elapsed, 2) if elapsed > 0 else 0.0,
+        "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+        "status": dict(by_status),
+        "latency_ms": {
+            "p50": pct(50), "p95": pct(95), "p99": pct(99),
+            "mean": round(float(lat_ms.mean()), 2) if len(lat_ms) else None,
+            "max": round(float(lat_ms.max()), 2) if len(lat_ms) else None,
+        },
+    }
+
+def report(samples: Dict[str, List[Tuple[float, Optional[int]]]], elapsed: float, config: Dict[str, Any]) -> Dict[str, Any]:
+    every = [row for rows in samples.values() for row in rows]
+    return {
+        "config": config,
+        "elapsed_s": round(elapsed, 3),
+        "overall": _stats(every, elapsed),
+        "endpoints": {name: _stats(rows, elapsed) for name, rows in sorted(samples.items())},
+    }
+
+# -------------------------------
+# Local stack (POWER stub + uvicorn)
+# -------------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_local_app(stub_url: str, workers: int, extra_env: Dict[str, str]) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "POWER_URL": stub_url + power_stub.POINT_PATH,
+        "POWER_REGIONAL_URL": stub_url + power_stub.REGIONAL_PATH,
+        "POWER_HOURLY_URL": stub_url + power_stub.HOURLY_PATH,
+        "POWER_STORE_DIR": tempfile.mkdtemp(prefix="atmoroute-loadtest-"),
+        "RATE_LIMIT_RPM": "100000000",
+        "OPENAI_API_KEY": "",  # LLM briefs use the offline fallback text
+        **extra_env,
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=str(BACKEND), env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"app exited with code {proc.returncode}")
+        try:
+            if requests.get(base + "/api/health", timeout=2).status_code == 200:
+                return proc, base
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise SystemExit("app did not become healthy within 120 s")
+
+def main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="Load-test the AtmoRoute API and report latency percentiles.")
+    ap.add_argument("--base-url", help="target a running instance instead of starting one")
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds of traffic")
+    ap.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    ap.add_argument("--jitter-deg", type=float, default=0.5, help="random offset applied to seed locations")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-request client timeout (s)")
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local app")
+    ap.add_argument("--stub-latency-ms", type=float, default=0.0, help="POWER stub delay per call")
+    ap.add_argument("--stub-error-rate", type=float, default=0.0, help="fraction of POWER stub calls failing")
+    ap.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra env for the local app")
+    ap.add_argument("--out", help="write the JSON report here (default: stdout)")
+    args = ap.parse_args(argv)
+
+    seeds = load_seeds()
+    mix = parse_mix(args.mix)
+    proc = None
+    httpd = None
+    try:
+        if args.base_url:
+            base = args.base_url.rstrip("/")
+        else:
+            httpd, _ = power_stub.serve(latency_ms=args.stub_latency_ms, error_rate=args.stub_error_rate)
+            extra = dict(kv.split("=", 1) for kv in args.env)
+            proc, base = start_local_app(power_stub.base_url(httpd), args.workers, extra)
+        result = run(base, mix, args.duration, args.concurrency, seeds, args.jitter_deg, args.seed, args.timeout)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if httpd is not None:
+            httpd.shutdown()
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    main()
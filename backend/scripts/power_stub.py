@@ -0,0 +1,176 @@
+# backend/scripts/power_stub.py
+# Local stand-in for the NASA POWER daily/hourly API, for load tests and offline dev.
+#
+# Serves deterministic synthetic data in POWER's JSON shape (same parameters,
+# YYYYMMDD / YYYYMMDDHH keys, occasional -999 fill values) so the backend runs
+# unchanged with POWER_URL pointed here:
+#
+#   python scripts/power_stub.py --port 8765 --latency-ms 200
+#   POWER_URL=http://127.0.0.1:8765/api/temporal/daily/point \
+#   POWER_REGIONAL_URL=http://127.0.0.1:8765/api/temporal/daily/regional \
+#   POWER_HOURLY_URL=http://127.0.0.1:8765/api/temporal/hourly/point uvicorn app:app
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PARAMETERS = ("T2M_MAX", "T2M_MIN", "T2M", "RH2M", "WS10M", "PRECTOTCORR")
+POINT_PATH = "/api/temporal/daily/point"
+REGIONAL_PATH = "/api/temporal/daily/regional"
+HOURLY_PATH = "/api/temporal/hourly/point"
+HOURLY_PARAMETERS = ("T2M", "RH2M", "WS10M", "PRECTOTCORR")
+# POWER meteorology grid (matches services/power.py CELL_DLAT/CELL_DLON)
+CELL_DLAT, CELL_DLON = 0.5, 0.625
+
+@lru_cache(maxsize=512)
+def synthetic_point(lat: float, lon: float, start: str, end: str) -> Dict[str, Dict[str, float]]:
+    """Seasonal synthetic daily series for one location (same inputs → same output; don't mutate)."""
+    rnd = random.Random(f"{round(lat, 3)},{round(lon, 3)}")
+    d = datetime.strptime(start, "%Y%m%d").date()
+    last = datetime.strptime(end, "%Y%m%d").date()
+    warm = 12.0 - 0.3 * abs(lat)  # colder towards the poles
+    out: Dict[str, Dict[str, float]] = {p: {} for p in PARAMETERS}
+    while d <= last:
+        k = d.strftime("%Y%m%d")
+        season = math.sin(2 * math.pi * (d.timetuple().tm_yday - 100) / 365) * (1 if lat >= 0 else -1)
+        out["T2M_MAX"][k] = round(warm + 14 + 10 * season + rnd.gauss(0, 3), 2)
+        out["T2M_MIN"][k] = round(warm + 2 + 8 * season + rnd.gauss(0, 3), 2)
+        out["T2M"][k] = round(warm + 8 + 9 * season + rnd.gauss(0, 3), 2)
+        out["RH2M"][k] = round(min(100.0, max(5.0, 65 + rnd.gauss(0, 15))), 2)
+        out["WS10M"][k] = round(abs(rnd.gauss(4, 2.5)), 2)
+        out["PRECTOTCORR"][k] = round(max(0.0, rnd.expovariate(0.4) - 1.0), 2) if rnd.random() < 0.4 else 0.0
+        if rnd.random() < 0.002:
+            out["RH2M"][k] = -999.0
+        d += timedelta(days=1)
+    return out
+
+@lru_cache(maxsize=64)
+def synthetic_hourly(lat: float, lon: float, start: str, end: str) -> Dict[str, Dict[str, float]]:
+    """Hourly (UTC) series: the daily seasonal cycle plus a diurnal one peaking mid-afternoon local time."""
+    rnd = random.Random(f"h{round(lat, 3)},{round(lon, 3)},{start}")
+    d = datetime.strptime(start, "%Y%m%d")
+    last = datetime.strptime(end, "%Y%m%d") + timedelta(hours=23)
+    warm = 12.0 - 0.3 * abs(lat)
+    out: Dict[str, Dict[str, float]] = {p: {} for p in HOURLY_PARAMETERS}
+    rain_left = 0
+    while d <= last:
+        k = d.strftime("%Y%m%d%H")
+        season = math.sin(2 * math.pi * (d.timetuple().tm_yday - 100) / 365) * (1 if lat >= 0 else -1)
+        local = (d.hour + lon / 15.0) % 24
+        diurnal = math.cos(2 * math.pi * (local - 15) / 24)  # +1 at 15:00 local
+        out["T2M"][k] = round(warm + 8 + 9 * season + 6 * diurnal + rnd.gauss(0, 1.5), 2)
+        out["RH2M"][k] = round(min(100.0, max(5.0, 65 - 18 * diurnal + rnd.gauss(0, 8))), 2)
+        out["WS10M"][k] = round(abs(4 + 1.5 * diurnal + rnd.gauss(0, 1.5)), 2)
+        if rain_left == 0 and rnd.random() < 0.01 + 0.02 * max(0.0, diurnal):  # afternoon showers
+            rain_left = rnd.randint(1, 4)
+        out["PRECTOTCORR"][k] = round(rnd.expovariate(0.5), 2) if rain_left else 0.0
+        rain_left = max(0, rain_left - 1)
+        d += timedelta(hours=1)
+    return out
+
+def synthetic_region(lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                     start: str, end: str, parameters: Optional[list] = None) -> Dict[str, Any]:
+    """Regional response: one feature per grid cell center inside the box (as POWER does)."""
+    feats = []
+    for i in range(math.ceil(lat_min / CELL_DLAT - 1e-9), math.floor(lat_max / CELL_DLAT + 1e-9) + 1):
+        for j in range(math.ceil(lon_min / CELL_DLON - 1e-9), math.floor(lon_max / CELL_DLON + 1e-9) + 1):
+            lat, lon = i * CELL_DLAT, j * CELL_DLON
+            param = synthetic_point(lat, lon, start, end)
+            if parameters:
+                param = {k: v for k, v in param.items() if k in parameters}
+            feats.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat, 0.0]},
+                "properties": {"parameter": param},
+            })
+    return {"type": "FeatureCollection", "features": feats}
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "PowerStub/1.0"
+    latency_s = 0.0
+    error_rate = 0.0
+
+    def log_message(self, fmt, *args):  # quiet
+        pass
+
+    def _send(self, status: int, body: Any) -> None:
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if self.error_rate and random.random() < self.error_rate:
+            return self._send(503, {"messages": ["stub: injected failure"]})
+        try:
+            if url.path == POINT_PATH:
+                lat, lon = float(q["latitude"]), float(q["longitude"])
+                param = synthetic_point(lat, lon, q["start"], q["end"])
+                return self._send(200, {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [lon, lat, 0.0]},
+                    "properties": {"parameter": param},
+                })
+            if url.path == HOURLY_PATH:
+                lat, lon = float(q["latitude"]), float(q["longitude"])
+                return self._send(200, {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [lon, lat, 0.0]},
+                    "properties": {"parameter": synthetic_hourly(lat, lon, q["start"], q["end"])},
+                })
+            if url.path == REGIONAL_PATH:
+                params = [p for p in q.get("parameters", "").split(",") if p]
+                return self._send(200, synthetic_region(
+                    float(q["latitude-min"]), float(q["latitude-max"]),
+                    float(q["longitude-min"]), float(q["longitude-max"]),
+                    q["start"], q["end"], params,
+                ))
+        except (KeyError, ValueError) as e:
+            return self._send(422, {"messages": [f"stub: bad query: {e}"]})
+        self._send(404, {"messages": [f"stub: unknown path {url.path}"]})
+
+def serve(host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0,
+          error_rate: float = 0.0) -> Tuple[ThreadingHTTPServer, threading.Thread]:
+    """Start the stub in a daemon thread; returns (server, thread). port=0 picks a free port."""
+    handler = type("Handler", (_Handler,), {"latency_s": latency_ms / 1000.0, "error_rate": error_rate})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    t = threading.Thread(target=httpd.serve_forever, name="power-stub", daemon=True)
+    t.start()
+    return httpd, t
+
+def base_url(httpd: ThreadingHTTPServer) -> str:
+    host, port = httpd.server_address[:2]
+    return f"http://{host}:{port}"
+
+def main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="Serve synthetic NASA POWER daily and hourly data.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="added delay per request")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    args = ap.parse_args(argv)
+    httpd, t = serve(args.host, args.port, args.latency_ms, args.error_rate)
+    print(f"POWER stub on {base_url(httpd)}{POINT_PATH}, {REGIONAL_PATH} and {HOURLY_PATH}", flush=True)
+    try:
+        t.join()
+    except KeyboardInterrupt:
+        httpd.shutdown()
+
+if __name__ == "__main__":
+    main()
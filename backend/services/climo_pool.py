@@ -0,0 +1,131 @@
+# backend/services/climo_pool.py
+# Optional process pool for per-cell climatology (EVS) work.
+#
+# pandas/NumPy pooling per cell is CPU-bound and mostly serialized by the GIL
+# inside FastAPI's threadpool. With CLIMO_WORKERS > 0 the cells of a corridor
+# are scored in worker processes instead. Each cell's series is copied once
+# into a shared-memory block (doy + EVS columns as float64) and workers attach
+# to it by name, so no DataFrame is pickled across the process boundary.
+# (The event corridor itself now uses poe_expect's O(1) ExceedanceTable
+# lookups; evs_grid remains for scans with non-default thresholds.)
+
+from __future__ import annotations
+
+import os
+import atexit
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.poe_expect import ExpectedEVS, to_evs_arrays, expected_evs_from_arrays
+from services.series import PowerSeries
+
+# 0 disables the pool (everything runs inline in the calling thread).
+CLIMO_WORKERS = int(os.getenv("CLIMO_WORKERS", "0"))
+# Below this many cells the pool overhead is not worth it.
+CLIMO_POOL_MIN_CELLS = int(os.getenv("CLIMO_POOL_MIN_CELLS", "4"))
+
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+_LOCK = threading.Lock()
+
+def _executor() -> Optional[ProcessPoolExecutor]:
+    global _EXECUTOR
+    if CLIMO_WORKERS <= 0:
+        return None
+    with _LOCK:
+        if _EXECUTOR is None:
+            # spawn: never fork a process that is running uvicorn's threads
+            _EXECUTOR = ProcessPoolExecutor(max_workers=CLIMO_WORKERS, mp_context=mp.get_context("spawn"))
+        return _EXECUTOR
+
+@atexit.register
+def shutdown() -> None:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
+
+def _share(doy: np.ndarray, vals: np.ndarray) -> Tuple[shared_memory.SharedMemory, int]:
+    """Copy one cell into a new shared block laid out as float64[n, 1 + ncols] (doy first)."""
+    n = int(doy.shape[0])
+    shape = (n, 1 + vals.shape[1])
+    shm = shared_memory.SharedMemory(create=True, size=max(1, n * shape[1] * 8))
+    arr = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    arr[:, 0] = doy
+    arr[:, 1:] = vals
+    del arr
+    return shm, n
+
+def _cell_worker(
+    shm_name: str,
+    n: int,
+    ncols: int,
+    days: Sequence[date],
+    window_days: int,
+    thresholds: Optional[dict],
+    weights: Optional[dict],
+) -> List[Tuple[float, dict]]:
+    # Workers share the parent's resource tracker, so attaching here does not
+    # schedule a second unlink; the parent owns the block's lifetime.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        arr = np.ndarray((n, 1 + ncols), dtype=np.float64, buffer=shm.buf)
+        doy = arr[:, 0].astype(np.int16)
+        vals = arr[:, 1:]
+        out = []
+        for d in days:
+            r = expected_evs_from_arrays(doy, vals, d, window_days, thresholds, weights)
+            out.append((r.total, r.subs))
+        del arr, vals
+        return out
+    finally:
+        shm.close()
+
+def evs_grid(
+    series: Sequence[PowerSeries | pd.DataFrame],
+    days: Sequence[date],
+    window_days: int,
+    thresholds: Optional[dict] = None,
+    weights: Optional[dict] = None,
+) -> List[List[ExpectedEVS]]:
+    """
+    Expected EVS for every (cell, day): result[cell][day_idx].
+    Runs in the process pool when CLIMO_WORKERS > 0 and there are enough cells,
+    inline otherwise. Both paths use expected_evs_from_arrays, so results are identical.
+    """
+    arrays = [
+        to_evs_arrays(s) if s is not None and not s.empty
+        else (np.empty(0, dtype=np.int16), np.empty((0, 4)))
+        for s in series
+    ]
+    ex = _executor() if len(arrays) >= CLIMO_POOL_MIN_CELLS else None
+    if ex is None:
+        return [
+            [expected_evs_from_arrays(doy, vals, d, window_days, thresholds, weights) for d in days]
+            for doy, vals in arrays
+        ]
+
+    blocks: List[shared_memory.SharedMemory] = []
+    try:
+        futures = []
+        for doy, vals in arrays:
+            shm, n = _share(doy, vals)
+            blocks.append(shm)
+            futures.append(ex.submit(
+                _cell_worker, shm.name, n, vals.shape[1], list(days), window_days, thresholds, weights
+            ))
+        return [
+            [ExpectedEVS(total=t, subs=s) for t, s in f.result()]
+            for f in futures
+        ]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
@@ -29,7 +29,9 @@ def datarods_precip_series(
     Currently defaults to POWER precipitation; switch DATARODS_MODE=datarods when you wire the API.
     """
     # POWER fallback
-    dfp = fetch_power_point(lat, lon, start=start_date.replace("-", ""), end=end_date.replace("-", ""))
+    dfp = fetch_power_point(
+        lat, lon, start=start_date.replace("-", ""), end=end_date.replace("-", ""), columns=["pr_mm"],
+    )
     if dfp.empty:
         return _as_daily_df([], [], "pr_mm")
     # Clip to requested window
@@ -0,0 +1,146 @@
+# backend/services/event_store.py
+# Event corridor results kept for /api/event/{id}/export, shared by every worker.
+#
+# The default backend is one SQLite file per host (EVENT_STORE_PATH, next to
+# the series store by default). Payloads are stored as zlib-compressed JSON,
+# with an expiry per row. WAL mode lets readers run alongside the single
+# writer, and busy_timeout makes concurrent writers wait for the lock instead
+# of failing. Expired rows are hidden on read and deleted by a periodic purge
+# that runs on put. EVENT_STORE=memory keeps the old per-process dict behaviour,
+# and EVENT_STORE=package.module:factory plugs in another backend (anything
+# with put/get/purge/stats), e.g. one shared across hosts.
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from services.series_store import STORE_DIR
+from utils.jsonfast import dumps, loads
+
+logger = logging.getLogger("uvicorn")
+
+EVENT_STORE = os.getenv("EVENT_STORE", "sqlite")
+EVENT_STORE_PATH = os.getenv("EVENT_STORE_PATH") or os.path.join(STORE_DIR, "events.sqlite3")
+EVENT_STORE_TTL_SEC = int(os.getenv("EVENT_STORE_TTL_SEC", str(24 * 3600)))
+# run the expired-row purge at most this often (per process)
+EVENT_STORE_PURGE_SEC = int(os.getenv("EVENT_STORE_PURGE_SEC", "300"))
+_ZLIB_LEVEL = 6
+
+class MemoryEventStore:
+    """Per-process dict with expiry (exports only work on the worker that computed the event)."""
+
+    def __init__(self, ttl_sec: int = EVENT_STORE_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def put(self, event_id: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self.purge()
+            self._data[event_id] = (payload, time.time() + self.ttl_sec)
+
+    def get(self, event_id: str) -> Optional[Dict[str, Any]]:
+        hit = self._data.get(event_id)
+        if hit is None or hit[1] <= time.time():
+            return None
+        return hit[0]
+
+    def purge(self) -> int:
+        now = time.time()
+        dead = [k for k, (_, exp) in self._data.items() if exp <= now]
+        for k in dead:
+            self._data.pop(k, None)
+        return len(dead)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "entries": len(self._data)}
+
+class SQLiteEventStore:
+    """Host-wide store in one SQLite file; safe across threads, workers and processes."""
+
+    def __init__(self, path: str = EVENT_STORE_PATH, ttl_sec: int = EVENT_STORE_TTL_SEC,
+                 purge_sec: int = EVENT_STORE_PURGE_SEC):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.purge_sec = purge_sec
+        self._local = threading.local()
+        self._next_purge = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                " event_id TEXT PRIMARY KEY,"
+                " payload BLOB NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS events_expires ON events (expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread (sqlite3 connections aren't shareable across threads)
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def put(self, event_id: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        blob = zlib.compress(dumps(payload), _ZLIB_LEVEL)
+        with self._conn() as db:
+            db.execute(
+                "INSERT INTO events (event_id, payload, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (event_id, blob, now, now + self.ttl_sec),
+            )
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_sec
+            self.purge()
+
+    def get(self, event_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT payload FROM events WHERE event_id = ? AND expires_at > ?", (event_id, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        return loads(zlib.decompress(row[0]))
+
+    def purge(self) -> int:
+        with self._conn() as db:
+            return db.execute("DELETE FROM events WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        n, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM events").fetchone()
+        return {"backend": "sqlite", "path": self.path, "entries": n, "payload_bytes": size}
+
+def _make_store():
+    if EVENT_STORE == "memory":
+        return MemoryEventStore()
+    if EVENT_STORE == "sqlite":
+        try:
+            return SQLiteEventStore()
+        except (sqlite3.Error, OSError) as e:  # unwritable path etc.: keep serving, per-process
+            logger.warning("event store at %s unavailable (%s); using per-process memory", EVENT_STORE_PATH, e)
+            return MemoryEventStore()
+    mod, _, attr = EVENT_STORE.partition(":")
+    return getattr(importlib.import_module(mod), attr or "make_store")()
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+def get_event_store():
+    """The process-wide event store (created on first use)."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = _make_store()
+    return _STORE
@@ -3,6 +3,9 @@ import math
 from datetime import datetime
 from typing import Dict
 
+import numpy as np
+import pandas as pd
+
 def _doy_feats(dt: datetime) -> Dict[str, float]:
     doy = dt.timetuple().tm_yday
     return {
@@ -37,4 +40,33 @@ def build_features(row: Dict, when: datetime) -> Dict[str, float]:
         "heatindex_F": HI,
     }
     feats.update(_doy_feats(when))
-    return feats
\ No newline at end of file
+    return feats
+
+def build_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized build_features for a daily frame (DatetimeIndex; columns as the
+    row dict above): one feature row per day. Missing inputs stay NaN.
+    """
+    idx = pd.DatetimeIndex(df.index)
+
+    def col(k: str) -> np.ndarray:
+        if k not in df:
+            return np.full(len(df), np.nan)
+        return pd.to_numeric(df[k], errors="coerce").to_numpy(dtype=np.float64)
+
+    tmaxC = col("tmaxC")
+    rh = col("rh")
+    tmaxF = tmaxC * 9/5 + 32
+    doy = idx.dayofyear.to_numpy()
+    return pd.DataFrame({
+        "tmaxC": tmaxC,
+        "tminC": col("tminC"),
+        "tavgC": col("tavgC"),
+        "rh_pct": rh,
+        "ws_mph": col("ws_ms") * 2.23694,
+        "pr_mm": col("pr_mm"),
+        "tmaxF": tmaxF,
+        "heatindex_F": tmaxF + 0.2 * (rh/100.0) * (tmaxF - 80.0),  # simple proxy
+        "doy_sin": np.sin(2*np.pi*doy/366),
+        "doy_cos": np.cos(2*np.pi*doy/366),
+    }, index=idx)
@@ -1,7 +1,17 @@
 from __future__ import annotations
-import joblib, numpy as np
+import hashlib, logging, os, numpy as np
 from dataclasses import dataclass
-from typing import Dict, List
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from services.models.flat_trees import FlatTrees
+
+logger = logging.getLogger("uvicorn")
+
+MODELS_DIR = Path(__file__).resolve().parents[2] / "models"
+# flat-array export of evs_clf.joblib (scripts/export_evs_trees.py); "0" forces the joblib model
+EVS_FLAT_TREES = os.getenv("EVS_FLAT_TREES", "1") not in {"0", "false", "no"}
 
 @dataclass
 class EVSModelOut:
@@ -9,18 +19,73 @@ class EVSModelOut:
     p_low: float
     p_high: float
 
+def file_sha256(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
 class EVSModel:
-    def __init__(self, model_path: str, meta_path: str, band=0.1):
-        self.clf = joblib.load(model_path)
-        meta = joblib.load(meta_path)
-        self.feat_names: List[str] = meta["feat_names"]
+    """
+    EVS classifier. With `flat_path` (an up-to-date FlatTrees export of
+    `model_path`) inference is pure NumPy over mmap'd arrays; otherwise the
+    joblib model is unpickled, which needs scikit-learn and lightgbm.
+    """
+
+    def __init__(self, model_path: str, meta_path: str, band=0.1, flat_path: Optional[str] = None):
         self.band = band
+        self.clf = None
+        self.trees: Optional[FlatTrees] = None
+        if flat_path and (Path(flat_path) / "meta.json").exists():
+            trees = FlatTrees.load(flat_path)
+            src = trees.meta.get("source_sha256")
+            if src and Path(model_path).exists() and src != file_sha256(model_path):
+                logger.warning("EVS flat trees in %s are stale (source changed); using %s", flat_path, model_path)
+            else:
+                self.trees = trees
+                self.feat_names: List[str] = trees.meta["feat_names"]
+        if self.trees is None:
+            import joblib
+            self.clf = joblib.load(model_path)
+            meta = joblib.load(meta_path)
+            self.feat_names = meta["feat_names"]
+
+    @property
+    def backend(self) -> str:
+        return "flat_trees" if self.trees is not None else "joblib"
 
     def predict(self, feats: Dict[str, float]) -> EVSModelOut:
         x = np.array([[feats[k] for k in self.feat_names]], dtype=float)
-        p = float(self.clf.predict_proba(x)[0, 1])
+        if self.trees is not None:
+            p = float(self.trees.predict_proba(x)[0])
+        else:
+            p = float(self.clf.predict_proba(x)[0, 1])
         return EVSModelOut(
             p=p,
             p_low=max(0.0, p - self.band),
             p_high=min(1.0, p + self.band),
-        )
\ No newline at end of file
+        )
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        P(EVS ≥ 70) per row. X: feature frame (columns by name, e.g. from
+        build_feature_frame) or an (n, len(feat_names)) array in feat_names order.
+        """
+        if hasattr(X, "columns"):
+            X = X[self.feat_names].to_numpy(dtype=float)
+        X = np.asarray(X, dtype=float)
+        if X.shape[0] == 0:
+            return np.empty(0)
+        if self.trees is not None:
+            return self.trees.predict_proba(X)
+        return self.clf.predict_proba(X)[:, 1]
+
+@lru_cache(maxsize=1)
+def default_model() -> EVSModel:
+    """The shipped EVS model (backend/models), loaded once per process."""
+    return EVSModel(
+        model_path=str(MODELS_DIR / "evs_clf.joblib"),
+        meta_path=str(MODELS_DIR / "evs_meta.joblib"),
+        flat_path=str(MODELS_DIR / "evs_trees") if EVS_FLAT_TREES else None,
+    )
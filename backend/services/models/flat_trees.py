@@ -0,0 +1,166 @@
+# backend/services/models/flat_trees.py
+# Boosted-tree ensemble as flat NumPy arrays, evaluated without sklearn/lightgbm.
+#
+# All trees share one node table. A split node k sends a row to
+#   child[k]      if X[row, feature[k]] <= threshold[k]
+#   child[k] + 1  otherwise
+# (siblings are stored next to each other). A leaf has child[k] == k and
+# threshold +inf, so further steps keep it in place; value[k] is its output.
+# Trees are stored deepest first, so level d only walks the leading trees that
+# are still deeper than d: one gather/compare per level over (trees × rows).
+#
+# to_flat() converts a fitted LightGBM model (the only place lightgbm is
+# needed); save()/load() keep one .npy per array so load() can mmap them.
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+ARRAYS = ("feature", "threshold", "child", "value", "missing", "default_left", "roots", "tree_depth")
+
+# how a split treats missing values (LightGBM's missing_type)
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_MISSING_CODES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+# LightGBM's kZeroThreshold: |x| below this counts as zero
+_ZERO = 1e-35
+# rows walked together; keeps the (trees × rows) work arrays cache-sized
+ROW_BLOCK = 256
+
+class FlatTrees:
+    """Binary-logistic tree ensemble: raw score = sum of leaf values, p = sigmoid(raw)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        for k in ARRAYS:
+            # plain ndarray views: np.memmap's subclass hooks slow every gather
+            setattr(self, k, np.asarray(arrays[k]))
+        self.meta = meta
+        self.n_features = int(meta["n_features"])
+        self.sigmoid = float(meta.get("sigmoid", 1.0))
+        self.has_missing = bool(np.any(self.missing != MISSING_NONE))
+        # trees still descending at each level (tree_depth is non-increasing)
+        self.active = [int(np.count_nonzero(self.tree_depth > d)) for d in range(int(self.tree_depth.max(initial=0)))]
+
+    def raw_score(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"expected shape (n, {self.n_features}), got {X.shape}")
+        if not self.has_missing:
+            nan = np.isnan(X)
+            if nan.any():
+                X = np.where(nan, 0.0, X)  # missing_type None: NaN is treated as 0
+        if X.shape[0] <= ROW_BLOCK:
+            return self._raw_block(X)
+        return np.concatenate([self._raw_block(X[i:i + ROW_BLOCK]) for i in range(0, X.shape[0], ROW_BLOCK)])
+
+    def _raw_block(self, X: np.ndarray) -> np.ndarray:
+        flat = X.ravel()
+        offs = np.arange(X.shape[0], dtype=np.intp) * self.n_features
+        node = np.repeat(self.roots[:, None], X.shape[0], axis=1)  # (trees, rows)
+        for k in self.active:
+            cur = node[:k]
+            x = flat[offs + self.feature[cur]]
+            right = x > self.threshold[cur]
+            if self.has_missing:
+                miss = self.missing[cur]
+                isnan = np.isnan(x)
+                use_default = ((miss == MISSING_NAN) & isnan) | (
+                    (miss == MISSING_ZERO) & (isnan | (np.abs(x) <= _ZERO)))
+                right = np.where(use_default, ~self.default_left[cur], right)
+            node[:k] = self.child[cur] + right
+        return self.value[node].sum(axis=0)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """P(class 1) per row (column 1 of LGBMClassifier.predict_proba)."""
+        return 1.0 / (1.0 + np.exp(-self.sigmoid * self.raw_score(X)))
+
+    def save(self, path: str | Path) -> None:
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+        for k in ARRAYS:
+            np.save(out / f"{k}.npy", getattr(self, k))
+        (out / "meta.json").write_text(json.dumps(self.meta, indent=2) + "\n")
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "FlatTrees":
+        src = Path(path)
+        meta = json.loads((src / "meta.json").read_text())
+        arrays = {k: np.load(src / f"{k}.npy", mmap_mode="r" if mmap else None) for k in ARRAYS}
+        return cls(arrays, meta)
+
+def to_flat(model: Any, feat_names: Optional[List[str]] = None) -> FlatTrees:
+    """Convert a fitted LGBMClassifier / lightgbm.Booster (binary objective, numerical splits)."""
+    booster = getattr(model, "booster_", model)
+    dump = booster.dump_model()
+    objective = str(dump.get("objective", ""))
+    if not objective.startswith(("binary", "cross_entropy")) or dump.get("num_tree_per_iteration", 1) != 1:
+        raise ValueError(f"unsupported objective for flat export: {objective!r}")
+    if dump.get("average_output"):
+        raise ValueError("averaged (random forest) output is not supported")
+    m = re.search(r"sigmoid:([0-9.eE+-]+)", objective)
+
+    feature: List[int] = []
+    threshold: List[float] = []
+    child: List[int] = []
+    value: List[float] = []
+    missing: List[int] = []
+    default_left: List[bool] = []
+
+    def alloc() -> int:
+        feature.append(0)
+        threshold.append(np.inf)
+        child.append(len(child))
+        value.append(0.0)
+        missing.append(MISSING_NONE)
+        default_left.append(True)
+        return len(feature) - 1
+
+    def fill(k: int, node: Dict[str, Any]) -> int:
+        """Write `node` at slot k (children get a fresh sibling pair); returns the subtree depth."""
+        if "split_index" not in node:
+            value[k] = float(node["leaf_value"])
+            return 0
+        if node.get("decision_type") != "<=":
+            raise ValueError(f"unsupported split type {node.get('decision_type')!r} (categorical?)")
+        feature[k] = int(node["split_feature"])
+        threshold[k] = float(node["threshold"])
+        missing[k] = _MISSING_CODES[node.get("missing_type", "None")]
+        default_left[k] = bool(node.get("default_left", True))
+        lo = alloc()
+        alloc()
+        child[k] = lo
+        return 1 + max(fill(lo, node["left_child"]), fill(lo + 1, node["right_child"]))
+
+    trees = []
+    for tree in dump["tree_info"]:
+        root = alloc()
+        trees.append((fill(root, tree["tree_structure"]), root))
+    trees.sort(key=lambda t: -t[0])  # deepest first; summation order doesn't matter
+
+    n = len(feature)
+    idx = np.int32 if n < 2 ** 31 else np.int64
+    arrays = {
+        "feature": np.asarray(feature, dtype=np.int32),
+        "threshold": np.asarray(threshold, dtype=np.float64),
+        "child": np.asarray(child, dtype=idx),
+        "value": np.asarray(value, dtype=np.float64),
+        "missing": np.asarray(missing, dtype=np.int8),
+        "default_left": np.asarray(default_left, dtype=bool),
+        "roots": np.asarray([r for _, r in trees], dtype=idx),
+        "tree_depth": np.asarray([d for d, _ in trees], dtype=np.int32),
+    }
+    meta = {
+        "format": "flat_trees/1",
+        "objective": objective,
+        "sigmoid": float(m.group(1)) if m else 1.0,
+        "n_trees": len(trees),
+        "n_nodes": n,
+        "max_depth": max((d for d, _ in trees), default=0),
+        "n_features": int(dump["max_feature_idx"]) + 1,
+        "feat_names": list(feat_names) if feat_names else dump.get("feature_names"),
+    }
+    return FlatTrees(arrays, meta)
@@ -3,12 +3,16 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date, timedelta
 import os
+import time
 import numpy as np
 import pandas as pd
 
-# Your existing POWER point fetcher should return a daily DataFrame indexed by ISO date ("YYYY-MM-DD"),
+# History comes from the per-cell POWER cache as a PowerSeries (see services/series.py)
 # with columns: tmaxC (°C), rh (%), ws_ms (m/s), pr_mm (mm/day).
-from services.power import fetch_power_point
+from services.power import fetch_power_history, power_cell, history_fetched_at, history_stale, HISTORY_TTL_SEC
+from services.series import PowerSeries
+from services.series_store import get_store
+from utils.ttlcache import TTLCache
 # If you already have a DOY pooling util, you can swap _pool_same_doy for it.
 
 def _CtoF(c: float) -> float:
@@ -31,87 +35,102 @@ def _heat_index_F(Tf: float, RH: float) -> float:
         HI += 0.02 * (RH - 85) * (87 - Tf)
     return float(HI)
 
-def _poe_ge(series: pd.Series, thr: float) -> float:
-    series = pd.to_numeric(series, errors="coerce").dropna()
-    if series.empty: return np.nan
-    return float((series >= thr).mean())
+def heat_index_F_arr(Tf: np.ndarray, RH: np.ndarray) -> np.ndarray:
+    """Vectorized _heat_index_F (same branches, NaN where either input is NaN)."""
+    c1=-42.379; c2=2.04901523; c3=10.14333127
+    c4=-0.22475541; c5=-0.00683783; c6=-0.05481717
+    c7=0.00122874; c8=0.00085282; c9=-0.00000199
+    with np.errstate(invalid="ignore"):
+        HI=(c1 + c2*Tf + c3*RH + c4*Tf*RH + c5*Tf*Tf + c6*RH*RH +
+            c7*Tf*Tf*RH + c8*Tf*RH*RH + c9*Tf*Tf*RH*RH)
+        dry = (RH < 13) & (Tf >= 80) & (Tf <= 112)
+        HI = np.where(dry, HI - ((13 - RH)/4) * np.sqrt(np.clip((17 - np.abs(Tf-95))/17, 0, None)), HI)
+        muggy = (RH > 85) & (Tf >= 80) & (Tf <= 87)
+        HI = np.where(muggy, HI + 0.02 * (RH - 85) * (87 - Tf), HI)
+        HI = np.where(Tf < 80, Tf, HI)
+    HI[np.isnan(Tf) | np.isnan(RH)] = np.nan
+    return HI
+
+def _poe_ge(a: np.ndarray, thr: float) -> float:
+    a = a[~np.isnan(a)]
+    if a.size == 0: return np.nan
+    return float((a >= thr).mean())
+
+def _doy_distance(doy: np.ndarray, target_day: date) -> np.ndarray:
+    """Minimal circular distance (mod 366) between each DOY and the target's DOY."""
+    tgt_doy = target_day.timetuple().tm_yday
+    return np.minimum((doy - tgt_doy) % 366, (tgt_doy - doy) % 366)
 
 def _pool_same_doy(df_daily: pd.DataFrame, target_day: date, window_days: int = 14) -> pd.DataFrame:
     """Pool all historical days within ±window_days around the same DOY across all years."""
     if df_daily.empty:
         return df_daily
-    # Expect df_daily.index as strings "YYYY-MM-DD"
-    idx = pd.to_datetime(df_daily.index, errors="coerce").date
-    pool = []
-    tgt_doy = target_day.timetuple().tm_yday
-    for i, d in enumerate(idx):
-        doy = d.timetuple().tm_yday
-        # handle wrap around new year by comparing minimal circular distance
-        dist = min((doy - tgt_doy) % 366, (tgt_doy - doy) % 366)
-        if dist <= window_days:
-            pool.append(df_daily.iloc[i])
-    if not pool:
-        return pd.DataFrame(columns=df_daily.columns)
-    return pd.DataFrame(pool)
+    doy = pd.DatetimeIndex(pd.to_datetime(df_daily.index, errors="coerce")).dayofyear.to_numpy()
+    return df_daily[_doy_distance(doy, target_day) <= window_days]
 
 @dataclass
 class ExpectedEVS:
     total: float
     subs: dict  # keys: rain, wind, heat, humidity
 
-def expected_evs_for_day(
-    lat: float,
-    lon: float,
-    day: date,
-    window_days: int = None,
-    thresholds: dict | None = None,
-    weights: dict | None = None
-) -> ExpectedEVS:
-    """
-    POWER climatology → expected EVS for a calendar day.
-    We compute PoE of 'bad' conditions and map to expected subscores = 100*(1 - PoE_bad),
-    then combine with EVS weights.
-    """
-    # Defaults (judge-friendly)
-    window_days = window_days or int(os.getenv("CLIMO_WINDOW_DAYS", "14"))
-    thr = thresholds or {
-        "rain_mm_day": 10.0,   # heavy rain day
-        "wind_mph":    20.0,   # breezy/gusty
-        "hi_F":        95.0,   # uncomfortably hot
-        "rh_pct":      80.0,   # muggy
-    }
-    w = weights or {
-        "rain": 0.35,
-        "wind": 0.25,
-        "heat": 0.25,
-        "humidity": 0.15,
-    }
+DEFAULT_THRESHOLDS = {
+    "rain_mm_day": 10.0,   # heavy rain day
+    "wind_mph":    20.0,   # breezy/gusty
+    "hi_F":        95.0,   # uncomfortably hot
+    "rh_pct":      80.0,   # muggy
+}
+DEFAULT_WEIGHTS = {
+    "rain": 0.35,
+    "wind": 0.25,
+    "heat": 0.25,
+    "humidity": 0.15,
+}
+NEUTRAL_SUBS = {"rain": 50.0, "wind": 50.0, "heat": 50.0, "humidity": 50.0}
 
-    df = fetch_power_point(lat, lon)
-    if df is None or df.empty:
-        return ExpectedEVS(total=50.0, subs={"rain":50,"wind":50,"heat":50,"humidity":50})
+# Column order used by to_evs_arrays / expected_evs_from_arrays (and the process pool).
+EVS_COLUMNS = ("pr_mm", "ws_ms", "tmaxC", "rh")
 
-    pool = _pool_same_doy(df, day, window_days=window_days)
-    if pool.empty:
-        return ExpectedEVS(total=50.0, subs={"rain":50,"wind":50,"heat":50,"humidity":50})
+def to_evs_arrays(src: PowerSeries | pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """(doy int16[n], values float64[n, 4]) in EVS_COLUMNS order, from a PowerSeries or daily frame."""
+    if isinstance(src, PowerSeries):
+        return src.doy, np.column_stack([src.values(c) for c in EVS_COLUMNS])
+    doy = pd.DatetimeIndex(pd.to_datetime(src.index, errors="coerce")).dayofyear.to_numpy().astype(np.int16)
+    vals = np.column_stack([pd.to_numeric(src[c], errors="coerce").to_numpy(dtype=float) for c in EVS_COLUMNS])
+    return doy, vals
 
-    # Compute PoE of 'bad' conditions
-    poe_rain = _poe_ge(pool["pr_mm"].fillna(0.0), thr["rain_mm_day"])
-    poe_wind = _poe_ge((pool["ws_ms"]*2.23694).fillna(0.0), thr["wind_mph"])
+SUBSCORES = ("rain", "wind", "heat", "humidity")
 
-    # Heat index from Tmax + RH
-    Tf = _CtoF(pool["tmaxC"].astype(float))
-    RH = pool["rh"].astype(float)
-    hi_vals = pd.Series([_heat_index_F(t, r) for t, r in zip(Tf, RH)], index=pool.index)
-    poe_heat = _poe_ge(hi_vals, thr["hi_F"])
-    poe_rh   = _poe_ge(RH, thr["rh_pct"])
+def _bad_and_valid(vals: np.ndarray, thr: dict, rain_key: str = "rain_mm_day") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-day 'bad' flags and validity for each subscore (columns in SUBSCORES order).
+    Missing precip/wind count as 0 (valid); heat/RH NaNs are excluded.
+    Hourly rows (precip per hour, hourly temperature) pass rain_key="rain_mm_hr".
+    """
+    pr, ws, tmaxC, RH = vals[:, 0], vals[:, 1], vals[:, 2], vals[:, 3]
+    rain = np.nan_to_num(pr, nan=0.0)
+    wind = np.nan_to_num(ws * 2.23694, nan=0.0)
+    hi = heat_index_F_arr(_CtoF(tmaxC), RH)   # heat index from Tmax + RH
+    with np.errstate(invalid="ignore"):
+        bad = np.column_stack([
+            rain >= thr[rain_key],
+            wind >= thr["wind_mph"],
+            hi >= thr["hi_F"],
+            RH >= thr["rh_pct"],
+        ])
+    valid = np.column_stack([
+        np.ones(len(rain), dtype=bool),
+        np.ones(len(wind), dtype=bool),
+        ~np.isnan(hi),
+        ~np.isnan(RH),
+    ])
+    return bad, valid
 
-    # Expected subscores
+def _evs_from_counts(exceed: np.ndarray, valid: np.ndarray, weights: dict | None) -> ExpectedEVS:
+    """PoE_bad = exceed/valid per subscore → expected subscores 100*(1 - PoE_bad) → weighted EVS."""
+    w = weights or DEFAULT_WEIGHTS
     subs = {
-        "rain":     float(100 * (1 - poe_rain)) if not np.isnan(poe_rain) else 50.0,
-        "wind":     float(100 * (1 - poe_wind)) if not np.isnan(poe_wind) else 50.0,
-        "heat":     float(100 * (1 - poe_heat)) if not np.isnan(poe_heat) else 50.0,
-        "humidity": float(100 * (1 - poe_rh))   if not np.isnan(poe_rh)   else 50.0,
+        k: float(100 * (1 - float(e) / float(v))) if v > 0 else 50.0
+        for k, e, v in zip(SUBSCORES, exceed, valid)
     }
     # Weighted EVS total
     total = float(
@@ -121,3 +140,202 @@ def expected_evs_for_day(
         subs["humidity"] * w["humidity"]
     )
     return ExpectedEVS(total=total, subs=subs)
+
+def evs_from_count_arrays(exceed: np.ndarray, valid: np.ndarray, weights: dict | None = None) -> np.ndarray:
+    """
+    _evs_from_counts for many pools at once: exceed/valid [4, m] (SUBSCORES rows)
+    → float64[m, 5] with columns (total, *SUBSCORES); empty pools are neutral.
+    """
+    w = weights or DEFAULT_WEIGHTS
+    with np.errstate(invalid="ignore", divide="ignore"):
+        subs = np.where(valid > 0, 100 * (1 - exceed / np.maximum(valid, 1)), 50.0)
+    total = sum(subs[i] * w[k] for i, k in enumerate(SUBSCORES))
+    return np.column_stack([total, subs.T])
+
+def observed_counts(vals: np.ndarray, thresholds: dict, rain_key: str = "rain_mm_day") -> tuple[np.ndarray, np.ndarray]:
+    """
+    (exceed, valid) [4, n] for individual observations (rows of vals in
+    EVS_COLUMNS order). Rows with no data at all count as not observed
+    (valid 0), instead of the pooled convention of dry/calm for missing precip/wind.
+    """
+    bad, valid = _bad_and_valid(vals, thresholds, rain_key)
+    valid &= ~np.isnan(vals).all(axis=1)[:, None]
+    return (bad & valid).T.astype(np.int64), valid.T.astype(np.int64)
+
+def observed_daily_counts(src: PowerSeries, days, thresholds: dict | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """observed_counts for the given dates of a daily series; dates outside it are unobserved."""
+    days = list(days)
+    vals = np.full((len(days), len(EVS_COLUMNS)), np.nan)
+    if not src.empty:
+        off = np.array([(d - src.start).days for d in days], dtype=np.int64)
+        ok = (off >= 0) & (off < len(src))
+        vals[ok] = np.column_stack([src.values(c) for c in EVS_COLUMNS])[off[ok]]
+    return observed_counts(vals, thresholds or DEFAULT_THRESHOLDS)
+
+def expected_evs_from_arrays(
+    doy: np.ndarray,
+    vals: np.ndarray,
+    day: date,
+    window_days: int,
+    thresholds: dict | None = None,
+    weights: dict | None = None,
+) -> ExpectedEVS:
+    """Core of expected_evs_for_day on plain arrays (see to_evs_arrays); scans the pooled window."""
+    thr = thresholds or DEFAULT_THRESHOLDS
+    if doy.size == 0:
+        return ExpectedEVS(total=50.0, subs=dict(NEUTRAL_SUBS))
+    pool = vals[_doy_distance(doy, day) <= window_days]
+    if pool.shape[0] == 0:
+        return ExpectedEVS(total=50.0, subs=dict(NEUTRAL_SUBS))
+    bad, valid = _bad_and_valid(pool, thr)
+    return _evs_from_counts((bad & valid).sum(axis=0), valid.sum(axis=0), weights)
+
+# -------------------------------
+# O(1) lookups: per-DOY exceedance tables
+# -------------------------------
+# For the default thresholds we count, per day-of-year, how many days were
+# 'bad' and how many were valid. A ±window pool is a circular range of DOYs,
+# so with prefix sums over the (tiled) 366 bins any center day / window is
+# two lookups. Building a table is one vectorized pass over the history.
+
+@dataclass
+class ExceedanceTable:
+    exceed: np.ndarray   # int32[4, 366], rows in SUBSCORES order, column = DOY % 366
+    valid: np.ndarray    # int32[4, 366]
+
+    def __post_init__(self):
+        # prefix sums over three copies of the circle so wrapped windows are contiguous
+        self._cs_exceed = np.concatenate([np.zeros((4, 1), np.int64), np.cumsum(np.tile(self.exceed, 3), axis=1)], axis=1)
+        self._cs_valid = np.concatenate([np.zeros((4, 1), np.int64), np.cumsum(np.tile(self.valid, 3), axis=1)], axis=1)
+
+    def counts(self, centers: np.ndarray | int, window_days: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (exceed, valid) pooled over DOYs within circular distance ≤ window_days
+        of each center (DOY % 366). Shapes [4] for a scalar center, [4, m] otherwise.
+        """
+        c = np.asarray(centers, dtype=np.int64) % 366
+        if 2 * window_days + 1 >= 366:
+            ex = np.broadcast_to(self.exceed.sum(axis=1)[:, None], (4, c.size))
+            va = np.broadcast_to(self.valid.sum(axis=1)[:, None], (4, c.size))
+        else:
+            hi = c.ravel() + 366 + window_days + 1
+            lo = c.ravel() + 366 - window_days
+            ex = self._cs_exceed[:, hi] - self._cs_exceed[:, lo]
+            va = self._cs_valid[:, hi] - self._cs_valid[:, lo]
+        if c.ndim == 0:
+            return ex[:, 0], va[:, 0]
+        return ex, va
+
+    def to_array(self) -> np.ndarray:
+        return np.concatenate([self.exceed, self.valid]).astype(np.int32)
+
+    @classmethod
+    def from_array(cls, arr: np.ndarray) -> "ExceedanceTable":
+        arr = np.asarray(arr)
+        return cls(exceed=arr[:4], valid=arr[4:8])
+
+def build_exceedance_table(src: PowerSeries | pd.DataFrame, thresholds: dict | None = None) -> ExceedanceTable:
+    """One pass over the history → per-DOY exceedance/valid counts for each subscore."""
+    if src is None or src.empty:
+        z = np.zeros((4, 366), dtype=np.int32)
+        return ExceedanceTable(exceed=z, valid=z.copy())
+    doy, vals = to_evs_arrays(src)
+    bad, valid = _bad_and_valid(vals, thresholds or DEFAULT_THRESHOLDS)
+    k = doy.astype(np.int64) % 366
+    exceed = np.stack([np.bincount(k, weights=(bad[:, j] & valid[:, j]), minlength=366) for j in range(4)])
+    vcount = np.stack([np.bincount(k, weights=valid[:, j], minlength=366) for j in range(4)])
+    return ExceedanceTable(exceed=exceed.astype(np.int32), valid=vcount.astype(np.int32))
+
+def expected_evs_from_table(
+    table: ExceedanceTable,
+    day: date,
+    window_days: int = None,
+    weights: dict | None = None,
+) -> ExpectedEVS:
+    """expected_evs_for_day (default thresholds) in O(1) from a precomputed table."""
+    window_days = window_days or int(os.getenv("CLIMO_WINDOW_DAYS", "14"))
+    exceed, valid = table.counts(day.timetuple().tm_yday, window_days)
+    if valid[0] == 0:  # no days in the pooled window at all
+        return ExpectedEVS(total=50.0, subs=dict(NEUTRAL_SUBS))
+    return _evs_from_counts(exceed, valid, weights)
+
+def expected_evs_all_days(
+    table: ExceedanceTable,
+    window_days: int = None,
+    weights: dict | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Expected EVS for every DOY in one vectorized sweep.
+    Returns (total[366], subs[4, 366]); column k is DOY k % 366, subs rows in SUBSCORES order.
+    """
+    window_days = window_days or int(os.getenv("CLIMO_WINDOW_DAYS", "14"))
+    w = weights or DEFAULT_WEIGHTS
+    exceed, valid = table.counts(np.arange(366), window_days)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        subs = np.where(valid > 0, 100 * (1 - exceed / np.maximum(valid, 1)), 50.0)
+    subs[:, valid[0] == 0] = 50.0  # empty pool → neutral, as in expected_evs_from_table
+    total = sum(subs[i] * w[k] for i, k in enumerate(SUBSCORES))
+    return total, subs
+
+EXCEEDANCE_CACHE: TTLCache[ExceedanceTable] = TTLCache(maxsize=int(os.getenv("POWER_HISTORY_CACHE_MAX", "256")))
+
+def cell_exceedance_table(lat: float, lon: float) -> ExceedanceTable:
+    """
+    Default-threshold ExceedanceTable for the POWER cell containing (lat, lon).
+    Cached per process and published to the host store next to the history;
+    it follows the history it was built from (rebuilt when that is refreshed,
+    rechecked every minute while the history is being served stale).
+    """
+    cell = power_cell(lat, lon)
+
+    def compute():
+        series = fetch_power_history(lat, lon)
+        hist_at = history_fetched_at(lat, lon)
+        expires_at = hist_at + HISTORY_TTL_SEC if hist_at and not history_stale(lat, lon) else time.time() + 60
+        store = get_store()
+        key = f"exc_{cell[0]}_{cell[1]}"
+        if store is not None:
+            hit = store.get(key)
+            if hit is not None and hit[2].get("history_fetched_at") == hist_at:
+                return ExceedanceTable.from_array(hit[0]), expires_at
+        table = build_exceedance_table(series)
+        if store is not None:
+            meta = {"thresholds": DEFAULT_THRESHOLDS, "history_fetched_at": hist_at}
+            arr, _, _ = store.put(key, table.to_array(), meta)
+            table = ExceedanceTable.from_array(arr)
+        return table, expires_at
+
+    return EXCEEDANCE_CACHE.get_or_compute(cell, compute)
+
+def expected_evs_from_series(
+    src: PowerSeries | pd.DataFrame,
+    day: date,
+    window_days: int = None,
+    thresholds: dict | None = None,
+    weights: dict | None = None,
+) -> ExpectedEVS:
+    """expected_evs_for_day on an already-fetched POWER series (or daily frame)."""
+    window_days = window_days or int(os.getenv("CLIMO_WINDOW_DAYS", "14"))
+    if src is None or src.empty:
+        return ExpectedEVS(total=50.0, subs=dict(NEUTRAL_SUBS))
+    doy, vals = to_evs_arrays(src)
+    return expected_evs_from_arrays(doy, vals, day, window_days, thresholds, weights)
+
+def expected_evs_for_day(
+    lat: float,
+    lon: float,
+    day: date,
+    window_days: int = None,
+    thresholds: dict | None = None,
+    weights: dict | None = None
+) -> ExpectedEVS:
+    """
+    POWER climatology → expected EVS for a calendar day.
+    We compute PoE of 'bad' conditions and map to expected subscores = 100*(1 - PoE_bad),
+    then combine with EVS weights. Default thresholds use the cell's precomputed
+    ExceedanceTable (O(1)); custom thresholds scan the pooled window.
+    """
+    if thresholds is None:
+        return expected_evs_from_table(cell_exceedance_table(lat, lon), day, window_days, weights)
+    series = fetch_power_history(lat, lon)
+    return expected_evs_from_series(series, day, window_days, thresholds, weights)
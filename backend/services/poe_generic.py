@@ -5,37 +5,27 @@ from __future__ import annotations
 
 import numpy as np
 import pandas as pd
-from datetime import datetime
-from math import sqrt
+from datetime import date, datetime
 from typing import List, Tuple, Dict, Any
 
+from services.poe_expect import heat_index_F_arr
+from services.series import PowerSeries
+
 def _CtoF(c): return c*9/5+32
 def _to_mph(ms): return ms*2.23694
 
-def _heat_index_F(Tf, RH):
-    if pd.isna(Tf) or pd.isna(RH): return np.nan
-    if Tf < 80: return Tf
-    c1=-42.379; c2=2.04901523; c3=10.14333127
-    c4=-0.22475541; c5=-0.00683783; c6=-0.05481717
-    c7=0.00122874; c8=0.00085282; c9=-0.00000199
-    HI=(c1+c2*Tf+c3*RH+c4*Tf*RH+c5*Tf*Tf+c6*RH*RH+c7*Tf*Tf*RH+c8*Tf*RH*RH+c9*Tf*Tf*RH*RH)
-    if RH<13 and 80<=Tf<=112: HI -= ((13-RH)/4)*sqrt((17-abs(Tf-95))/17)
-    if RH>85 and 80<=Tf<=87:  HI += 0.02*(RH-85)*(87-Tf)
-    return HI
-
-# Registry: how to compute each variable from the merged daily dataframe
-# df columns assumed: tmaxC,tminC,tavgC,rh,ws_ms,pr_mm
-def series_for(var: str, df: pd.DataFrame) -> pd.Series:
-    if var == "precip_mm_day": return df["pr_mm"].fillna(0.0)
-    if var == "precip_mm_hr":  return (df["pr_mm"].fillna(0.0) / 24.0)
-    if var == "wind_mph":      return _to_mph(df["ws_ms"])
-    if var == "gust_mph":      return _to_mph(df["ws_ms"]) * 1.6
-    if var == "rh_pct":        return df["rh"].clip(0,100)
-    if var == "tmaxF":         return _CtoF(df["tmaxC"])
-    if var == "tminF":         return _CtoF(df["tminC"])
+# Registry: how to compute each variable from the daily POWER series
+# columns: tmaxC,tminC,tavgC,rh,ws_ms,pr_mm
+def series_for(var: str, s: PowerSeries) -> np.ndarray:
+    if var == "precip_mm_day": return np.nan_to_num(s.values("pr_mm"), nan=0.0)
+    if var == "precip_mm_hr":  return np.nan_to_num(s.values("pr_mm"), nan=0.0) / 24.0
+    if var == "wind_mph":      return _to_mph(s.values("ws_ms"))
+    if var == "gust_mph":      return _to_mph(s.values("ws_ms")) * 1.6
+    if var == "rh_pct":        return np.clip(s.values("rh"), 0, 100)
+    if var == "tmaxF":         return _CtoF(s.values("tmaxC"))
+    if var == "tminF":         return _CtoF(s.values("tminC"))
     if var == "heatindex_F":
-        tmaxF = _CtoF(df["tmaxC"]); rh = df["rh"].clip(0,100)
-        return pd.Series([_heat_index_F(T, R) for T, R in zip(tmaxF, rh)], index=df.index)
+        return heat_index_F_arr(_CtoF(s.values("tmaxC")), np.clip(s.values("rh"), 0, 100))
     raise KeyError(f"Unsupported var: {var}")
 
 UNITS = {
@@ -43,16 +33,27 @@ UNITS = {
   "rh_pct":"%","tmaxF":"°F","tminF":"°F","heatindex_F":"°F"
 }
 
-def _pool_same_doy(series: pd.Series, center: datetime, window_days: int) -> np.ndarray:
-    doy = int(center.strftime("%j")); half = window_days//2
-    vals=[]
-    for y in range(series.index.year.min(), series.index.year.max()+1):
-        base = pd.Timestamp(y,1,1) + pd.Timedelta(days=doy-1)
-        for d in range(-half, half+1):
-            t = base + pd.Timedelta(days=d)
-            if t in series.index:
-                vals.append(series.loc[t])
-    a = np.asarray(vals, dtype=float)
+def _doy_offsets(s: PowerSeries, center: datetime) -> np.ndarray:
+    """
+    Days between each sample and the same DOY as `center` in the nearest year
+    of the series (Jan 1 + doy-1, so doy 366 maps to Jan 1 of the next year in
+    non-leap years).
+    """
+    if s.empty:
+        return np.empty(0, dtype=np.int64)
+    doy = int(center.strftime("%j"))
+    y0, y1 = s.start.year, s.end.year
+    bases = np.array([date(y, 1, 1).toordinal() + doy - 1 for y in range(y0, y1 + 1)], dtype=np.int64)
+    t = s.ordinals
+    i = np.clip(np.searchsorted(bases, t), 1, len(bases) - 1) if len(bases) > 1 else np.zeros(len(t), dtype=np.int64)
+    d = np.abs(t - bases[i])
+    if len(bases) > 1:
+        d = np.minimum(d, np.abs(t - bases[i - 1]))
+    return d
+
+def _pool_same_doy(a: np.ndarray, offsets: np.ndarray, window_days: int) -> np.ndarray:
+    """Samples within ±window_days//2 of the target DOY in every year, NaNs dropped."""
+    a = a[offsets <= window_days // 2]
     return a[~np.isnan(a)]
 
 def _hist(a: np.ndarray, bins):
@@ -85,29 +86,69 @@ def _poe_curve(a: np.ndarray, op: str, n=40):
     poe = [ _poe_value(a, t, op) for t in thr ]
     return {"thresholds": thr.tolist(), "poe": poe}
 
-def compute_generic_poe(df: pd.DataFrame, center: datetime, window_days: int, metrics: list):
-    results = {}
-    for m in metrics:
+def _poe_sorted(a: np.ndarray, thr, op: str):
+    """_poe_value on an ascending array (binary search instead of a scan); thr may be an array."""
+    n = a.size
+    if op == "ge": return (n - np.searchsorted(a, thr, side="left")) / n
+    if op == "le": return np.searchsorted(a, thr, side="right") / n
+    raise ValueError("op must be 'ge' or 'le'")
+
+# default bins by var family
+DEFAULT_BINS = {
+    "precip_mm_day":[0,1,5,10,15,25,50],
+    "precip_mm_hr":[0,0.2,0.5,1,2,5,10],
+    "wind_mph":[0,5,10,15,20,25,35,50],
+    "gust_mph":[0,10,15,20,25,30,35,45,60],
+    "rh_pct":[20,30,40,50,60,70,80,90,100],
+    "tmaxF":[60,70,80,85,90,95,100,105],
+    "tminF":[-10,0,10,20,32,40,50,60],
+    "heatindex_F":[70,80,85,90,95,100,105]
+}
+
+def _metric_result(a: np.ndarray, var: str, thr: float, op: str) -> Dict[str, Any]:
+    """PoE / histogram / CDF / PoE curve of one pooled sample, given sorted ascending."""
+    if a.size == 0:
+        return {"poe": 0.0, "hist": _hist(a, DEFAULT_BINS.get(var, 10)), "cdf": _cdf(a),
+                "poe_curve": _poe_curve(a, op), "units": UNITS.get(var, "")}
+    n = a.size
+    curve_thr = np.quantile(a, np.linspace(0.02, 0.98, 40))
+    return {
+        "poe": float(_poe_sorted(a, thr, op)),
+        "hist": _hist(a, DEFAULT_BINS.get(var, 10)),  # auto if unknown
+        "cdf": {"x": a.tolist(), "F": (np.arange(1, n+1) / n).tolist()},
+        "poe_curve": {"thresholds": curve_thr.tolist(), "poe": _poe_sorted(a, curve_thr, op).tolist()},
+        "units": UNITS.get(var, "")
+    }
+
+def compute_generic_poe_sweep(df: PowerSeries | pd.DataFrame, center: datetime, windows: List[int], metrics: list):
+    """
+    compute_generic_poe for several window sizes at once: {window_days: (results, samples)}.
+
+    Windows are nested (±w//2 days around the same DOY), so each variable is
+    pooled once for the widest window and sorted by value once; every window's
+    sample is then the sorted values whose DOY distance is within its half
+    width (already in order, so CDFs/quantiles need no further sort).
+    """
+    s = df if isinstance(df, PowerSeries) else PowerSeries.from_frame(df)
+    offsets = _doy_offsets(s, center)
+    windows = sorted(set(int(w) for w in windows))
+    near = np.flatnonzero(offsets <= max(windows) // 2)
+    dist = offsets[near]
+    out: Dict[int, Tuple[Dict[str, Any], int]] = {w: ({}, 0) for w in windows}
+    for i, m in enumerate(metrics):
         var, thr, op = m["var"], float(m["threshold"]), m.get("op","ge")
-        a = _pool_same_doy(series_for(var, df), center, window_days)
-        # default bins by var family
-        default_bins = {
-            "precip_mm_day":[0,1,5,10,15,25,50],
-            "precip_mm_hr":[0,0.2,0.5,1,2,5,10],
-            "wind_mph":[0,5,10,15,20,25,35,50],
-            "gust_mph":[0,10,15,20,25,30,35,45,60],
-            "rh_pct":[20,30,40,50,60,70,80,90,100],
-            "tmaxF":[60,70,80,85,90,95,100,105],
-            "tminF":[-10,0,10,20,32,40,50,60],
-            "heatindex_F":[70,80,85,90,95,100,105]
-        }.get(var, 10)  # auto if unknown
-        hist = _hist(a, default_bins)
-        results[var] = {
-            "poe": _poe_value(a, thr, op),
-            "hist": hist,
-            "cdf": _cdf(a),
-            "poe_curve": _poe_curve(a, op),
-            "units": UNITS.get(var, "")
-        }
-    samples = len(_pool_same_doy(series_for(metrics[0]["var"], df), center, window_days)) if metrics else 0
-    return results, samples
+        v = series_for(var, s)[near]
+        keep = ~np.isnan(v)
+        v, d = v[keep], dist[keep]
+        rank = np.argsort(v, kind="stable")
+        v, d = v[rank], d[rank]
+        for w in windows:
+            a = v[d <= w // 2]
+            results, samples = out[w]
+            results[var] = _metric_result(a, var, thr, op)
+            if i == 0:
+                out[w] = (results, int(a.size))
+    return out
+
+def compute_generic_poe(df: PowerSeries | pd.DataFrame, center: datetime, window_days: int, metrics: list):
+    return compute_generic_poe_sweep(df, center, [window_days], metrics)[window_days]
@@ -0,0 +1,172 @@
+# backend/services/poe_hourly.py
+# Sub-daily EVS: hourly climatology and observed hours for event bins.
+#
+# The hourly counterpart of poe_expect's ExceedanceTable. Per cell we count,
+# for each (day-of-year, UTC hour), how many hours were 'bad' and how many were
+# valid, over the climatology years' hourly chunks. The pool for a bin hour is
+# then the same hour of day on every DOY within ±window_days, summed from that
+# table (no per-bin scan or refetch). A bin covering several hours pools the
+# counts of all of them, as a daily pool does across days.
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.poe_expect import DEFAULT_THRESHOLDS, evs_from_count_arrays, observed_counts, _bad_and_valid
+from services.power import power_cell
+from services.power_hourly import HOURLY_FIRST_YEAR, climo_years, hourly_chunks
+from utils.ttlcache import TTLCache
+
+# 'bad hour' thresholds: the daily ones, with rain per hour instead of per day
+HOURLY_THRESHOLDS = {
+    "rain_mm_hr": 1.0,
+    **{k: v for k, v in DEFAULT_THRESHOLDS.items() if k != "rain_mm_day"},
+}
+
+@dataclass
+class HourlyExceedanceTable:
+    exceed: np.ndarray   # int32[4, 366, 24]: SUBSCORES rows, DOY % 366, UTC hour
+    valid: np.ndarray    # int32[4, 366, 24]
+
+    def counts(self, doy: int, window_days: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(exceed, valid) [4, 24]: each hour of day pooled over DOYs within ±window_days of doy."""
+        if 2 * window_days + 1 >= 366:
+            return self.exceed.sum(axis=1), self.valid.sum(axis=1)
+        cols = np.arange(doy - window_days, doy + window_days + 1) % 366
+        return self.exceed[:, cols].sum(axis=1), self.valid[:, cols].sum(axis=1)
+
+def _chunk_rows(chunk: np.ndarray) -> np.ndarray:
+    """Chunk [4, hours] (HOURLY_COLUMNS order) → float64[hours, 4] in EVS_COLUMNS order."""
+    return np.asarray(chunk, dtype=np.float64).T
+
+def build_hourly_table(chunks: Iterable[np.ndarray], thresholds: dict | None = None) -> HourlyExceedanceTable:
+    """One vectorized pass per year chunk → per-(DOY, hour) exceedance/valid counts."""
+    thr = thresholds or HOURLY_THRESHOLDS
+    exceed = np.zeros((4, 366 * 24), dtype=np.int64)
+    valid = np.zeros((4, 366 * 24), dtype=np.int64)
+    for chunk in chunks:
+        vals = _chunk_rows(chunk)
+        bad, ok = _bad_and_valid(vals, thr, rain_key="rain_mm_hr")
+        ok &= ~np.isnan(vals).all(axis=1)[:, None]  # hours POWER has no data for
+        k = np.arange(vals.shape[0])
+        key = ((k // 24 + 1) % 366) * 24 + k % 24   # (DOY % 366, hour) as in ExceedanceTable
+        for j in range(4):
+            exceed[j] += np.bincount(key, weights=bad[:, j] & ok[:, j], minlength=366 * 24).astype(np.int64)
+            valid[j] += np.bincount(key, weights=ok[:, j], minlength=366 * 24).astype(np.int64)
+    return HourlyExceedanceTable(exceed=exceed.reshape(4, 366, 24).astype(np.int32),
+                                 valid=valid.reshape(4, 366, 24).astype(np.int32))
+
+# -------------------------------
+# Bins → hours
+# -------------------------------
+def bin_hours(starts: Sequence[datetime], step_min: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    UTC hours overlapped by each bin [start, start + step_min): (epoch hour
+    numbers, owning bin index), both int64 and in bin order.
+    """
+    t0 = np.array([int(s.astimezone(timezone.utc).timestamp()) for s in starts], dtype=np.int64)
+    h0 = t0 // 3600
+    h1 = -(-(t0 + step_min * 60) // 3600)  # ceil
+    n = np.maximum(h1 - h0, 1)
+    owner = np.repeat(np.arange(len(starts)), n)
+    hours = np.repeat(h0, n) + (np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n))
+    return hours, owner
+
+def _hour_fields(hours: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(year, index within that year's chunk, DOY) for epoch hour numbers."""
+    t = hours.astype("datetime64[h]")
+    year = t.astype("datetime64[Y]")
+    idx = (t - year.astype("datetime64[h]")).astype(np.int64)
+    return year.astype(np.int64) + 1970, idx, idx // 24 + 1
+
+def _per_bin(ex: np.ndarray, va: np.ndarray, owner: np.ndarray, n_bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    return (np.stack([np.bincount(owner, weights=ex[j], minlength=n_bins) for j in range(4)]),
+            np.stack([np.bincount(owner, weights=va[j], minlength=n_bins) for j in range(4)]))
+
+def climo_bin_counts(table: HourlyExceedanceTable, hours: np.ndarray, window_days: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pooled (exceed, valid) [4, len(hours)], one table lookup per distinct DOY."""
+    _, idx, doy = _hour_fields(hours)
+    hod = idx % 24
+    ex = np.zeros((4, len(hours)), dtype=np.int64)
+    va = np.zeros((4, len(hours)), dtype=np.int64)
+    for d in np.unique(doy):
+        sel = doy == d
+        e, v = table.counts(int(d) % 366, window_days)
+        ex[:, sel], va[:, sel] = e[:, hod[sel]], v[:, hod[sel]]
+    return ex, va
+
+def observed_bin_counts(chunks: Dict[int, np.ndarray], hours: np.ndarray, thresholds: dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Observed (exceed, valid) [4, len(hours)]; hours without a chunk or data are unobserved."""
+    year, idx, _ = _hour_fields(hours)
+    vals = np.full((len(hours), 4), np.nan)
+    for y, chunk in chunks.items():
+        sel = (year == y) & (idx < chunk.shape[1])
+        vals[sel] = _chunk_rows(chunk[:, idx[sel]])
+    return observed_counts(vals, thresholds, rain_key="rain_mm_hr")
+
+# -------------------------------
+# Per-cell tables and bin scores
+# -------------------------------
+HOURLY_TABLE_CACHE: TTLCache[HourlyExceedanceTable] = TTLCache(maxsize=int(os.getenv("POWER_HOURLY_TABLE_CACHE_MAX", "256")))
+_TABLE_TTL_SEC = 24 * 3600
+
+def _table_key(cell: Tuple[int, int], thresholds: dict, years: Sequence[int]):
+    return (cell, tuple(years), tuple(sorted(thresholds.items())))
+
+def cached_hourly_table(cell: Tuple[int, int], thresholds: dict | None = None,
+                        years: Optional[Sequence[int]] = None) -> Optional[HourlyExceedanceTable]:
+    return HOURLY_TABLE_CACHE.get(_table_key(cell, thresholds or HOURLY_THRESHOLDS, years or climo_years()))
+
+def cell_hourly_table(lat: float, lon: float, thresholds: dict | None = None,
+                      years: Optional[Sequence[int]] = None) -> HourlyExceedanceTable:
+    """
+    Hourly climatology table for the POWER cell containing (lat, lon), over the
+    climo_years() chunks. Built once per (cell, years, thresholds): the chunks
+    are complete years, so the table only changes when the year set does.
+    """
+    cell = power_cell(lat, lon)
+    thr = thresholds or HOURLY_THRESHOLDS
+    years = list(years or climo_years())
+    return HOURLY_TABLE_CACHE.get_or_compute(_table_key(cell, thr, years), lambda: (
+        build_hourly_table(hourly_chunks(cell, years).values(), thr), time.time() + _TABLE_TTL_SEC,
+    ))
+
+def observed_years(starts: Sequence[datetime], step_min: int) -> List[int]:
+    """Years of hourly chunks an observed (reanalysis) score of these bins needs."""
+    hours, _ = bin_hours(starts, step_min)
+    now = datetime.now(timezone.utc).year
+    years = np.unique(_hour_fields(hours)[0]) if hours.size else []
+    return [int(y) for y in years if HOURLY_FIRST_YEAR <= y <= now]
+
+def hourly_bin_evs(
+    table: HourlyExceedanceTable,
+    starts: Sequence[datetime],
+    step_min: int,
+    window_days: int,
+    weights: dict | None = None,
+    observed: Optional[Dict[int, np.ndarray]] = None,
+    thresholds: dict | None = None,
+) -> Tuple[np.ndarray, int]:
+    """
+    EVS per bin, float64[bins, 5] (total, *SUBSCORES), and the number of bins
+    scored from climatology although observations were asked for.
+    Climatology: each bin pools the climatology counts of all its hours.
+    observed (year → chunk, i.e. reanalysis): each bin scores the hours POWER
+    has data for; bins with none fall back to climatology.
+    """
+    hours, owner = bin_hours(starts, step_min)
+    n = len(starts)
+    ex, va = _per_bin(*climo_bin_counts(table, hours, window_days), owner, n)
+    fallback = 0
+    if observed is not None:
+        oex, ova = _per_bin(*observed_bin_counts(observed, hours, thresholds or HOURLY_THRESHOLDS), owner, n)
+        seen = ova.max(axis=0) > 0
+        ex[:, seen], va[:, seen] = oex[:, seen], ova[:, seen]
+        fallback = int(n - seen.sum())
+    return evs_from_count_arrays(ex, va, weights), fallback
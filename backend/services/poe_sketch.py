@@ -0,0 +1,201 @@
+# backend/services/poe_sketch.py
+# Mergeable fixed-bin histogram sketches of the pooled DOY±window sample, for
+# area PoE.
+#
+# A point PoE keeps the raw pooled sample (a few thousand values per variable).
+# An area answer would need that for every cell, so here each (POWER cell, DOY,
+# window) is reduced once to per-variable counts over fixed bin edges, plus the
+# sample min/max. Bin edges are the same for every cell, so sketches merge by
+# adding counts. Thresholds, quantiles, CDFs and PoE curves are then read off
+# the merged counts, interpolating linearly within a bin; an answer is off by
+# at most the mass of the bin the threshold falls in. A sketch is ~20 KB (2.5k
+# int64 counts) whatever the window or history length, and an area costs one
+# sketch per cell.
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from services.poe_generic import DEFAULT_BINS, UNITS, _doy_offsets, series_for
+from services.power import cell_center, fetch_power_history, history_version
+from services.series import PowerSeries
+from utils.http_cache import CLIMO_CACHE_MAX_AGE
+from utils.ttlcache import TTLCache
+
+def _grid(lo: float, hi: float, step: float) -> np.ndarray:
+    return np.round(np.arange(lo, hi + step / 2, step), 6)
+
+# Bin edges per variable. Values below the first / above the last edge land in
+# two open bins, spread over [sample min, first edge) / [last edge, sample max].
+_PRECIP_DAY = np.concatenate([[0.0, 0.01], _grid(0.25, 150.0, 0.25)])  # [0, 0.01) holds the dry days
+SKETCH_EDGES: Dict[str, np.ndarray] = {
+    "precip_mm_day": _PRECIP_DAY,
+    "precip_mm_hr": _PRECIP_DAY / 24.0,
+    "wind_mph": _grid(0.0, 100.0, 0.5),
+    "gust_mph": _grid(0.0, 160.0, 0.5),
+    "rh_pct": _grid(0.0, 100.0, 1.0),
+    "tmaxF": _grid(-80.0, 140.0, 1.0),
+    "tminF": _grid(-80.0, 140.0, 1.0),
+    "heatindex_F": _grid(-80.0, 180.0, 1.0),
+}
+SKETCH_VARS: Tuple[str, ...] = tuple(SKETCH_EDGES)
+BIN_WIDTH: Dict[str, float] = {v: round(float(np.diff(e).max()), 6) for v, e in SKETCH_EDGES.items()}
+# counts layout: per variable, len(edges) + 1 bins (under, interior..., over), concatenated
+_OFFSETS = np.cumsum([0] + [len(SKETCH_EDGES[v]) + 1 for v in SKETCH_VARS])
+
+@dataclass
+class HistSketch:
+    counts: np.ndarray   # int64[_OFFSETS[-1]], SKETCH_VARS blocks
+    lo: np.ndarray       # float64[len(SKETCH_VARS)], sample min (+inf if empty)
+    hi: np.ndarray       # float64[len(SKETCH_VARS)], sample max (-inf if empty)
+
+    @classmethod
+    def empty(cls) -> "HistSketch":
+        k = len(SKETCH_VARS)
+        return cls(np.zeros(int(_OFFSETS[-1]), np.int64), np.full(k, np.inf), np.full(k, -np.inf))
+
+    def merge(self, other: "HistSketch") -> "HistSketch":
+        return HistSketch(self.counts + other.counts, np.minimum(self.lo, other.lo), np.maximum(self.hi, other.hi))
+
+    @classmethod
+    def merge_all(cls, sketches: Iterable["HistSketch"]) -> "HistSketch":
+        out = cls.empty()
+        for s in sketches:
+            out = out.merge(s)
+        return out
+
+    def _segments(self, var: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(segment edges, counts): len(edges) == len(counts) + 1, open bins closed off at min/max."""
+        k = SKETCH_VARS.index(var)
+        c = self.counts[_OFFSETS[k]:_OFFSETS[k + 1]]
+        e = SKETCH_EDGES[var]
+        lo = min(self.lo[k], e[0]) if np.isfinite(self.lo[k]) else e[0]
+        hi = max(self.hi[k], e[-1]) if np.isfinite(self.hi[k]) else e[-1]
+        return np.concatenate([[lo], e, [hi]]), c
+
+    def n(self, var: str) -> int:
+        return int(self._segments(var)[1].sum())
+
+    def count_below(self, var: str, x, inclusive: bool = False) -> np.ndarray:
+        """
+        Estimated number of values < x (≤ x if inclusive), x scalar or array.
+        Each bin's count is spread uniformly over it; a zero-width bin is a
+        point mass at its edge.
+        """
+        e, c = self._segments(var)
+        x = np.asarray(x, dtype=float)[..., None]
+        width = np.diff(e)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.clip((x - e[:-1]) / width, 0.0, 1.0)
+        point = (x >= e[:-1]) if inclusive else (x > e[:-1])
+        frac = np.where(width > 0, frac, point)
+        return (frac * c).sum(axis=-1)
+
+    def poe(self, var: str, thr, op: str) -> np.ndarray:
+        n = self.n(var)
+        if n == 0:
+            return np.zeros(np.shape(thr))
+        if op == "ge": return 1.0 - self.count_below(var, thr) / n
+        if op == "le": return self.count_below(var, thr, inclusive=True) / n
+        raise ValueError("op must be 'ge' or 'le'")
+
+    def quantile(self, var: str, q) -> np.ndarray:
+        """Inverse of the interpolated CDF."""
+        e, c = self._segments(var)
+        cum = np.concatenate([[0], np.cumsum(c)]).astype(float)
+        target = np.asarray(q, dtype=float) * cum[-1]
+        # first segment whose cumulative count reaches the target; interpolate inside it
+        i = np.clip(np.searchsorted(cum, target, side="left"), 1, len(c))
+        width = cum[i] - cum[i - 1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(width > 0, (target - cum[i - 1]) / width, 1.0)
+        return e[i - 1] + frac * (e[i] - e[i - 1])
+
+    def result(self, var: str, thr: float, op: str) -> Dict[str, Any]:
+        """Same fields as a point result (poe_generic._metric_result), read off the sketch."""
+        e, c = self._segments(var)
+        n = int(c.sum())
+        units = UNITS.get(var, "")
+        bins = DEFAULT_BINS.get(var) or np.linspace(e[0], e[-1], 11).tolist()
+        if n == 0:
+            return {"poe": 0.0, "hist": {"bins": bins, "pdf": [0] * (len(bins) - 1)}, "cdf": {"x": [], "F": []},
+                    "poe_curve": {"thresholds": [], "poe": []}, "units": units}
+        # histogram over the display bins; values outside them are dropped, as np.histogram does
+        below = self.count_below(var, bins)
+        below[-1] = self.count_below(var, bins[-1], inclusive=True)
+        h = np.diff(below)
+        total = h.sum()
+        occupied = np.flatnonzero(c)
+        curve_thr = self.quantile(var, np.linspace(0.02, 0.98, 40))
+        return {
+            "poe": float(self.poe(var, thr, op)),
+            "hist": {"bins": list(bins), "pdf": (h / total).tolist() if total else [0] * len(h)},
+            # one step per occupied bin, at its upper edge
+            "cdf": {"x": e[occupied + 1].tolist(), "F": (np.cumsum(c)[occupied] / n).tolist()},
+            "poe_curve": {"thresholds": curve_thr.tolist(), "poe": self.poe(var, curve_thr, op).tolist()},
+            "units": units,
+        }
+
+def sketch_from_series(series: PowerSeries, center: datetime, window_days: int) -> HistSketch:
+    """Sketch of every SKETCH_VARS variable over the same-DOY ±window_days//2 pool."""
+    out = HistSketch.empty()
+    if series.empty:
+        return out
+    near = np.flatnonzero(_doy_offsets(series, center) <= window_days // 2)
+    for k, var in enumerate(SKETCH_VARS):
+        v = series_for(var, series)[near]
+        v = v[~np.isnan(v)]
+        if v.size == 0:
+            continue
+        edges = SKETCH_EDGES[var]
+        out.counts[_OFFSETS[k]:_OFFSETS[k + 1]] = np.bincount(np.searchsorted(edges, v, side="right"),
+                                                              minlength=len(edges) + 1)
+        out.lo[k], out.hi[k] = float(v.min()), float(v.max())
+    return out
+
+SKETCH_CACHE: TTLCache[HistSketch] = TTLCache(maxsize=int(os.getenv("POE_SKETCH_CACHE_MAX", "4096")))
+
+def cell_sketch(cell: Tuple[int, int], center: datetime, window_days: int) -> HistSketch:
+    """
+    Sketch for one POWER cell, cached by (cell, history version, DOY, window);
+    a refreshed history gets a new version and so a fresh sketch.
+    """
+    lat, lon = cell_center(cell)
+    series = fetch_power_history(lat, lon)
+    key = (cell, history_version(lat, lon, fetch=False), center.timetuple().tm_yday, window_days)
+    return SKETCH_CACHE.get_or_compute(key, lambda: (
+        sketch_from_series(series, center, window_days), time.time() + CLIMO_CACHE_MAX_AGE,
+    ))
+
+def area_poe(cells: List[Tuple[int, int]], center: datetime, window_days: int,
+             metrics: list) -> Tuple[Dict[str, Any], List[Dict[str, Any]], int]:
+    """
+    Area PoE from merged cell sketches: (results per var, per-cell PoEs, samples).
+    results[var]["poe"] pools every cell-day in the area; poe_cell_min/max are
+    the spread across cells (poe_cell_max is a lower bound on "anywhere").
+    """
+    sketches = [cell_sketch(c, center, window_days) for c in cells]
+    merged = HistSketch.merge_all(sketches)
+    per_cell = []
+    for cell, sk in zip(cells, sketches):
+        lat, lon = cell_center(cell)
+        per_cell.append({
+            "lat": lat, "lon": lon,
+            "samples": sk.n(metrics[0]["var"]),
+            "poe": {m["var"]: round(float(sk.poe(m["var"], float(m["threshold"]), m.get("op", "ge"))), 6)
+                    for m in metrics},
+        })
+    results: Dict[str, Any] = {}
+    for m in metrics:
+        var, thr, op = m["var"], float(m["threshold"]), m.get("op", "ge")
+        res = merged.result(var, thr, op)
+        cell_poe = [pc["poe"][var] for pc in per_cell]
+        res["poe_cell_min"], res["poe_cell_max"] = min(cell_poe), max(cell_poe)
+        results[var] = res
+    return results, per_cell, merged.n(metrics[0]["var"])
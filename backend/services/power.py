@@ -3,12 +3,28 @@
 
 from __future__ import annotations
 
+import os
+import math
+import time
+import logging
+import threading
 import requests
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from typing import Optional, Dict, Any
+from datetime import date, datetime
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 
-POWER_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
+from services.series import PowerSeries
+from services.series_store import get_store
+from utils.jsonfast import loads
+from utils.resilience import CircuitBreaker, CircuitOpen, BudgetExceeded, backoff_delay, remaining_budget
+from utils.ttlcache import TTLCache
+
+logger = logging.getLogger("uvicorn")
+
+# overridable to point at a local stub (scripts/power_stub.py)
+POWER_URL = os.getenv("POWER_URL", "https://power.larc.nasa.gov/api/temporal/daily/point")
+POWER_REGIONAL_URL = os.getenv("POWER_REGIONAL_URL", "https://power.larc.nasa.gov/api/temporal/daily/regional")
 
 # Variables we need for generic PoE; POWER returns JSON so no netCDF/xarray required.
 PARAMS = {
@@ -20,9 +36,42 @@ PARAMS = {
     "pr":   "PRECTOTCORR"  # mm/day (corrected precip)
 }
 
+# POWER meteorology (MERRA-2) grid: every point inside a cell gets the same series.
+CELL_DLAT = 0.5
+CELL_DLON = 0.625
+
 class PowerError(RuntimeError):
     pass
 
+class PowerUnavailable(PowerError):
+    """POWER is failing (circuit open / retries or request budget exhausted)."""
+
+# Upstream resilience: each call gets POWER_TIMEOUT_SEC per attempt, up to
+# POWER_RETRIES retries on timeouts / connection errors / 429 / 5xx with
+# full-jitter backoff, never beyond the request's time budget (see
+# utils/resilience.time_budget, set per request in app.py). After
+# POWER_BREAKER_FAILS consecutive failed calls the breaker opens and calls fail
+# fast for POWER_BREAKER_RESET_SEC, so an incident doesn't cost every cell of a
+# corridor a full timeout.
+POWER_TIMEOUT_SEC = float(os.getenv("POWER_TIMEOUT_SEC", "45"))
+POWER_RETRIES = int(os.getenv("POWER_RETRIES", "2"))
+POWER_BACKOFF_SEC = float(os.getenv("POWER_BACKOFF_SEC", "0.5"))
+POWER_BACKOFF_CAP_SEC = float(os.getenv("POWER_BACKOFF_CAP_SEC", "8"))
+POWER_BREAKER = CircuitBreaker(
+    "POWER",
+    fail_threshold=int(os.getenv("POWER_BREAKER_FAILS", "5")),
+    reset_sec=float(os.getenv("POWER_BREAKER_RESET_SEC", "30")),
+)
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+def power_cell(lat: float, lon: float) -> Tuple[int, int]:
+    """Index (i_lat, i_lon) of the POWER grid cell whose center is nearest to (lat, lon)."""
+    return (int(round(float(lat) / CELL_DLAT)), int(round(float(lon) / CELL_DLON)))
+
+def cell_center(cell: Tuple[int, int]) -> Tuple[float, float]:
+    """(lat, lon) of a POWER grid cell center."""
+    return (cell[0] * CELL_DLAT, cell[1] * CELL_DLON)
+
 def _validate_latlon(lat: float, lon: float) -> None:
     if not (-90.0 <= float(lat) <= 90.0) or not (-180.0 <= float(lon) <= 180.0):
         raise ValueError(f"lat/lon out of range: {lat}, {lon}")
@@ -32,16 +81,81 @@ def _session() -> requests.Session:
     s.headers.update({"User-Agent": "WillItRainOnMyParade/1.0"})
     return s
 
+def _get_with_retries(s: requests.Session, q: Dict[str, Any], url: Optional[str] = None,
+                      breaker: CircuitBreaker = POWER_BREAKER) -> requests.Response:
+    try:
+        trial = breaker.before_call()
+    except CircuitOpen as e:
+        raise PowerUnavailable(str(e)) from e
+    settled = False
+    try:
+        last: Optional[Exception] = None
+        for attempt in range(POWER_RETRIES + 1):
+            left = remaining_budget()
+            if left is not None and left <= 0:
+                last = BudgetExceeded("request time budget exhausted")
+                break
+            timeout = POWER_TIMEOUT_SEC if left is None else min(POWER_TIMEOUT_SEC, left)
+            try:
+                r = s.get(url or POWER_URL, params=q, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last = e
+            else:
+                if r.status_code not in _RETRY_STATUS:
+                    breaker.record_success()
+                    settled = True
+                    return r
+                last = PowerError(f"POWER {r.status_code}: {r.text[:200]}")
+            if attempt < POWER_RETRIES:
+                delay = backoff_delay(attempt, POWER_BACKOFF_SEC, POWER_BACKOFF_CAP_SEC)
+                left = remaining_budget()
+                if left is not None and delay >= left:
+                    break
+                time.sleep(delay)
+        left = remaining_budget()
+        if left is None or left > 0:
+            # running out of the caller's budget is not an upstream failure
+            breaker.record_failure()
+            settled = True
+        raise PowerUnavailable(f"POWER unavailable: {last}") from last
+    finally:
+        # no verdict (budget ran out, unexpected error): a half-open trial must
+        # not stay claimed, or the breaker never lets another call through
+        if trial and not settled:
+            breaker.release_trial()
+
+# fetch_power_point column → POWER parameter
+COLUMN_PARAMS = {
+    "tmaxC": PARAMS["tmax"],
+    "tminC": PARAMS["tmin"],
+    "tavgC": PARAMS["tavg"],
+    "rh": PARAMS["rh"],
+    "ws_ms": PARAMS["ws"],
+    "pr_mm": PARAMS["pr"],
+}
+PARAM_COLUMNS = {p: c for c, p in COLUMN_PARAMS.items()}
+POWER_FILL = -999.0
+
+def _columns(columns: Optional[Iterable[str]]) -> List[str]:
+    if columns is None:
+        return list(COLUMN_PARAMS)
+    cols = list(dict.fromkeys(columns))
+    unknown = [c for c in cols if c not in COLUMN_PARAMS]
+    if unknown:
+        raise ValueError(f"unknown POWER columns: {unknown} (expected {list(COLUMN_PARAMS)})")
+    return cols
+
 def _fetch_json(
     lat: float,
     lon: float,
     start_yyyymmdd: str,
     end_yyyymmdd: str,
     session: Optional[requests.Session] = None,
+    parameters: Optional[Iterable[str]] = None,
 ) -> Dict[str, Any]:
     s = session or _session()
     q = {
-        "parameters": ",".join(PARAMS.values()),
+        "parameters": ",".join(parameters or PARAMS.values()),
         "community": "RE",          # stable default
         "latitude": lat,
         "longitude": lon,
@@ -49,10 +163,18 @@ def _fetch_json(
         "end": end_yyyymmdd,
         "format": "JSON",
     }
-    r = s.get(POWER_URL, params=q, timeout=45)
+    r = _get_with_retries(s, q)
     if r.status_code >= 400:
         raise PowerError(f"POWER {r.status_code}: {r.text[:200]}")
-    return r.json()
+    return loads(r.content)
+
+def _fetch_parameters(lat, lon, start, end, session, columns: Optional[Iterable[str]]):
+    _validate_latlon(lat, lon)
+    if end is None:
+        end = datetime.utcnow().strftime("%Y%m%d")
+    cols = _columns(columns)
+    js = _fetch_json(lat, lon, start, end, session=session, parameters=[COLUMN_PARAMS[c] for c in cols])
+    return js.get("properties", {}).get("parameter", {}), cols
 
 def fetch_power_point(
     lat: float,
@@ -60,56 +182,369 @@ def fetch_power_point(
     start: str = "19810101",
     end: Optional[str] = None,
     session: Optional[requests.Session] = None,
+    columns: Optional[Iterable[str]] = None,
 ) -> pd.DataFrame:
     """
     Return a daily time series for a point (lat, lon) from NASA POWER.
 
     Index: pandas.DatetimeIndex (daily)
-    Columns:
+    Columns (all by default; `columns` requests only a subset from POWER):
       - tmaxC (°C), tminC (°C), tavgC (°C)
       - rh (%), ws_ms (m/s), pr_mm (mm/day)
+    POWER's -999 fill values are returned as NaN.
+    """
+    params, cols = _fetch_parameters(lat, lon, start, end, session, columns)
+    return frame_from_parameters(params, cols)
+
+def arrays_from_parameters(
+    params: Dict[str, Dict[str, Any]],
+    columns: Optional[Iterable[str]] = None,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    POWER's properties.parameter block ({PARAM: {YYYYMMDD: value}}) → (sorted
+    datetime64[D] dates, column → float64 array), -999 fills turned into NaN.
+    Columns are read straight from the maps (no per-day Python rows).
+    """
+    cols = _columns(columns)
+    maps = [params.get(COLUMN_PARAMS[c]) or {} for c in cols]
+    keys = next((list(m) for m in maps if m), [])
+    # POWER gives every parameter the same dates; fall back to a union if not
+    aligned = all(not m or list(m) == keys for m in maps)
+    if not aligned:
+        keys = sorted(set().union(*maps))
+    n = len(keys)
+    if not n:
+        return np.empty(0, dtype="datetime64[D]"), {c: np.empty(0) for c in cols}
+
+    ymd = np.array(keys, dtype=np.int64)
+    months = (ymd // 10000 - 1970) * 12 + (ymd // 100 % 100 - 1)
+    dates = months.astype("datetime64[M]").astype("datetime64[D]") + (ymd % 100 - 1)
+
+    out: Dict[str, np.ndarray] = {}
+    for c, m in zip(cols, maps):
+        vals = m.values() if aligned and m else [m.get(k) for k in keys]
+        try:
+            v = np.fromiter(vals, dtype=np.float64, count=n)
+        except TypeError:  # None / missing entries
+            v = np.array(list(vals), dtype=np.float64)
+        v[v == POWER_FILL] = np.nan
+        out[c] = v
+    if n > 1 and not (np.diff(dates.astype(np.int64)) > 0).all():
+        order = np.argsort(dates, kind="stable")
+        dates = dates[order]
+        out = {c: v[order] for c, v in out.items()}
+    return dates, out
+
+def frame_from_parameters(params: Dict[str, Dict[str, Any]], columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """arrays_from_parameters as a daily frame with the fetch_power_point columns."""
+    dates, cols = arrays_from_parameters(params, columns)
+    return pd.DataFrame(cols, index=pd.DatetimeIndex(dates.astype("datetime64[ns]"), name="date"))
+
+def series_from_parameters(params: Dict[str, Dict[str, Any]], columns: Optional[Iterable[str]] = None) -> PowerSeries:
+    """arrays_from_parameters as a PowerSeries (missing days become NaN), skipping pandas."""
+    dates, cols = arrays_from_parameters(params, columns)
+    if not len(dates):
+        return PowerSeries(date(1970, 1, 1), {c: np.empty(0, dtype=np.float32) for c in cols})
+    off = (dates - dates[0]).astype(np.int64)
+    n = int(off[-1]) + 1
+    if n != len(dates):
+        full = {}
+        for c, v in cols.items():
+            col = np.full(n, np.nan, dtype=np.float32)
+            col[off] = v
+            full[c] = col
+        cols = full
+    return PowerSeries(dates[0].item(), cols)
+
+# -------------------------------
+# Per-cell history cache (climatology input)
+# -------------------------------
+# Every climatology consumer (/api/poe, the event corridor, warm-up) wants the
+# full 1981→today daily series. It is fetched once per POWER cell (at the cell
+# center) and kept fresh for POWER_HISTORY_TTL_SEC: published to the host-level
+# mmap store (services/series_store.py) so all workers share one copy, with
+# HISTORY_CACHE holding this process's (mmap-backed) handles.
+#
+# Stale-while-revalidate: for POWER_HISTORY_STALE_SEC past freshness an entry
+# is still served (flagged stale, see history_stale) while one background
+# thread refetches it; if that refetch — or a synchronous one — fails, the
+# stale copy keeps being served. Only a cell with no usable copy waits on POWER.
+HISTORY_START = "19810101"
+HISTORY_TTL_SEC = int(os.getenv("POWER_HISTORY_TTL_SEC", str(24 * 3600)))
+HISTORY_STALE_SEC = int(os.getenv("POWER_HISTORY_STALE_SEC", str(7 * 24 * 3600)))
+# (series, fetched_at), kept until fetched_at + TTL + STALE
+HISTORY_CACHE: TTLCache[Tuple[PowerSeries, float]] = TTLCache(maxsize=int(os.getenv("POWER_HISTORY_CACHE_MAX", "256")))
+_REFRESH_LOCKS: Dict[Tuple[int, int], threading.Lock] = {}
+_REFRESH_GUARD = threading.Lock()
+
+def fetch_power_series(
+    lat: float,
+    lon: float,
+    start: str = "19810101",
+    end: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> PowerSeries:
+    """fetch_power_point as a compact float32 PowerSeries."""
+    params, cols = _fetch_parameters(lat, lon, start, end, session, columns)
+    return series_from_parameters(params, cols)
+
+def history_key(cell: Tuple[int, int]) -> str:
+    """Store key for a cell's daily history."""
+    return f"hist_{cell[0]}_{cell[1]}"
+
+def _fresh_left(fetched_at: float) -> float:
+    return fetched_at + HISTORY_TTL_SEC - time.time()
+
+def _cached_history(cell: Tuple[int, int]) -> Optional[Tuple[PowerSeries, float]]:
+    """Newest (series, fetched_at) for a cell from this process or the host store, fresh or stale."""
+    hit = HISTORY_CACHE.get(cell)
+    if hit is not None and _fresh_left(hit[1]) > 0:
+        return hit
+    store = get_store()
+    if store is not None:
+        stored = store.get_series(history_key(cell))
+        if stored is not None and (hit is None or stored[1] > hit[1]) and _fresh_left(stored[1]) > -HISTORY_STALE_SEC:
+            hit = stored
+            HISTORY_CACHE.set(cell, hit, hit[1] + HISTORY_TTL_SEC + HISTORY_STALE_SEC)
+    return hit
+
+def _refresh_history(cell: Tuple[int, int], min_remaining: float = 0.0, blocking: bool = True) -> Optional[Tuple[PowerSeries, float]]:
+    """
+    Fetch a cell's history from POWER and publish it (one fetch per cell at a time).
+    Non-blocking callers get None if a refresh is already running.
+    """
+    with _REFRESH_GUARD:
+        lock = _REFRESH_LOCKS.setdefault(cell, threading.Lock())
+    if not lock.acquire(blocking=blocking):
+        return None
+    try:
+        hit = _cached_history(cell)  # someone may have refreshed while we waited
+        if hit is not None and _fresh_left(hit[1]) > min_remaining:
+            return hit
+        clat, clon = cell_center(cell)
+        series = fetch_power_series(clat, clon, start=HISTORY_START)
+        fetched_at = time.time()
+        store = get_store()
+        if store is not None:
+            series, fetched_at = store.put_series(history_key(cell), series, fetched_at)
+        HISTORY_CACHE.set(cell, (series, fetched_at), fetched_at + HISTORY_TTL_SEC + HISTORY_STALE_SEC)
+        return series, fetched_at
+    finally:
+        lock.release()
+
+def _revalidate(cell: Tuple[int, int]) -> None:
+    """Background refresh, unless one is already running or the breaker is open."""
+    lock = _REFRESH_LOCKS.get(cell)
+    if POWER_BREAKER.state == "open" or (lock is not None and lock.locked()):
+        return
+
+    def run():
+        try:
+            _refresh_history(cell, blocking=False)
+        except Exception as e:
+            logger.warning("POWER history refresh %s failed: %s", cell, e)
+    threading.Thread(target=run, name=f"power-refresh-{cell[0]}_{cell[1]}", daemon=True).start()
+
+def fetch_power_history(lat: float, lon: float, min_remaining: float = 0.0) -> PowerSeries:
+    """
+    Daily history (HISTORY_START→today) for the POWER cell containing (lat, lon).
+    Use .to_frame() for a pandas view.
+
+    Fresh cached copies are returned as-is; stale ones are returned immediately
+    while a background refresh runs. min_remaining > 0 (warm-up) instead refreshes
+    synchronously when less than that much freshness is left, falling back to
+    the cached copy if POWER fails.
     """
     _validate_latlon(lat, lon)
+    cell = power_cell(lat, lon)
+    hit = _cached_history(cell)
+    if hit is not None:
+        left = _fresh_left(hit[1])
+        if left > min_remaining:
+            return hit[0]
+        if min_remaining <= 0:
+            _revalidate(cell)
+            return hit[0]
+    try:
+        return _refresh_history(cell, min_remaining=min_remaining)[0]
+    except (PowerError, requests.RequestException):
+        if hit is None:
+            raise
+        logger.warning("POWER history refresh %s failed; serving cached copy", cell)
+        return hit[0]
+
+# -------------------------------
+# Regional (bounding-box) history fetch
+# -------------------------------
+# POWER's regional endpoint returns every grid cell of a box in one response
+# (one FeatureCollection feature per cell center). Boxes must span between
+# REGIONAL_MIN_DEG and REGIONAL_MAX_DEG in each direction, so small areas are
+# padded and large ones tiled, and the endpoint takes few parameters per call,
+# so they are requested REGIONAL_PARAMS_PER_CALL at a time. For an area event
+# that is a handful of calls instead of one 45-year point fetch per cell.
+REGIONAL_ENABLED = os.getenv("POWER_REGIONAL", "on").lower() not in {"0", "off", "false", "no"}
+REGIONAL_MIN_CELLS = int(os.getenv("POWER_REGIONAL_MIN_CELLS", "4"))
+REGIONAL_MIN_DEG = 2.0
+REGIONAL_MAX_DEG = 10.0
+REGIONAL_PARAMS_PER_CALL = int(os.getenv("POWER_REGIONAL_PARAMS_PER_CALL", "1"))
+
+def _region_boxes(lat_min: float, lat_max: float, lon_min: float, lon_max: float):
+    """Split/pad [lat_min, lat_max] × [lon_min, lon_max] into boxes POWER accepts."""
+    def spans(lo: float, hi: float, floor: float, ceil: float):
+        if hi - lo < REGIONAL_MIN_DEG:
+            mid = (lo + hi) / 2
+            lo = max(floor, mid - REGIONAL_MIN_DEG / 2)
+            hi = min(ceil, lo + REGIONAL_MIN_DEG)
+            lo = hi - REGIONAL_MIN_DEG
+        # equal tiles, each ≤ MAX and (since MAX ≥ 2·MIN) ≥ MIN
+        n = max(1, math.ceil((hi - lo) / REGIONAL_MAX_DEG))
+        step = (hi - lo) / n
+        return [(lo + k * step, lo + (k + 1) * step) for k in range(n)]
+    return [
+        (la0, la1, lo0, lo1)
+        for la0, la1 in spans(lat_min, lat_max, -90.0, 90.0)
+        for lo0, lo1 in spans(lon_min, lon_max, -180.0, 180.0)
+    ]
+
+def fetch_power_region(
+    lat_min: float,
+    lat_max: float,
+    lon_min: float,
+    lon_max: float,
+    start: str = "19810101",
+    end: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+) -> Dict[Tuple[int, int], PowerSeries]:
+    """Daily series for every POWER cell in a bounding box, keyed by power_cell."""
     if end is None:
         end = datetime.utcnow().strftime("%Y%m%d")
-
-    js = _fetch_json(lat, lon, start, end, session=session)
-    params = js.get("properties", {}).get("parameter", {})
-
-    # Collect all available dates across requested parameters
-    all_dates = set()
-    for p in PARAMS.values():
-        if p in params:
-            all_dates.update(params[p].keys())
-    dates = sorted(all_dates)
-
-    rows = []
-    for d in dates:
-        rows.append(
-            {
-                "date": d,
-                "tmaxC": params.get(PARAMS["tmax"], {}).get(d),
-                "tminC": params.get(PARAMS["tmin"], {}).get(d),
-                "tavgC": params.get(PARAMS["tavg"], {}).get(d),
-                "rh": params.get(PARAMS["rh"], {}).get(d),
-                "ws_ms": params.get(PARAMS["ws"], {}).get(d),
-                "pr_mm": params.get(PARAMS["pr"], {}).get(d),
+    s = session or _session()
+    names = list(PARAMS.values())
+    # each response is reduced to float32 columns as it arrives, so peak memory
+    # is one parsed response (bounded by REGIONAL_MAX_DEG), not all of them
+    parts: Dict[Tuple[int, int], List[PowerSeries]] = {}
+    for la0, la1, lo0, lo1 in _region_boxes(lat_min, lat_max, lon_min, lon_max):
+        for i in range(0, len(names), max(1, REGIONAL_PARAMS_PER_CALL)):
+            q = {
+                "parameters": ",".join(names[i:i + REGIONAL_PARAMS_PER_CALL]),
+                "community": "RE",
+                "latitude-min": la0, "latitude-max": la1,
+                "longitude-min": lo0, "longitude-max": lo1,
+                "start": start, "end": end,
+                "format": "JSON",
             }
-        )
+            r = _get_with_retries(s, q, url=POWER_REGIONAL_URL)
+            if r.status_code >= 400:
+                raise PowerError(f"POWER regional {r.status_code}: {r.text[:200]}")
+            for feat in loads(r.content).get("features", []):
+                coords = (feat.get("geometry") or {}).get("coordinates") or []
+                if len(coords) < 2:
+                    continue
+                cell = power_cell(coords[1], coords[0])
+                params = (feat.get("properties") or {}).get("parameter", {})
+                cols = [PARAM_COLUMNS[p] for p in params if p in PARAM_COLUMNS]
+                if cols:
+                    parts.setdefault(cell, []).append(series_from_parameters(params, cols))
+    return {cell: _join_series(ps) for cell, ps in parts.items()}
+
+def _join_series(parts: List[PowerSeries]) -> PowerSeries:
+    """Column subsets of one cell's series → one PowerSeries with every column (NaN where absent)."""
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return PowerSeries(date(1970, 1, 1), {c: np.empty(0, dtype=np.float32) for c in COLUMN_PARAMS})
+    start = min(p.start for p in parts)
+    n = (max(p.end for p in parts) - start).days + 1
+    cols: Dict[str, np.ndarray] = {}
+    for p in parts:
+        off = (p.start - start).days
+        for c, v in p.columns.items():
+            if c not in cols:
+                cols[c] = np.full(n, np.nan, dtype=np.float32)
+            cols[c][off:off + len(v)] = v
+    return PowerSeries(start, {c: cols[c] if c in cols else np.full(n, np.nan, dtype=np.float32) for c in COLUMN_PARAMS})
+
+def prefetch_region_history(points) -> int:
+    """
+    Fill the history cache for the (lon, lat) points' cells that have no cached
+    copy with regional calls over their bounding box. Returns the number of
+    cells published; 0 when disabled, fewer than POWER_REGIONAL_MIN_CELLS are
+    cold, or the regional calls would outnumber the point fetches (point
+    fetches are cheaper then). Cells the region misses are left to
+    the per-cell path.
+    """
+    if not REGIONAL_ENABLED:
+        return 0
+    cold = sorted({power_cell(lat, lon) for (lon, lat) in points} - set(HISTORY_CACHE.keys()))
+    cold = [c for c in cold if _cached_history(c) is None]
+    if len(cold) < max(1, REGIONAL_MIN_CELLS):
+        return 0
+    lats = [cell_center(c)[0] for c in cold]
+    lons = [cell_center(c)[1] for c in cold]
+    # sparse cells over a wide box (e.g. a subsampled large area): point fetches take fewer calls
+    calls = len(_region_boxes(min(lats), max(lats), min(lons), max(lons))) \
+        * math.ceil(len(PARAMS) / max(1, REGIONAL_PARAMS_PER_CALL))
+    if calls >= len(cold):
+        return 0
+    region = fetch_power_region(min(lats), max(lats), min(lons), max(lons), start=HISTORY_START)
+    store = get_store()
+    published = 0
+    for cell in cold:
+        series = region.get(cell)
+        if series is None or series.empty:
+            continue
+        fetched_at = time.time()
+        if store is not None:
+            series, fetched_at = store.put_series(history_key(cell), series, fetched_at)
+        HISTORY_CACHE.set(cell, (series, fetched_at), fetched_at + HISTORY_TTL_SEC + HISTORY_STALE_SEC)
+        published += 1
+    return published
+
+def history_stale(lat: float, lon: float) -> bool:
+    """True if the history served for this cell is past its freshness TTL."""
+    hit = HISTORY_CACHE.peek(power_cell(lat, lon))
+    return hit is None or _fresh_left(hit[0][1]) <= 0
 
-    df = pd.DataFrame(rows)
-    if df.empty:
-        # Return a correctly-shaped empty frame
-        return pd.DataFrame(
-            columns=["tmaxC", "tminC", "tavgC", "rh", "ws_ms", "pr_mm"],
-            index=pd.DatetimeIndex([], name="date"),
-        )
+def history_fetched_at(lat: float, lon: float) -> Optional[float]:
+    """Epoch time the served history for this cell was fetched from POWER."""
+    hit = HISTORY_CACHE.peek(power_cell(lat, lon))
+    return hit[0][1] if hit is not None else None
 
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.set_index("date").sort_index()
+def history_version(lat: float, lon: float, fetch: bool = True) -> str:
+    """
+    Identifies the data behind a cell's climatology (cell + last POWER day, and
+    whether that copy is stale). Changes only when that data does, so it is safe
+    to fold into response ETags. fetch=False never waits on POWER: a cell with
+    no cached history is reported as "cold".
+    """
+    cell = power_cell(lat, lon)
+    if fetch:
+        end = fetch_power_history(lat, lon).end
+    else:
+        _validate_latlon(lat, lon)
+        hit = _cached_history(cell)
+        if hit is None:
+            return f"{cell[0]}_{cell[1]}@cold"
+        end = hit[0].end
+    return f"{cell[0]}_{cell[1]}@{end}" + ("~stale" if history_stale(lat, lon) else "")
 
-    # Ensure numeric dtype
-    for c in ["tmaxC", "tminC", "tavgC", "rh", "ws_ms", "pr_mm"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
+def history_cache_stats() -> Dict[str, Any]:
+    """
+    Cells held in HISTORY_CACHE and the array memory they use. "private_bytes"
+    counts only arrays not backed by the shared store (i.e. this worker's own RSS).
+    """
+    series = [hit[0][0] for hit in (HISTORY_CACHE.peek(k) for k in HISTORY_CACHE.keys()) if hit is not None]
+    sizes = [s.nbytes for s in series]
+    total = int(sum(sizes))
+    store = get_store()
+    return {
+        "cells": len(sizes),
+        "bytes": total,
+        "bytes_per_cell": int(total / len(sizes)) if sizes else 0,
+        "private_bytes": int(sum(s.nbytes for s in series if not s.is_shared)),
+        "store": store.stats() if store is not None else None,
+    }
 
-    return df
+def upstream_status() -> Dict[str, Any]:
+    """POWER breaker state for /api/health."""
+    return POWER_BREAKER.snapshot()
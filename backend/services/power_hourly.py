@@ -0,0 +1,191 @@
+# backend/services/power_hourly.py
+# Hourly NASA POWER data (temporal/hourly/point) for sub-daily event bins.
+#
+# Hourly is 24× the daily volume, so it is never held as one long series. Each
+# (POWER cell, UTC year) is one chunk: a float32[len(HOURLY_COLUMNS), hours in
+# year] matrix (column k = hour k after Jan 1 00:00 UTC, missing hours NaN),
+# fetched with one POWER call, published to the host mmap store and kept in
+# HOURLY_CACHE. A complete year never changes, so its chunk is kept until
+# evicted; the current year's is refetched after POWER_HISTORY_TTL_SEC.
+# Missing chunks for a request are fetched concurrently.
+
+from __future__ import annotations
+
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from services.power import (
+    HISTORY_TTL_SEC, POWER_FILL, PowerError, _get_with_retries, _session, _validate_latlon, cell_center,
+)
+from services.series_store import get_store
+from utils.jsonfast import loads
+from utils.resilience import CircuitBreaker
+from utils.ttlcache import TTLCache
+
+POWER_HOURLY_URL = os.getenv("POWER_HOURLY_URL", "https://power.larc.nasa.gov/api/temporal/hourly/point")
+# chunk row → POWER hourly parameter (precip is mm/hour, temperature is the hourly T2M)
+HOURLY_PARAMS = {
+    "pr_mm": "PRECTOTCORR",
+    "ws_ms": "WS10M",
+    "t2mC": "T2M",
+    "rh": "RH2M",
+}
+HOURLY_COLUMNS: Tuple[str, ...] = tuple(HOURLY_PARAMS)
+# POWER's hourly record starts in 2001
+HOURLY_FIRST_YEAR = 2001
+# complete years pooled for hourly climatology (most recent first)
+POWER_HOURLY_YEARS = int(os.getenv("POWER_HOURLY_YEARS", "10"))
+# the hourly endpoint has its own breaker, so its outages don't fail daily traffic
+POWER_HOURLY_BREAKER = CircuitBreaker(
+    "POWER hourly",
+    fail_threshold=int(os.getenv("POWER_BREAKER_FAILS", "5")),
+    reset_sec=float(os.getenv("POWER_BREAKER_RESET_SEC", "30")),
+)
+# concurrent chunk fetches per cell
+POWER_HOURLY_FETCH_WORKERS = int(os.getenv("POWER_HOURLY_FETCH_WORKERS", "4"))
+# chunks are mmap-backed, so entries cost little private memory
+HOURLY_CACHE: TTLCache[np.ndarray] = TTLCache(maxsize=int(os.getenv("POWER_HOURLY_CACHE_MAX", "2048")))
+_COMPLETE_TTL_SEC = 30 * 24 * 3600
+
+def hours_in_year(year: int) -> int:
+    return (date(year + 1, 1, 1) - date(year, 1, 1)).days * 24
+
+def climo_years(today: Optional[date] = None) -> List[int]:
+    """The POWER_HOURLY_YEARS most recent complete UTC years with hourly data."""
+    last = (today or datetime.utcnow().date()).year - 1
+    return list(range(max(HOURLY_FIRST_YEAR, last - POWER_HOURLY_YEARS + 1), last + 1))
+
+def _fetch_hourly_json(
+    lat: float,
+    lon: float,
+    start_yyyymmdd: str,
+    end_yyyymmdd: str,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, Any]:
+    s = session or _session()
+    q = {
+        "parameters": ",".join(HOURLY_PARAMS.values()),
+        "community": "RE",
+        "latitude": lat,
+        "longitude": lon,
+        "start": start_yyyymmdd,
+        "end": end_yyyymmdd,
+        "time-standard": "UTC",
+        "format": "JSON",
+    }
+    r = _get_with_retries(s, q, url=POWER_HOURLY_URL, breaker=POWER_HOURLY_BREAKER)
+    if r.status_code >= 400:
+        raise PowerError(f"POWER hourly {r.status_code}: {r.text[:200]}")
+    return loads(r.content)
+
+def hourly_matrix_from_parameters(params: Dict[str, Dict[str, Any]], year: int) -> np.ndarray:
+    """
+    POWER hourly properties.parameter ({PARAM: {YYYYMMDDHH: value}}) → one year
+    chunk, float32[len(HOURLY_COLUMNS), hours_in_year(year)]. Keys outside the
+    year are ignored; -999 fills and absent hours are NaN.
+    """
+    out = np.full((len(HOURLY_COLUMNS), hours_in_year(year)), np.nan, dtype=np.float32)
+    jan1 = np.datetime64(f"{year:04d}-01-01", "D")
+    for row, c in enumerate(HOURLY_COLUMNS):
+        m = params.get(HOURLY_PARAMS[c]) or {}
+        if not m:
+            continue
+        keys = np.fromiter((int(k) for k in m), dtype=np.int64, count=len(m))
+        try:
+            v = np.fromiter(m.values(), dtype=np.float64, count=len(m))
+        except TypeError:  # None entries
+            v = np.array(list(m.values()), dtype=np.float64)
+        ymd, hh = keys // 100, keys % 100
+        months = (ymd // 10000 - 1970) * 12 + (ymd // 100 % 100 - 1)
+        days = months.astype("datetime64[M]").astype("datetime64[D]") + (ymd % 100 - 1)
+        k = (days - jan1).astype(np.int64) * 24 + hh
+        ok = (k >= 0) & (k < out.shape[1]) & (v != POWER_FILL)
+        out[row, k[ok]] = v[ok]
+    return out
+
+def chunk_key(cell: Tuple[int, int], year: int) -> str:
+    """Store key for one cell-year of hourly data."""
+    return f"hourly_{cell[0]}_{cell[1]}_{year}"
+
+def _complete(year: int) -> bool:
+    return year < datetime.utcnow().year
+
+def _load_chunk(cell: Tuple[int, int], year: int, session: Optional[requests.Session] = None) -> Tuple[np.ndarray, float]:
+    """(chunk, expires_at) from the host store if usable, else fetched from POWER and published."""
+    store = get_store()
+    key = chunk_key(cell, year)
+    if store is not None:
+        hit = store.get(key)
+        if hit is not None and (hit[2].get("complete") or hit[1] + HISTORY_TTL_SEC > time.time()):
+            return hit[0], (time.time() + _COMPLETE_TTL_SEC if hit[2].get("complete") else hit[1] + HISTORY_TTL_SEC)
+    lat, lon = cell_center(cell)
+    _validate_latlon(lat, lon)
+    end = min(date(year, 12, 31), datetime.utcnow().date())
+    js = _fetch_hourly_json(lat, lon, f"{year:04d}0101", end.strftime("%Y%m%d"), session=session)
+    mat = hourly_matrix_from_parameters(js.get("properties", {}).get("parameter", {}), year)
+    complete = _complete(year)
+    fetched_at = time.time()
+    if store is not None:
+        mat, fetched_at, _ = store.put(key, mat, {"complete": complete, "columns": list(HOURLY_COLUMNS)}, fetched_at)
+    return mat, (time.time() + _COMPLETE_TTL_SEC if complete else fetched_at + HISTORY_TTL_SEC)
+
+def cached_chunk(cell: Tuple[int, int], year: int) -> Optional[np.ndarray]:
+    return HOURLY_CACHE.get((cell, year))
+
+def hourly_chunk(cell: Tuple[int, int], year: int, session: Optional[requests.Session] = None) -> np.ndarray:
+    """One cell-year chunk (single-flight per chunk across threads)."""
+    return HOURLY_CACHE.get_or_compute((cell, year), lambda: _load_chunk(cell, year, session))
+
+def hourly_chunks(cell: Tuple[int, int], years: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    Chunks for several years of one cell; missing ones are fetched concurrently
+    (POWER_HOURLY_FETCH_WORKERS), within the caller's time budget.
+    """
+    years = sorted(set(years))
+    out = {y: c for y, c in ((y, cached_chunk(cell, y)) for y in years) if c is not None}
+    missing = [y for y in years if y not in out]
+    if len(missing) <= 1 or POWER_HOURLY_FETCH_WORKERS <= 1:
+        out.update({y: hourly_chunk(cell, y) for y in missing})
+        return out
+    with ThreadPoolExecutor(max_workers=min(POWER_HOURLY_FETCH_WORKERS, len(missing))) as ex:
+        # each task runs in a copy of this context, so the request's time budget applies
+        futures = {y: ex.submit(contextvars.copy_context().run, hourly_chunk, cell, y) for y in missing}
+        out.update({y: f.result() for y, f in futures.items()})
+    return out
+
+def hourly_stale(cell: Tuple[int, int], years: Iterable[int]) -> bool:
+    """
+    True if a chunk served for these years is past its refresh TTL. Only the
+    current year's chunk can be (complete years never change).
+    """
+    year = datetime.utcnow().year
+    if year not in set(years):
+        return False
+    hit = HOURLY_CACHE.peek((cell, year))
+    return hit is not None and hit[1] <= time.time()
+
+def hourly_version(cell: Tuple[int, int], years: Iterable[int]) -> str:
+    """
+    Identifies the hourly data behind a cell's answer without fetching: the
+    years used, plus the last hour with data when the current year is among them.
+    """
+    years = sorted(set(years))
+    tag = f"{cell[0]}_{cell[1]}@{years[0]}-{years[-1]}" if years else f"{cell[0]}_{cell[1]}@none"
+    if years and not _complete(years[-1]):
+        chunk = cached_chunk(cell, years[-1])
+        if chunk is None:
+            return tag + "~cold"
+        have = np.flatnonzero(~np.isnan(chunk).all(axis=0))
+        tag += f"~{int(have[-1]) if have.size else -1}"
+    return tag
+
+def hourly_upstream_status() -> Dict[str, Any]:
+    """POWER hourly breaker state for /api/health."""
+    return POWER_HOURLY_BREAKER.snapshot()
@@ -0,0 +1,97 @@
+# backend/services/realtime.py
+# Short-TTL cache of the "last 7 days" POWER window + EVS score shared by
+# /api/ai/realtime and /api/llm/brief.
+#
+# POWER daily data changes at most once a day, and both endpoints used to fetch
+# the same window, build the same features and run the same prediction. Entries
+# are keyed by (POWER cell, window end day); they expire when the window end day
+# rolls over (REALTIME_LAG_HOURS after UTC midnight), i.e. at the next point a
+# fresh POWER day can be requested.
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.features import build_features
+from services.models.evs_model import EVSModelOut, default_model
+from services.power import fetch_power_point, power_cell, cell_center
+from utils.ttlcache import TTLCache
+
+# Skip the in-progress UTC day (POWER fills it with -999 until it is complete).
+REALTIME_LAG_HOURS = 18
+REALTIME_DAYS = 7
+REALTIME_CACHE_MAX = int(os.getenv("REALTIME_CACHE_MAX", "2048"))
+
+class NoRecentData(LookupError):
+    """POWER returned no complete day in the realtime window."""
+
+@dataclass
+class RealtimeSnapshot:
+    cell: Tuple[int, int]
+    day: date                  # last day of the POWER window (UTC)
+    rows: pd.DataFrame         # cleaned recent rows (no -999 / NaN)
+    feats: Dict[str, float]
+    out: EVSModelOut
+    expires_at: float          # epoch seconds
+
+Key = Tuple[Tuple[int, int], date]
+
+REALTIME_CACHE: TTLCache[RealtimeSnapshot] = TTLCache(maxsize=REALTIME_CACHE_MAX)
+
+def _window_end(now: datetime) -> datetime:
+    return now - timedelta(hours=REALTIME_LAG_HOURS)
+
+def _expiry(day: date) -> float:
+    """Epoch time at which _window_end(now) moves past `day`."""
+    nxt = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(days=1, hours=REALTIME_LAG_HOURS)
+    return nxt.timestamp()
+
+def _build(cell: Tuple[int, int], end_dt: datetime) -> RealtimeSnapshot:
+    start_dt = end_dt - timedelta(days=REALTIME_DAYS - 1)
+    lat, lon = cell_center(cell)
+    df = fetch_power_point(lat, lon, start=start_dt.strftime("%Y%m%d"), end=end_dt.strftime("%Y%m%d"))
+    if df is None or df.empty:
+        raise NoRecentData("No POWER data returned.")
+    # POWER uses -999 for missing values
+    df = df.replace(-999, np.nan).dropna(how="any").sort_index()
+    if df.empty:
+        raise NoRecentData(f"No valid POWER rows in the last {REALTIME_DAYS} days.")
+
+    row = df.iloc[-1].to_dict()
+    feats = build_features(row, end_dt)
+    out = default_model().predict(feats)
+    return RealtimeSnapshot(
+        cell=cell,
+        day=end_dt.date(),
+        rows=df,
+        feats=feats,
+        out=out,
+        expires_at=_expiry(end_dt.date()),
+    )
+
+def realtime_snapshot(
+    lat: float,
+    lon: float,
+    now: Optional[datetime] = None,
+    min_remaining: float = 0.0,
+) -> RealtimeSnapshot:
+    """
+    Cached realtime window for the POWER cell containing (lat, lon).
+    Concurrent callers for the same key wait for a single upstream fetch.
+    Raises NoRecentData when POWER has no complete day in the window.
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    end_dt = _window_end(now)
+    key: Key = (power_cell(lat, lon), end_dt.date())
+
+    def compute():
+        snap = _build(key[0], end_dt)
+        return snap, snap.expires_at
+
+    return REALTIME_CACHE.get_or_compute(key, compute, min_remaining=min_remaining)
@@ -0,0 +1,109 @@
+# backend/services/series.py
+# Compact daily POWER series: a start date + contiguous float32 columns.
+#
+# A 45-year history is ~16.5k days × 6 variables. As a pandas frame built from
+# per-day dicts that costs several times the size of the numbers themselves;
+# here each column is one float32 array (4 bytes/value) plus a shared int16
+# day-of-year array, and the DatetimeIndex is only materialized on demand.
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("tmaxC", "tminC", "tavgC", "rh", "ws_ms", "pr_mm")
+# POWER reports values with 2 decimals; float32 → float64 is rounded back to
+# that so thresholds compare exactly as they would against the parsed JSON.
+POWER_DECIMALS = 2
+
+class PowerSeries:
+    """
+    Daily series for one POWER cell.
+
+    start:   first day (UTC)
+    columns: name -> contiguous float32 array, all of length n (day i = start + i)
+    doy:     int16 day-of-year (1..366) per day, precomputed once
+    """
+
+    __slots__ = ("start", "columns", "doy", "_frame")
+
+    def __init__(self, start: date, columns: Mapping[str, np.ndarray], doy: Optional[np.ndarray] = None):
+        self.start = start
+        self.columns: Dict[str, np.ndarray] = {
+            k: np.ascontiguousarray(v, dtype=np.float32) for k, v in columns.items()
+        }
+        n = len(self)
+        if any(v.shape != (n,) for v in self.columns.values()):
+            raise ValueError("PowerSeries columns must be 1-D and equal length")
+        self.doy = doy if doy is not None else self.dates.dayofyear.to_numpy().astype(np.int16)
+        self._frame: Optional[pd.DataFrame] = None
+
+    def __len__(self) -> int:
+        for v in self.columns.values():
+            return int(v.shape[0])
+        return 0
+
+    def __repr__(self) -> str:
+        return f"PowerSeries(start={self.start}, n={len(self)}, columns={list(self.columns)})"
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def end(self) -> Optional[date]:
+        return self.start + timedelta(days=len(self) - 1) if len(self) else None
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.date_range(self.start, periods=len(self), freq="D", name="date")
+
+    @property
+    def ordinals(self) -> np.ndarray:
+        """Proleptic Gregorian ordinal of each day (int64)."""
+        return self.start.toordinal() + np.arange(len(self), dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (excludes a materialized frame)."""
+        return int(sum(v.nbytes for v in self.columns.values()) + self.doy.nbytes)
+
+    @property
+    def is_shared(self) -> bool:
+        """True when the columns are views of a memory-mapped file (services/series_store.py)."""
+        for v in self.columns.values():
+            base = v
+            while base is not None:
+                if isinstance(base, np.memmap):
+                    return True
+                base = getattr(base, "base", None)
+            return False
+        return False
+
+    def values(self, name: str) -> np.ndarray:
+        """Column as float64, restored to POWER's reporting precision."""
+        return np.round(self.columns[name].astype(np.float64), POWER_DECIMALS)
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame view (float32, DatetimeIndex) for callers that still expect pandas."""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.columns, index=self.dates, copy=False)
+        return self._frame
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Iterable[str] = COLUMNS) -> "PowerSeries":
+        """Build from a daily frame (DatetimeIndex); gaps become NaN."""
+        cols = [c for c in columns if c in df.columns]
+        if df.empty:
+            return cls(date(1970, 1, 1), {c: np.empty(0, dtype=np.float32) for c in cols})
+        idx = pd.DatetimeIndex(df.index)
+        full = pd.date_range(idx.min(), idx.max(), freq="D")
+        if len(full) != len(idx) or not idx.is_monotonic_increasing:
+            df = df.reindex(full)
+        return cls(
+            full[0].date(),
+            {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float32) for c in cols},
+        )
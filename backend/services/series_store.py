@@ -0,0 +1,209 @@
+# backend/services/series_store.py
+# Host-level store of cached arrays (POWER history, climatology tables) in
+# memory-mapped .npy files, shared by every uvicorn worker on the host.
+#
+# Layout under POWER_STORE_DIR (default /dev/shm/atmoroute, i.e. RAM-backed):
+#   <key>.json              pointer: {"file", "fetched_at", "meta"}
+#   <key>.<token>.npy       immutable data file referenced by the pointer
+#
+# Publication writes the data file, then atomically replaces the pointer
+# (os.replace), so readers always see a complete entry; an old data file can be
+# unlinked while other workers still have it mapped. Readers np.load(...,
+# mmap_mode="r"), so N workers share one copy in the page cache instead of
+# holding N private copies. Eviction (expired entries first, then least
+# recently published) keeps the directory under POWER_STORE_MAX_MB and runs
+# under an flock so concurrent workers don't race.
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from services.series import PowerSeries
+
+def _default_root() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "atmoroute")
+
+STORE_ENABLED = os.getenv("POWER_STORE", "on").lower() not in {"0", "off", "false", "no"}
+STORE_DIR = os.getenv("POWER_STORE_DIR") or _default_root()
+STORE_MAX_BYTES = int(float(os.getenv("POWER_STORE_MAX_MB", "512")) * 1024 * 1024)
+# unreferenced data files younger than this may still be mid-publication
+_ORPHAN_GRACE_SEC = 60
+
+_KEY_RE = re.compile(r"^[A-Za-z0-9_.\-]+$")
+
+class SeriesStore:
+    def __init__(self, root: str = STORE_DIR, max_bytes: int = STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    # ---- paths / locking
+    def _pointer(self, key: str) -> str:
+        if not _KEY_RE.match(key):
+            raise ValueError(f"bad store key: {key!r}")
+        return os.path.join(self.root, f"{key}.json")
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.root, ".lock"), "a+") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    # ---- raw arrays
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, float, Dict[str, Any]]]:
+        """(read-only mmap array, fetched_at, meta) or None if absent/unreadable."""
+        try:
+            with open(self._pointer(key)) as fh:
+                ptr = json.load(fh)
+            arr = np.load(os.path.join(self.root, ptr["file"]), mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        return arr, float(ptr["fetched_at"]), ptr.get("meta", {})
+
+    def put(self, key: str, arr: np.ndarray, meta: Optional[Dict[str, Any]] = None,
+            fetched_at: Optional[float] = None) -> Tuple[np.ndarray, float, Dict[str, Any]]:
+        """Publish `arr` under `key` and return it re-opened as a shared mmap."""
+        ptr_path = self._pointer(key)
+        fname = f"{key}.{uuid.uuid4().hex[:12]}.npy"
+        data_path = os.path.join(self.root, fname)
+        tmp = data_path + ".tmp"
+        with open(tmp, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(arr))
+        os.replace(tmp, data_path)
+
+        ptr = {"file": fname, "fetched_at": fetched_at or time.time(), "meta": meta or {}}
+        with self._locked():
+            old = None
+            try:
+                with open(ptr_path) as fh:
+                    old = json.load(fh).get("file")
+            except (OSError, ValueError):
+                pass
+            tmp_ptr = ptr_path + f".{uuid.uuid4().hex[:6]}.tmp"
+            with open(tmp_ptr, "w") as fh:
+                json.dump(ptr, fh)
+            os.replace(tmp_ptr, ptr_path)
+            if old and old != fname:
+                _unlink(os.path.join(self.root, old))  # mapped readers keep their pages
+            self._evict_locked()
+        out = self.get(key)
+        return out if out is not None else (arr, ptr["fetched_at"], ptr["meta"])
+
+    def delete(self, key: str) -> None:
+        with self._locked():
+            self._drop_locked(key)
+
+    # ---- PowerSeries helpers
+    def get_series(self, key: str) -> Optional[Tuple[PowerSeries, float]]:
+        hit = self.get(key)
+        if hit is None:
+            return None
+        arr, fetched_at, meta = hit
+        return _series_from(arr, meta), fetched_at
+
+    def put_series(self, key: str, series: PowerSeries, fetched_at: Optional[float] = None) -> Tuple[PowerSeries, float]:
+        names = list(series.columns)
+        mat = np.stack([series.columns[c] for c in names]) if names else np.empty((0, 0), np.float32)
+        meta = {"start": series.start.isoformat(), "columns": names}
+        arr, fetched_at, meta = self.put(key, mat, meta, fetched_at)
+        return _series_from(arr, meta), fetched_at
+
+    # ---- eviction / stats
+    def _entries(self):
+        out = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.root, name)) as fh:
+                    ptr = json.load(fh)
+                size = os.path.getsize(os.path.join(self.root, ptr["file"]))
+            except (OSError, ValueError, KeyError):
+                continue
+            out.append((name[:-5], ptr, size))
+        return out
+
+    def _drop_locked(self, key: str) -> None:
+        ptr_path = self._pointer(key)
+        try:
+            with open(ptr_path) as fh:
+                fname = json.load(fh).get("file")
+        except (OSError, ValueError):
+            return
+        _unlink(ptr_path)
+        if fname:
+            _unlink(os.path.join(self.root, fname))
+
+    def _evict_locked(self) -> None:
+        entries = self._entries()
+        referenced = {ptr["file"] for _, ptr, _ in entries}
+        now = time.time()
+        for name in os.listdir(self.root):
+            if name.endswith(".npy") and name not in referenced:
+                p = os.path.join(self.root, name)
+                try:
+                    if now - os.path.getmtime(p) > _ORPHAN_GRACE_SEC:
+                        _unlink(p)
+                except OSError:
+                    pass
+        total = sum(size for _, _, size in entries)
+        for key, ptr, size in sorted(entries, key=lambda e: e[1]["fetched_at"]):
+            if total <= self.max_bytes:
+                break
+            self._drop_locked(key)
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {
+            "root": self.root,
+            "entries": len(entries),
+            "bytes": int(sum(size for _, _, size in entries)),
+            "max_bytes": self.max_bytes,
+        }
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+def _doy_from_start(start: date, n: int) -> np.ndarray:
+    days = np.datetime64(start, "D") + np.arange(n)
+    return ((days - days.astype("datetime64[Y]")).astype(np.int64) + 1).astype(np.int16)
+
+def _series_from(mat: np.ndarray, meta: Dict[str, Any]) -> PowerSeries:
+    start = date.fromisoformat(meta["start"])
+    names = meta["columns"]
+    n = int(mat.shape[1]) if mat.ndim == 2 else 0
+    # rows of a C-ordered mmap are contiguous float32 → PowerSeries keeps them as views
+    return PowerSeries(start, {c: mat[i] for i, c in enumerate(names)}, doy=_doy_from_start(start, n))
+
+_STORE: Optional[SeriesStore] = None
+
+def get_store() -> Optional[SeriesStore]:
+    """Process-wide store, or None when disabled (POWER_STORE=off) or unusable."""
+    global _STORE
+    if not STORE_ENABLED:
+        return None
+    if _STORE is None:
+        try:
+            _STORE = SeriesStore()
+        except OSError:
+            return None
+    return _STORE
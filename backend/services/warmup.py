@@ -0,0 +1,102 @@
+# backend/services/warmup.py
+# Startup warm-up + periodic refresh of hot locations.
+#
+# WARM_LOCATIONS="lat,lon;lat,lon;..." lists the locations to keep warm. On
+# startup we load the EVS model and fill the history (climatology) and realtime
+# caches for each of them; a background loop repeats that every
+# WARM_REFRESH_SEC, renewing entries that would expire before the next pass.
+# The worker reports ready once a pass has loaded history for a hot location
+# (or there are none); until then passes are retried every WARM_RETRY_SEC.
+# Failures after that leave it ready: the cached copies keep being served.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.models.evs_model import default_model
+from services.power import fetch_power_history, power_cell, history_cache_stats, HISTORY_CACHE
+from services.realtime import realtime_snapshot, REALTIME_CACHE
+
+logger = logging.getLogger("uvicorn")
+
+WARM_REFRESH_SEC = int(os.getenv("WARM_REFRESH_SEC", "3600"))
+WARM_RETRY_SEC = int(os.getenv("WARM_RETRY_SEC", "30"))
+
+def _parse_locations(raw: str) -> List[Tuple[float, float]]:
+    out: List[Tuple[float, float]] = []
+    for chunk in raw.split(";"):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        try:
+            lat, lon = (float(x) for x in chunk.split(","))
+        except ValueError:
+            logger.warning("WARM_LOCATIONS: skipping malformed entry %r", chunk)
+            continue
+        out.append((lat, lon))
+    return out
+
+HOT_LOCATIONS: List[Tuple[float, float]] = _parse_locations(os.getenv("WARM_LOCATIONS", ""))
+
+STATE: Dict[str, Any] = {
+    "model_loaded": False,
+    "initial_pass_done": False,
+    "last_refresh_utc": None,
+    "errors": [],
+}
+
+def warm_once(min_remaining: float = 0.0) -> None:
+    """Load the model and (re)fill caches for HOT_LOCATIONS. Blocking; run in a thread."""
+    default_model()
+    STATE["model_loaded"] = True
+    errors = []
+    for lat, lon in HOT_LOCATIONS:
+        try:
+            fetch_power_history(lat, lon, min_remaining=min_remaining)
+        except Exception as e:
+            errors.append({"location": [lat, lon], "cache": "history", "error": str(e)})
+        try:
+            realtime_snapshot(lat, lon, min_remaining=min_remaining)
+        except Exception as e:
+            errors.append({"location": [lat, lon], "cache": "realtime", "error": str(e)})
+    for e in errors:
+        logger.warning("warm-up %s %s: %s", e["cache"], e["location"], e["error"])
+    STATE["errors"] = errors
+    STATE["last_refresh_utc"] = datetime.now(timezone.utc).isoformat()
+    history_failed = sum(1 for e in errors if e["cache"] == "history")
+    if not HOT_LOCATIONS or history_failed < len(HOT_LOCATIONS):
+        STATE["initial_pass_done"] = True
+
+async def refresh_loop(interval: Optional[int] = None) -> None:
+    """Initial warm pass, then refresh every `interval` seconds until cancelled."""
+    interval = interval or WARM_REFRESH_SEC
+    min_remaining = 0.0
+    while True:
+        try:
+            await asyncio.to_thread(warm_once, min_remaining)
+        except Exception:
+            logger.exception("warm-up pass failed")
+        # later passes renew anything that would expire before the next one
+        min_remaining = float(interval)
+        await asyncio.sleep(interval if STATE["initial_pass_done"] else min(WARM_RETRY_SEC, interval))
+
+def is_ready() -> bool:
+    return bool(STATE["model_loaded"] and STATE["initial_pass_done"])
+
+def warmth() -> Dict[str, Any]:
+    """Cache warmth summary for /api/health."""
+    warm_history = sum(1 for lat, lon in HOT_LOCATIONS if HISTORY_CACHE.get(power_cell(lat, lon)) is not None)
+    return {
+        "model_loaded": STATE["model_loaded"],
+        "hot_locations": len(HOT_LOCATIONS),
+        "hot_history_warm": warm_history,
+        "history_cells": len(HISTORY_CACHE),
+        "history_memory": history_cache_stats(),
+        "realtime_entries": len(REALTIME_CACHE),
+        "last_refresh_utc": STATE["last_refresh_utc"],
+        "errors": len(STATE["errors"]),
+    }
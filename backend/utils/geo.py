@@ -1,9 +1,13 @@
 # backend/utils/geo.py
 from __future__ import annotations
 
+import math
 from typing import Any, Tuple, List, Union
+
+import numpy as np
+import shapely
 from pydantic import BaseModel
-from shapely.geometry import shape, Point, Polygon, LineString
+from shapely.geometry import shape, Point, Polygon, MultiPolygon, LineString
 from shapely.geometry.base import BaseGeometry
 
 from schemas.common import GeoJSON  # your existing type
@@ -91,6 +95,40 @@ def grid_centroids_for_area(geo: GeoJSON, nx: int = 4, ny: int = 3) -> List[tupl
         out = [(float(c.x), float(c.y))]
     return out
 
+def grid_cells_for_area(
+    geo: GeoJSON, dlat: float, dlon: float, max_cells: int,
+) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Grid cells (i, j) — cell centered on (i*dlat, j*dlon) — that intersect a
+    polygon, and the stride used. When more than max_cells intersect, only
+    every stride-th row and column of the grid is kept (an even spatial
+    subsample), so the result and the work to find it stay bounded however
+    large the polygon is.
+    """
+    poly = _to_shapely(geo)
+    if not isinstance(poly, (Polygon, MultiPolygon)):
+        raise BadGeometry("area geometry must be a Polygon.")
+    if not poly.is_valid:
+        poly = shapely.make_valid(poly)
+    minx, miny, maxx, maxy = poly.bounds
+    i0, i1 = round(miny / dlat), round(maxy / dlat)
+    j0, j1 = round(minx / dlon), round(maxx / dlon)
+    n = (i1 - i0 + 1) * (j1 - j0 + 1)
+    # candidates tested per pass are capped at 16 × max_cells
+    stride = max(1, math.ceil(math.sqrt(n / (16 * max_cells))))
+    shapely.prepare(poly)
+    while True:
+        ii, jj = np.meshgrid(np.arange(i0, i1 + 1, stride), np.arange(j0, j1 + 1, stride), indexing="ij")
+        ii, jj = ii.ravel(), jj.ravel()
+        boxes = shapely.box((jj - 0.5) * dlon, (ii - 0.5) * dlat, (jj + 0.5) * dlon, (ii + 0.5) * dlat)
+        hit = shapely.intersects(poly, boxes) & ~shapely.touches(poly, boxes)
+        if 0 < hit.sum() <= max_cells:
+            return [(int(i), int(j)) for i, j in zip(ii[hit], jj[hit])], stride
+        if not hit.any():  # a thin polygon slipped between the subsampled rows/columns
+            p = poly.representative_point()
+            return [(round(p.y / dlat), round(p.x / dlon))], stride
+        stride += 1
+
 def sample_points_along_route(geo: GeoJSON, n: int = 10) -> List[tuple[float, float]]:
     line = _to_shapely(geo)
     if not isinstance(line, LineString):
@@ -0,0 +1,74 @@
+# backend/utils/http_cache.py
+# Deterministic response caching for climatology endpoints.
+#
+# Climatology answers only change when the underlying POWER history does, so
+# routers hash a normalized form of the request (POWER cell, day-of-year,
+# window, metrics, ...) plus a data version into a key. The key doubles as a
+# strong ETag: repeats with If-None-Match get a 304 without recomputing, and
+# on GET routes (e.g. GET /api/poe) Cache-Control lets browsers/CDNs serve
+# them without reaching Python at all. Browsers and CDNs do not cache POST, so
+# POST routes only revalidate for clients that send If-None-Match themselves.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from utils.jsonfast import dumps
+from utils.ttlcache import TTLCache
+
+CLIMO_CACHE_MAX_AGE = int(os.getenv("CLIMO_CACHE_MAX_AGE", "3600"))
+RESPONSE_CACHE: TTLCache[Tuple[bytes, bool]] = TTLCache(maxsize=int(os.getenv("RESPONSE_CACHE_MAX", "1024")))
+
+def canonical_key(namespace: str, parts: Dict[str, Any]) -> str:
+    """Stable hash of `parts` (key order-independent, compact JSON)."""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{namespace}:{blob}".encode("utf-8")).hexdigest()[:32]
+
+def _etag(key: str) -> str:
+    return f'"{key}"'
+
+def etag_matches(request: Request, key: str) -> bool:
+    """
+    True if the request's If-None-Match lists this key's ETag (weak or strong).
+    "*" is not matched: it guards writes ("only if none exists"), and for a
+    POST query RFC 9110 would make it a 412, not a 304; a 200 is always valid.
+    """
+    raw = request.headers.get("if-none-match")
+    if not raw:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in raw.split(",")}
+    return _etag(key) in tags
+
+def cache_headers(key: str) -> Dict[str, str]:
+    return {"ETag": _etag(key), "Cache-Control": f"public, max-age={CLIMO_CACHE_MAX_AGE}"}
+
+def cached_json(
+    request: Request,
+    key: str,
+    build: Callable[[], Any],
+    cacheable: Optional[Callable[[Any], bool]] = None,
+) -> Response:
+    """
+    304 if the client already has `key`; otherwise the cached JSON body for `key`,
+    building (and caching) it with build() on a miss. Payloads rejected by
+    cacheable() (e.g. degraded answers) are returned once with no-store.
+    """
+    if etag_matches(request, key):
+        return Response(status_code=304, headers=cache_headers(key))
+
+    def compute():
+        payload = build()
+        ok = cacheable is None or cacheable(payload)
+        # a non-cacheable entry expires immediately: only concurrent waiters share it
+        return (dumps(payload), ok), time.time() + (CLIMO_CACHE_MAX_AGE if ok else 0)
+
+    body, ok = RESPONSE_CACHE.get_or_compute(key, compute)
+    headers = cache_headers(key) if ok else {"Cache-Control": "no-store"}
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,98 @@
+# backend/utils/resilience.py
+# Building blocks for calling a flaky upstream: a circuit breaker, jittered
+# exponential backoff, and a per-request time budget carried in a contextvar
+# (set once by middleware, honored by every upstream call made for that request).
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+class CircuitOpen(RuntimeError):
+    """The breaker is open; the upstream is not being called."""
+
+class BudgetExceeded(TimeoutError):
+    """The request's time budget ran out before the upstream answered."""
+
+class CircuitBreaker:
+    """
+    closed → open after `fail_threshold` consecutive failures; while open every
+    call fails fast. After `reset_sec` one trial call is let through (half-open):
+    success closes the breaker, failure re-opens it for another `reset_sec`.
+    """
+
+    def __init__(self, name: str, fail_threshold: int = 5, reset_sec: float = 30.0):
+        self.name = name
+        self.fail_threshold = fail_threshold
+        self.reset_sec = reset_sec
+        self._fails = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if time.time() - self._opened_at >= self.reset_sec else "open"
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpen unless a call may go through now; True if it is the half-open trial."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.time() - self._opened_at < self.reset_sec or self._trial:
+                raise CircuitOpen(f"{self.name} circuit open")
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._fails = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._fails += 1
+            if self._trial or self._fails >= self.fail_threshold:
+                self._opened_at = time.time()
+            self._trial = False
+
+    def release_trial(self) -> None:
+        """End a trial call that gave no verdict (caller out of time, unexpected error); the next call may try again."""
+        with self._lock:
+            self._trial = False
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self._fails}
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+# epoch deadline for upstream calls made on behalf of the current request
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("upstream_deadline", default=None)
+
+@contextmanager
+def time_budget(seconds: Optional[float]):
+    """Bound the upstream time of everything run inside (nested budgets only tighten)."""
+    if not seconds or seconds <= 0:
+        yield
+        return
+    deadline = time.time() + seconds
+    outer = _DEADLINE.get()
+    token = _DEADLINE.set(min(deadline, outer) if outer is not None else deadline)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current budget, or None if there is none."""
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - time.time()
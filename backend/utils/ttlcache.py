@@ -0,0 +1,81 @@
+# backend/utils/ttlcache.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+class TTLCache(Generic[V]):
+    """
+    Small thread-safe cache with a per-entry expiry (epoch seconds).
+    get_or_compute() is single-flight: concurrent misses for one key run `compute` once.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[V, float]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def keys(self):
+        return list(self._data.keys())
+
+    def peek(self, key: Hashable) -> Optional[Tuple[V, float]]:
+        """(value, expires_at) even if expired; None if absent."""
+        return self._data.get(key)
+
+    def get(self, key: Hashable, min_remaining: float = 0.0) -> Optional[V]:
+        hit = self._data.get(key)
+        if hit is None or hit[1] - time.time() <= min_remaining:
+            return None
+        return hit[0]
+
+    def set(self, key: Hashable, value: V, expires_at: float) -> None:
+        with self._lock:
+            self._prune()
+            self._data[key] = (value, expires_at)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._key_locks.pop(key, None)
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Tuple[V, float]],
+        min_remaining: float = 0.0,
+    ) -> V:
+        """
+        Return the cached value, or run compute() -> (value, expires_at) and store it.
+        Entries with less than `min_remaining` seconds left count as misses
+        (used by background refresh to renew entries before they expire).
+        """
+        v = self.get(key, min_remaining)
+        if v is not None:
+            return v
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            v = self.get(key, min_remaining)
+            if v is not None:
+                return v
+            v, expires_at = compute()
+            self.set(key, v, expires_at)
+            return v
+
+    def _prune(self) -> None:
+        # caller holds self._lock
+        now = time.time()
+        for k in [k for k, (_, exp) in self._data.items() if exp <= now]:
+            self._data.pop(k, None)
+            self._key_locks.pop(k, None)
+        while len(self._data) >= self.maxsize:
+            oldest = min(self._data, key=lambda k: self._data[k][1])
+            self._data.pop(oldest, None)
+            self._key_locks.pop(oldest, None)
@@ -6,6 +6,7 @@ export type EVSRealtime = {
   features_used: Record<string, number>;
   p_ge_70: number;        // probability 0..1
   conf: [number, number]; // [low, high] 0..1
+  brief?: string;         // present when requested with include=brief
 };
 
 export async function aiRealtime(lat: number, lon: number): Promise<EVSRealtime> {
@@ -13,6 +14,12 @@ export async function aiRealtime(lat: number, lon: number): Promise<EVSRealtime>
   return data;
 }
 
+// score + ops brief in one round-trip
+export async function aiInsight(lat: number, lon: number): Promise<EVSRealtime & { brief: string }> {
+  const { data } = await api.get("/api/ai/realtime", { params: { lat, lon, include: "brief" } });
+  return data;
+}
+
 export async function llmBrief(lat: number, lon: number): Promise<{ brief: string }> {
   const { data } = await api.get("/api/llm/brief", { params: { lat, lon } });
   return data;
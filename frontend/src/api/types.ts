@@ -7,15 +7,19 @@ export interface EventRequest {
   geometry_geojson: GeoJSON.LineString | GeoJSON.Polygon;
   start_ts: string;        // ISO, midnight UTC for the chosen date
   duration_min: number;    // days * 1440
-  step_min: number;        // 1440 (daily)
-  mode: "climo";
+  step_min: number;        // 1440 (daily); < 1440 scores sub-daily bins when hourly
+  mode: "climo" | "reanalysis" | "forecast";
   hourly?: boolean;
   thresholds?: { evs_min?: number };
 }
 
 export interface CellEVS { t: number; total: number; rain: number; wind: number; heat: number; humidity: number; }
 export interface EventCell { cell_id: number; lon: number; lat: number; evs: CellEVS[] }
-export interface EventAggregate { t: number; coverage_ge_70: number; mean: number; min: number; }
+export interface EventAggregate {
+  t: number; coverage_ge_70: number; mean: number; min: number;
+  p10?: number; p50?: number; p90?: number;
+  worst_driver?: "rain" | "wind" | "heat" | "humidity"; worst_driver_mean?: number;
+}
 
 export interface EventMeta {
   units: Record<string,string>;
@@ -27,6 +31,12 @@ export interface EventMeta {
     best_time_iso?: ISODate;
     climo_window_days?: number;
     coerced_to_daily?: boolean;
+    requested_mode?: string | null;
+    source_mode?: "climo" | "reanalysis";
+    hourly?: boolean;
+    step_min?: number;
+    hourly_years?: [number, number] | null;
+    climo_fallback_bins?: number;
   };
 }
 
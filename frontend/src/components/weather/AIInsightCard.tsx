@@ -2,7 +2,7 @@
 import { useState } from "react";
 import { Card, CardHeader, CardTitle, CardContent } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
-import { aiRealtime, llmBrief, EVSRealtime } from "@/api/ai";
+import { aiInsight, EVSRealtime } from "@/api/ai";
 
 export default function AIInsightCard({ lat, lon }: { lat: string; lon: string }) {
   const [evs, setEvs] = useState<EVSRealtime | null>(null);
@@ -15,12 +15,10 @@ export default function AIInsightCard({ lat, lon }: { lat: string; lon: string }
     if (disabled) return;
     setLoading(true);
     try {
-      const r = await aiRealtime(latN, lonN);
+      const r = await aiInsight(latN, lonN);
       setEvs(r);
-      const b = await llmBrief(latN, lonN);
-      setBrief(b.brief);
-      console.log("[AI Realtime]", r);
-      console.log("[AI Brief]", b);
+      setBrief(r.brief);
+      console.log("[AI Insight]", r);
     } catch (e: any) {
       console.error(e);
       setBrief(`Error: ${e.message}`);